@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure séparément le temps de chaque étape de l'extraction de terme : lecture
+du corpus (ParserSplit, ParserArticle), construction des Document, extraction
+par chaque extracteur, Indexeur.calculIndex, chaque Classeur et ecrireCSV.
+
+Les étapes sont mesurées sur les livres de testpldac et sur des corpus
+synthétiques de plusieurs tailles (voir corpusSynthetique). Pour les corpus
+synthétiques l'exposant de croissance de chaque étape est estimé : un
+exposant nettement au dessus de 1 indique une étape super-linéaire.
+
+Les résultats sont écrits en json, l'option --comparer affiche le rapport
+des temps avec un json d'une exécution précédente.
+
+ex: python benchmarks/benchEtapes.py --tailles 20000,50000,100000 --sortie etapes.json
+"""
+import argparse
+import gc
+import glob
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(DOSSIER_PROJET not in sys.path):
+    sys.path.insert(0,DOSSIER_PROJET)
+
+from config.config import Config,METHODES_EXTRACTION,METHODES_SCORING
+from document.corpus import Corpus
+from document.document import Document
+from indexeur.indexeur import Indexeur
+from indexeur.statistiquesReference import StatistiquesReference
+from parserCorpus.parserSplit import ParserSplit
+from parserCorpus.parserArticle import ParserArticle
+from extractionTerme import recupererExtracteur,recupererClasseur,importerClasse,ecrireCSV
+from corpusSynthetique import GenerateurCorpus,ecrireSplit,ecrireArticles
+
+#Livres mesurés par défaut
+LIVRES = sorted(glob.glob(os.path.join(DOSSIER_PROJET,'testpldac','livre*.txt')))
+
+#Tailles par défaut des corpus synthétiques, en nombre de mots
+TAILLES = [20000,50000,100000,200000]
+
+#Au dessus de cet exposant de croissance une étape est signalée super-linéaire
+EXPOSANT_SUPER_LINEAIRE = 1.2
+
+def mesurer(fonction,preparer,repetitions):
+    """Mesure plusieurs fois le temps d'une fonction. Les arguments de chaque
+    appel sont préparés avant de lancer le chronomètre.
+
+    Parameters
+    ----------
+    fonction : callable
+        La fonction mesurée
+    preparer : callable
+        Renvoie le tuple des arguments d'un appel de fonction
+    repetitions : int
+        Nombre de mesures
+
+    Returns
+    -------
+    tuple[dict[str,object],object]
+        Le meilleur temps, le temps médian et toutes les mesures en secondes,
+        puis le résultat du dernier appel
+    """
+    durees = []
+    for _ in range(repetitions):
+        arguments = preparer()
+        gc.collect()
+        debut = time.perf_counter()
+        resultat = fonction(*arguments)
+        durees.append(time.perf_counter()-debut)
+    return {'meilleur':min(durees),'mediane':statistics.median(durees),'mesures':durees},resultat
+
+def creerConfig(parametres,methodeExtraction,methodeScoring=METHODES_SCORING.FREQUENCE):
+    """Renvoie la configuration d'une mesure
+
+    Parameters
+    ----------
+    parametres : dict[str,object]
+        Paramètres communs à toutes les mesures
+    methodeExtraction : METHODES_EXTRACTION
+        Méthode d'extraction
+    methodeScoring : METHODES_SCORING
+        Méthode de scoring
+
+    Returns
+    -------
+    Config
+        La configuration
+    """
+    return Config.depuisParametres(parametres,methodeExtraction=methodeExtraction,
+                                   methodeScoring=methodeScoring,cValue=False)
+
+def corpusDocuments(contenus):
+    """Construit un corpus avec un Document par contenu
+
+    Parameters
+    ----------
+    contenus : list[str]
+        Le contenu des documents
+
+    Returns
+    -------
+    Corpus
+        Le corpus, dont les termes ne sont pas extraits
+    """
+    corpus = Corpus()
+    for contenu in contenus:
+        corpus.addDocument(Document(contenu))
+    return corpus
+
+def extraire(extracteur,corpus):
+    """Extrait les termes d'un corpus
+
+    Parameters
+    ----------
+    extracteur : Extracteur
+        L'extracteur
+    corpus : Corpus
+        Le corpus dont les termes ne sont pas extraits
+
+    Returns
+    -------
+    Corpus
+        Le même corpus, avec ses termes extraits
+    """
+    corpus.extraction(extracteur)
+    return corpus
+
+def decouperLivre(path,lignesParDocument):
+    """Découpe un livre en documents de quelques lignes, les livres de
+    testpldac n'ont pas de séparateur de documents
+
+    Parameters
+    ----------
+    path : str
+        Chemin du livre
+    lignesParDocument : int
+        Nombre de lignes de chaque document
+
+    Returns
+    -------
+    list[str]
+        Le contenu des documents
+    """
+    with open(path,'r',encoding='utf-8') as f:
+        lignes = f.read().splitlines()
+    return ['\n'.join(lignes[i:i+lignesParDocument]) for i in range(0,len(lignes),lignesParDocument)]
+
+def methodesDisponibles(parametres,methodes):
+    """Sépare les méthodes d'extraction dont l'extracteur peut être créé des
+    autres (modèle spacy absent par exemple)
+
+    Parameters
+    ----------
+    parametres : dict[str,object]
+        Paramètres communs à toutes les mesures
+    methodes : list[METHODES_EXTRACTION]
+        Méthodes d'extraction demandées
+
+    Returns
+    -------
+    tuple[list[METHODES_EXTRACTION],dict[str,str]]
+        Les méthodes disponibles et, pour les autres, la raison
+    """
+    disponibles = []
+    indisponibles = dict()
+    for methode in methodes:
+        try:
+            recupererExtracteur(creerConfig(parametres,methode))
+            disponibles.append(methode)
+        except (ImportError,OSError) as e:
+            indisponibles[methode.name] = str(e)
+    return disponibles,indisponibles
+
+def mesurerCorpus(contenus,parametres,methodes,repetitions,dossier):
+    """Mesure toutes les étapes sur un corpus
+
+    Parameters
+    ----------
+    contenus : list[str]
+        Le contenu des documents du corpus
+    parametres : dict[str,object]
+        Paramètres communs à toutes les mesures
+    methodes : list[METHODES_EXTRACTION]
+        Méthodes d'extraction mesurées
+    repetitions : int
+        Nombre de mesures de chaque étape
+    dossier : str
+        Dossier des fichiers temporaires
+
+    Returns
+    -------
+    dict[str,object]
+        La taille du corpus et le temps de chaque étape
+    """
+    etapes = dict()
+    pathSplit = os.path.join(dossier,'corpus.txt')
+    pathArticle = os.path.join(dossier,'corpus_ref.fr')
+    pathCSV = os.path.join(dossier,'res.csv')
+    ecrireSplit(contenus,pathSplit)
+    ecrireArticles(contenus,pathArticle)
+
+    etapes['ParserSplit.parse'],_ = mesurer(ParserSplit().parse,lambda: (pathSplit,),repetitions)
+    etapes['ParserArticle.parse'],_ = mesurer(ParserArticle().parse,lambda: (pathArticle,),repetitions)
+    etapes['Document'],_ = mesurer(corpusDocuments,lambda: (contenus,),repetitions)
+
+    infos = {'nbDocuments':len(contenus),
+             'nbMots':sum(len(contenu.split()) for contenu in contenus),
+             'nbCaracteres':sum(len(contenu) for contenu in contenus),
+             'nbTermes':dict()}
+
+    for methode in methodes:
+        config = creerConfig(parametres,methode)
+        #un nouvel extracteur à chaque mesure pour que le cache des stems parte vide
+        nomExtracteur = methode.name+'/'+type(recupererExtracteur(config)).__name__
+        etapes[nomExtracteur],corpus = mesurer(extraire,
+                                               lambda: (recupererExtracteur(config),corpusDocuments(contenus)),
+                                               repetitions)
+
+        etapes[methode.name+'/Indexeur.calculIndex'],index = mesurer(Indexeur,lambda: (corpus,),repetitions)
+        infos['nbTermes'][methode.name] = index.getNbTermes()
+        #le corpus de référence est le corpus lui-même, il n'y a pas de corpus_ref.fr à lire
+        statsRef = StatistiquesReference.depuisIndexeur(index)
+
+        def preparerIndex():
+            #l'index des termes imbriqués est recalculé à chaque mesure
+            index.indexImbrication = None
+            return (index,)
+
+        for methodeScoring in METHODES_SCORING:
+            classeur = recupererClasseur(creerConfig(parametres,methode,methodeScoring),statsRef)
+            nom = '%s/%s[%s]' % (methode.name,type(classeur).__name__,methodeScoring.name)
+            etapes[nom],listeTermesTrie = mesurer(classeur.classer,preparerIndex,repetitions)
+
+        classeurCValue = importerClasse('classeur.classeurCValue','ClasseurCValue')(config)
+        etapes[methode.name+'/ClasseurCValue'],_ = mesurer(classeurCValue.noter,preparerIndex,repetitions)
+
+        #classement de la dernière méthode de scoring, comme ecrireClassement sans stem
+        lignes = [(i,terme,score) for i,(terme,score) in enumerate(listeTermesTrie,1)]
+        etapes[methode.name+'/ecrireCSV'],_ = mesurer(ecrireCSV,lambda: (lignes,pathCSV),repetitions)
+
+    infos['etapes'] = etapes
+    return infos
+
+def calculerCroissance(resultats):
+    """Estime l'exposant de croissance du temps de chaque étape avec la taille
+    des corpus synthétiques : pente de log(temps) en fonction de log(nbMots)
+    par moindres carrés, et pente entre deux tailles consécutives.
+
+    Parameters
+    ----------
+    resultats : list[dict[str,object]]
+        Les résultats des corpus synthétiques
+
+    Returns
+    -------
+    dict[str,dict[str,object]]
+        Pour chaque étape, l'exposant global et les exposants locaux
+    """
+    resultats = sorted(resultats,key=lambda resultat: resultat['nbMots'])
+    if(len(resultats) < 2):
+        return dict()
+    croissance = dict()
+    for etape in resultats[0]['etapes']:
+        points = [(math.log(resultat['nbMots']),math.log(max(resultat['etapes'][etape]['meilleur'],1e-9)))
+                  for resultat in resultats]
+        moyenneX = statistics.fmean(x for x,_ in points)
+        moyenneY = statistics.fmean(y for _,y in points)
+        variance = sum((x-moyenneX)**2 for x,_ in points)
+        exposant = sum((x-moyenneX)*(y-moyenneY) for x,y in points)/variance
+        locaux = [(y2-y1)/(x2-x1) for (x1,y1),(x2,y2) in zip(points,points[1:])]
+        croissance[etape] = {'exposant':exposant,'exposantsLocaux':locaux}
+    return croissance
+
+def afficherCroissance(resultats,croissance):
+    """Affiche le temps de chaque étape sur les corpus synthétiques et son
+    exposant de croissance
+
+    Parameters
+    ----------
+    resultats : list[dict[str,object]]
+        Les résultats des corpus synthétiques
+    croissance : dict[str,dict[str,object]]
+        Les exposants renvoyés par calculerCroissance
+    """
+    resultats = sorted(resultats,key=lambda resultat: resultat['nbMots'])
+    print('%-45s' % 'etape'+''.join('%12d' % resultat['nbMots'] for resultat in resultats)+'   exposant')
+    for etape,valeurs in croissance.items():
+        alerte = '  super-linéaire' if valeurs['exposant'] > EXPOSANT_SUPER_LINEAIRE else ''
+        print('%-45s' % etape+''.join('%12.4f' % resultat['etapes'][etape]['meilleur'] for resultat in resultats)
+              +'   %.2f%s' % (valeurs['exposant'],alerte))
+
+def comparer(resultats,pathAncien):
+    """Affiche pour chaque corpus et chaque étape le rapport entre le temps
+    mesuré et celui d'une exécution précédente
+
+    Parameters
+    ----------
+    resultats : dict[str,object]
+        Les résultats de cette exécution
+    pathAncien : str
+        Chemin du json d'une exécution précédente
+    """
+    with open(pathAncien,'r',encoding='utf-8') as f:
+        ancien = json.load(f)
+    anciens = {resultat['corpus'] : resultat for resultat in ancien['corpus']}
+    for resultat in resultats['corpus']:
+        if(resultat['corpus'] not in anciens):
+            continue
+        etapesAnciennes = anciens[resultat['corpus']]['etapes']
+        print(resultat['corpus'])
+        for etape,mesure in resultat['etapes'].items():
+            if(etape in etapesAnciennes):
+                rapport = mesure['meilleur']/max(etapesAnciennes[etape]['meilleur'],1e-9)
+                print('    %-45s %10.4f %10.4f   x%.2f' % (etape,etapesAnciennes[etape]['meilleur'],
+                                                          mesure['meilleur'],rapport))
+
+def liste(texte):
+    """Découpe une option de la ligne de commande séparée par des virgules
+
+    Parameters
+    ----------
+    texte : str
+        L'option
+
+    Returns
+    -------
+    list[str]
+        Les éléments non vides
+    """
+    return [element.strip() for element in texte.split(',') if element.strip()]
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Mesure le temps de chaque étape de l'extraction de terme")
+    parser.add_argument('--tailles',type=liste,default=[str(taille) for taille in TAILLES],
+                        help='tailles des corpus synthétiques en nombre de mots, séparées par des virgules')
+    parser.add_argument('--livres',nargs='*',default=LIVRES,help='livres mesurés (par défaut ceux de testpldac)')
+    parser.add_argument('--lignes-document',type=int,default=20,help='nombre de lignes des documents des livres')
+    parser.add_argument('--mots-document',type=int,default=500,
+                        help='nombre moyen de mots des documents synthétiques')
+    parser.add_argument('--vocabulaire',type=int,default=20000,help='nombre de mots pleins des corpus synthétiques')
+    parser.add_argument('--exposant',type=float,default=1.1,help='exposant de la loi de Zipf')
+    parser.add_argument('--graine',type=int,default=0,help='graine du générateur aléatoire')
+    parser.add_argument('--methodes',type=liste,default=[methode.name for methode in METHODES_EXTRACTION],
+                        help="méthodes d'extraction mesurées, séparées par des virgules")
+    parser.add_argument('--stem',action='store_true',help='active le stemming')
+    parser.add_argument('--longueur-min',type=int,default=1,help='longueur minimale des termes')
+    parser.add_argument('--longueur-max',type=int,default=4,help='longueur maximale des termes')
+    parser.add_argument('--agregation',default='SUM',help="formule d'agrégation des classeurs")
+    parser.add_argument('--moteur',default='VECTORIEL',help='moteur de scoring des classeurs TFIDF et Okapi')
+    parser.add_argument('--repetitions',type=int,default=3,help='nombre de mesures de chaque étape')
+    parser.add_argument('--sortie',default='etapes.json',help='chemin du json des résultats')
+    parser.add_argument('--comparer',default=None,help="json d'une exécution précédente à comparer")
+    arguments = parser.parse_args()
+
+    parametres = {'stem':arguments.stem,'longueurMin':arguments.longueur_min,
+                  'longueurMax':arguments.longueur_max,'seuilNbOccMin':0,
+                  'formuleAgregation':arguments.agregation,'moteurScoring':arguments.moteur}
+    methodes,indisponibles = methodesDisponibles(parametres,[METHODES_EXTRACTION[methode.upper()]
+                                                            for methode in arguments.methodes])
+    for methode,raison in indisponibles.items():
+        print('%s non mesurée : %s' % (methode,raison))
+
+    resultats = {'date':datetime.now().isoformat(timespec='seconds'),
+                 'python':platform.python_version(),
+                 'plateforme':platform.platform(),
+                 'parametres':dict(parametres,repetitions=arguments.repetitions,
+                                   lignesDocument=arguments.lignes_document,
+                                   motsDocument=arguments.mots_document,
+                                   vocabulaire=arguments.vocabulaire,
+                                   exposant=arguments.exposant,graine=arguments.graine),
+                 'methodesIndisponibles':indisponibles,
+                 'corpus':[]}
+
+    synthetiques = []
+    with tempfile.TemporaryDirectory() as dossier:
+        for path in arguments.livres:
+            print('livre', os.path.basename(path))
+            resultat = mesurerCorpus(decouperLivre(path,arguments.lignes_document),parametres,
+                                     methodes,arguments.repetitions,dossier)
+            resultat['corpus'] = 'livre:'+os.path.basename(path)
+            resultats['corpus'].append(resultat)
+
+        for taille in arguments.tailles:
+            print('synthétique', taille)
+            #même graine pour toutes les tailles : même vocabulaire et mêmes expressions
+            generateur = GenerateurCorpus(arguments.vocabulaire,arguments.exposant,graine=arguments.graine)
+            resultat = mesurerCorpus(generateur.genererCorpus(int(taille),arguments.mots_document),
+                                     parametres,methodes,arguments.repetitions,dossier)
+            resultat['corpus'] = 'synthetique:'+str(taille)
+            resultats['corpus'].append(resultat)
+            synthetiques.append(resultat)
+
+    resultats['croissance'] = calculerCroissance(synthetiques)
+    with open(arguments.sortie,'w',encoding='utf-8') as f:
+        json.dump(resultats,f,ensure_ascii=False,indent=1)
+
+    if(resultats['croissance']):
+        afficherCroissance(synthetiques,resultats['croissance'])
+    if(arguments.comparer is not None):
+        comparer(resultats,arguments.comparer)
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Générateur de corpus synthétiques qui ressemblent à du français : les mots
+sont construits à partir de syllabes françaises, leur fréquence suit une loi
+de Zipf, les mots vides du projet sont mélangés aux mots pleins et des
+expressions de plusieurs mots reviennent pour donner des termes composés.
+
+Le corpus généré ne dépend que des paramètres et de la graine.
+
+ex: python benchmarks/corpusSynthetique.py corpus.txt --mots 100000
+"""
+import argparse
+import os
+import random
+import sys
+from itertools import accumulate
+
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(DOSSIER_PROJET not in sys.path):
+    sys.path.insert(0,DOSSIER_PROJET)
+
+from extracteur.ressources import PATH_MOTSVIDES
+
+#Briques des mots générés : attaque, noyau et coda des syllabes puis suffixes
+ATTAQUES = ['','','b','c','d','f','g','l','m','n','p','r','s','t','v','ch','tr','pr','gr','bl','cl','qu']
+NOYAUX = ['a','a','e','e','i','o','u','é','é','è','ou','ai','on','an','in','eu','oi']
+CODAS = ['','','','','','r','s','l','n','t']
+SUFFIXES = ['tion','ment','ique','ité','eur','ence','age','isme','el','ant','ie','oire']
+
+#Séparateur des documents d'un fichier pour ParserSplit
+SEPARATEUR_SPLIT = '\n##END##\n'
+
+class GenerateurCorpus:
+    """
+    Objet qui génère des documents de texte synthétique
+
+    Attributes
+    ----------
+    aleatoire : random.Random
+        Le générateur aléatoire, initialisé avec la graine
+
+    vocabulaire : list[str]
+        Les mots pleins, du plus fréquent au moins fréquent
+
+    cumulVocabulaire : list[float]
+        Les poids de Zipf cumulés du vocabulaire
+
+    motsVides : list[str]
+        Les mots vides du projet, du plus fréquent au moins fréquent
+
+    cumulMotsVides : list[float]
+        Les poids de Zipf cumulés des mots vides
+
+    expressions : list[list[str]]
+        Expressions de plusieurs mots pleins
+
+    cumulExpressions : list[float]
+        Les poids de Zipf cumulés des expressions
+
+    tauxMotsVides : float
+        Proportion des mots vides dans le texte
+
+    tauxExpressions : float
+        Probabilité de placer une expression à la place d'un mot plein
+    """
+    def __init__(self,tailleVocabulaire=20000,exposant=1.1,tauxMotsVides=0.45,
+                 tauxExpressions=0.05,nbExpressions=2000,graine=0):
+        """Constructeur de la classe GenerateurCorpus
+
+        Parameters
+        ----------
+        tailleVocabulaire : int
+            Nombre de mots pleins différents
+
+        exposant : float
+            Exposant de la loi de Zipf, le mot de rang r a un poids 1/r^exposant
+
+        tauxMotsVides : float
+            Proportion des mots vides dans le texte
+
+        tauxExpressions : float
+            Probabilité de placer une expression à la place d'un mot plein
+
+        nbExpressions : int
+            Nombre d'expressions différentes, de 2 à 4 mots pleins
+
+        graine : int
+            Graine du générateur aléatoire
+        """
+        self.aleatoire = random.Random(graine)
+        self.tauxMotsVides = tauxMotsVides
+        self.tauxExpressions = tauxExpressions
+
+        self.vocabulaire = self.genererVocabulaire(tailleVocabulaire)
+        self.cumulVocabulaire = self.poidsZipf(len(self.vocabulaire),exposant)
+
+        with open(PATH_MOTSVIDES,'r',encoding='utf-8') as f:
+            #la liste contient toutes les lettres seules, on ne garde que les vrais mots
+            motsVides = sorted({ligne.strip() for ligne in f if ligne.strip().isalpha() and \
+                                (len(ligne.strip()) > 1 or ligne.strip() in ('à','a','y'))})
+        #comme pour les mots pleins, les mots vides courts sont plutôt les plus fréquents
+        self.motsVides = self.ordonnerParLongueur(motsVides)
+        self.cumulMotsVides = self.poidsZipf(len(motsVides),exposant)
+
+        #les expressions sont faites de mots plutôt fréquents
+        self.expressions = [self.aleatoire.choices(self.vocabulaire,cum_weights=self.cumulVocabulaire,
+                                                   k=self.aleatoire.randint(2,4))
+                            for _ in range(nbExpressions)]
+        self.cumulExpressions = self.poidsZipf(nbExpressions,exposant)
+
+    def poidsZipf(self,taille,exposant):
+        """Renvoie les poids cumulés de la loi de Zipf pour des rangs de 1 à taille
+
+        Parameters
+        ----------
+        taille : int
+            Nombre de rangs
+        exposant : float
+            Exposant de la loi de Zipf
+
+        Returns
+        -------
+        list[float]
+            Les poids cumulés, à donner à random.choices
+        """
+        return list(accumulate(1/rang**exposant for rang in range(1,taille+1)))
+
+    def genererMot(self):
+        """Génère un mot de 1 à 4 syllabes, avec parfois un suffixe
+
+        Returns
+        -------
+        str
+            Le mot
+        """
+        nbSyllabes = self.aleatoire.choice([1,2,2,2,3,3,4])
+        mot = ''.join(self.aleatoire.choice(ATTAQUES)+self.aleatoire.choice(NOYAUX)+self.aleatoire.choice(CODAS)
+                      for _ in range(nbSyllabes))
+        if(self.aleatoire.random() < 0.3):
+            mot += self.aleatoire.choice(SUFFIXES)
+        return mot
+
+    def genererVocabulaire(self,tailleVocabulaire):
+        """Génère des mots pleins tous différents
+
+        Parameters
+        ----------
+        tailleVocabulaire : int
+            Nombre de mots
+
+        Returns
+        -------
+        list[str]
+            Les mots, dans l'ordre de leur rang
+        """
+        mots = dict()
+        while(len(mots) < tailleVocabulaire):
+            mot = self.genererMot()
+            if(len(mot) > 2):
+                mots[mot] = None
+        return self.ordonnerParLongueur(list(mots))
+
+    def ordonnerParLongueur(self,mots):
+        """Range des mots du plus court au plus long, avec du hasard, pour que
+        les mots fréquents soient plutôt courts comme dans une vraie langue
+
+        Parameters
+        ----------
+        mots : list[str]
+            Les mots
+
+        Returns
+        -------
+        list[str]
+            Les mots dans l'ordre de leur rang
+        """
+        cles = {mot : len(mot)+self.aleatoire.random()*8 for mot in mots}
+        return sorted(mots,key=cles.get)
+
+    def genererPhrase(self,nbMots):
+        """Génère une phrase d'environ nbMots mots, ponctuation séparée par
+        des espaces comme dans les livres de testpldac
+
+        Parameters
+        ----------
+        nbMots : int
+            Nombre de mots voulu
+
+        Returns
+        -------
+        tuple[str,int]
+            La phrase et son nombre de mots
+        """
+        mots = []
+        while(len(mots) < nbMots):
+            tirage = self.aleatoire.random()
+            if(tirage < self.tauxMotsVides):
+                mots += self.aleatoire.choices(self.motsVides,cum_weights=self.cumulMotsVides)
+            elif(tirage < self.tauxMotsVides+self.tauxExpressions*(1-self.tauxMotsVides)):
+                mots += self.aleatoire.choices(self.expressions,cum_weights=self.cumulExpressions)[0]
+            else:
+                mots += self.aleatoire.choices(self.vocabulaire,cum_weights=self.cumulVocabulaire)
+            if(len(mots) < nbMots and self.aleatoire.random() < 0.06):
+                mots.append(',')
+        nbMotsPhrase = sum(1 for mot in mots if mot != ',')
+        mots[0] = mots[0].capitalize()
+        return ' '.join(mots)+' .',nbMotsPhrase
+
+    def genererDocument(self,nbMots):
+        """Génère un document d'environ nbMots mots, en paragraphes d'une à
+        six phrases
+
+        Parameters
+        ----------
+        nbMots : int
+            Nombre de mots voulu
+
+        Returns
+        -------
+        str
+            Le contenu du document
+        """
+        lignes = []
+        phrases = []
+        total = 0
+        while(total < nbMots):
+            phrase,nb = self.genererPhrase(self.aleatoire.randint(6,30))
+            phrases.append(phrase)
+            total += nb
+            if(len(phrases) >= self.aleatoire.randint(1,6)):
+                lignes.append(' '.join(phrases))
+                phrases = []
+        if(phrases):
+            lignes.append(' '.join(phrases))
+        return '\n'.join(lignes)
+
+    def genererCorpus(self,nbMots,motsParDocument=500):
+        """Génère les documents d'un corpus d'environ nbMots mots. La taille
+        des documents varie entre la moitié et une fois et demie motsParDocument.
+
+        Parameters
+        ----------
+        nbMots : int
+            Nombre de mots voulu dans tout le corpus
+
+        motsParDocument : int
+            Nombre moyen de mots par document
+
+        Returns
+        -------
+        list[str]
+            Le contenu des documents
+        """
+        contenus = []
+        total = 0
+        while(total < nbMots):
+            taille = min(self.aleatoire.randint(motsParDocument//2,motsParDocument*3//2),nbMots-total)
+            contenus.append(self.genererDocument(max(taille,1)))
+            total += max(taille,1)
+        return contenus
+
+def ecrireSplit(contenus,path):
+    """Ecrit des documents dans un fichier lisible par ParserSplit
+
+    Parameters
+    ----------
+    contenus : list[str]
+        Le contenu des documents
+    path : str
+        Chemin du fichier
+    """
+    with open(path,'w',encoding='utf-8') as f:
+        f.write(SEPARATEUR_SPLIT.join(contenus))
+
+def ecrireArticles(contenus,path):
+    """Ecrit des documents dans un fichier lisible par ParserArticle, au format
+    du corpus de référence
+
+    Parameters
+    ----------
+    contenus : list[str]
+        Le contenu des documents
+    path : str
+        Chemin du fichier
+    """
+    with open(path,'w',encoding='utf-8') as f:
+        for i,contenu in enumerate(contenus):
+            f.write('<article title="document %d">\n%s\n</article>\n' % (i,contenu))
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Génère un corpus synthétique qui ressemble à du français')
+    parser.add_argument('sortie',help='chemin du fichier corpus')
+    parser.add_argument('--mots',type=int,default=100000,help='nombre de mots du corpus')
+    parser.add_argument('--mots-document',type=int,default=500,help='nombre moyen de mots par document')
+    parser.add_argument('--vocabulaire',type=int,default=20000,help='nombre de mots pleins différents')
+    parser.add_argument('--exposant',type=float,default=1.1,help='exposant de la loi de Zipf')
+    parser.add_argument('--graine',type=int,default=0,help='graine du générateur aléatoire')
+    parser.add_argument('--format',choices=['split','article'],default='split',
+                        help='split pour ParserSplit (##END##), article pour ParserArticle')
+    arguments = parser.parse_args()
+
+    generateur = GenerateurCorpus(arguments.vocabulaire,arguments.exposant,graine=arguments.graine)
+    contenus = generateur.genererCorpus(arguments.mots,arguments.mots_document)
+    if(arguments.format == 'split'):
+        ecrireSplit(contenus,arguments.sortie)
+    else:
+        ecrireArticles(contenus,arguments.sortie)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure le temps d'import à froid des programmes du projet et échoue (code de
+retour 1) si un import dépasse le budget ou s'il charge une bibliothèque
+lourde dont il n'a pas besoin.
+
+Chaque mesure est faite dans un nouvel interpréteur python, le temps retenu
+est le meilleur des répétitions. Seul l'import est chronométré, pas le
+démarrage de l'interpréteur.
+
+ex: python benchmarks/tempsImport.py --budget 0.2 --repetitions 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+#Dossier racine du projet, les modules y sont importés
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#Budget par défaut du temps d'import d'un programme, en secondes.
+#Import de spacy seul : environ 0.9s, de nltk : environ 0.3s
+BUDGET_IMPORT = 0.2
+
+#Programmes mesurés
+MODULES = ['extractionTerme','grilleExtraction','serveur','session']
+
+#Bibliothèques qui ne doivent pas être importées au démarrage
+MODULES_LOURDS = ['spacy','nltk','numpy','distutils']
+
+#Code exécuté dans l'interpréteur de mesure : importe le module puis affiche
+#le temps d'import et les bibliothèques lourdes chargées
+CODE_MESURE = """
+import sys,time,json
+debut = time.perf_counter()
+import {module}
+duree = time.perf_counter()-debut
+print(json.dumps({{'duree':duree,'lourds':[m for m in {lourds!r} if m in sys.modules]}}))
+"""
+
+#Code qui crée l'extracteur NGRAMMES et le classeur FREQUENCE : spacy ne doit
+#pas être chargé, ni les statistiques du corpus de référence
+CODE_NGRAMMES = """
+import sys,json
+from config.config import Config
+from extractionTerme import recupererExtracteur,recupererClasseur,utiliseReference
+config = Config.depuisParametres(stem=False,methodeExtraction='NGRAMMES',longueurMin=1,
+                                 longueurMax=4,seuilNbOccMin=0,methodeScoring='FREQUENCE',
+                                 formuleAgregation='SUM',cValue=False)
+recupererExtracteur(config)
+recupererClasseur(config,None)
+print(json.dumps({'duree':0,'lourds':[m for m in ['spacy'] if m in sys.modules],
+                  'reference':utiliseReference(config)}))
+"""
+
+def executer(code):
+    """Exécute du code dans un nouvel interpréteur placé dans le dossier du
+    projet et renvoie le json qu'il affiche.
+
+    Parameters
+    ----------
+    code : str
+        Le code à exécuter
+
+    Returns
+    -------
+    dict
+        Le résultat affiché par le code
+
+    Raises
+    ------
+    RuntimeError
+        Si l'interpréteur se termine en erreur
+    """
+    resultat = subprocess.run([sys.executable,'-c',code],cwd=DOSSIER_PROJET,
+                              capture_output=True,text=True)
+    if(resultat.returncode != 0):
+        raise RuntimeError(resultat.stderr)
+    return json.loads(resultat.stdout.strip().splitlines()[-1])
+
+def mesurerImport(module,repetitions):
+    """Mesure le temps d'import à froid d'un module.
+
+    Parameters
+    ----------
+    module : str
+        Nom du module
+    repetitions : int
+        Nombre de mesures, le meilleur temps est gardé
+
+    Returns
+    -------
+    tuple[float,list[str]]
+        Le meilleur temps d'import en secondes et les bibliothèques lourdes
+        chargées par l'import
+    """
+    mesures = [executer(CODE_MESURE.format(module=module,lourds=MODULES_LOURDS)) for _ in range(repetitions)]
+    return min(mesure['duree'] for mesure in mesures),mesures[0]['lourds']
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser(description="Vérifie le temps d'import à froid des programmes")
+    parser.add_argument('--budget',type=float,default=BUDGET_IMPORT,
+                        help="temps d'import maximal d'un programme, en secondes")
+    parser.add_argument('--repetitions',type=int,default=5,help='nombre de mesures par programme')
+    arguments = parser.parse_args()
+
+    erreurs = []
+    for module in MODULES:
+        duree,lourds = mesurerImport(module,arguments.repetitions)
+        print('%-20s %.3fs %s' % (module,duree,','.join(lourds)))
+        if(duree > arguments.budget):
+            erreurs.append('%s : %.3fs dépasse le budget de %.3fs' % (module,duree,arguments.budget))
+        if(lourds):
+            erreurs.append('%s importe %s au démarrage' % (module,', '.join(lourds)))
+
+    ngrammes = executer(CODE_NGRAMMES)
+    if(ngrammes['lourds']):
+        erreurs.append('NGRAMMES importe spacy')
+    if(ngrammes['reference']):
+        erreurs.append('FREQUENCE utilise les statistiques du corpus de référence')
+
+    for erreur in erreurs:
+        print('ECHEC', erreur)
+    sys.exit(1 if erreurs else 0)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Dans ce module on trouve les formules d'agrégation des scores d'un terme dans
+les documents du corpus. Chaque formule parcourt une seule fois les scores des
+documents qui contiennent le terme et reçoit le nombre de documents du corpus :
+les documents qui ne contiennent pas le terme comptent pour un score de 0 sans
+qu'on ait à ajouter ces zéros.
+"""
+import bisect
+import heapq
+from functools import partial
+from config.config import FORMULES_AGREGATION
+
+#Tout float est un multiple entier de 2**-1074, ce qui permet de sommer
+#exactement des floats avec des entiers python
+ECHELLE_FLOAT = 2**1074
+
+def maximum(valeurs,nbdoc):
+    """Score maximal du terme dans les documents qui le contiennent
+
+    Parameters
+    ----------
+    valeurs : iterable[float]
+        Scores du terme dans les documents qui le contiennent
+
+    nbdoc : int
+        Nombre de documents du corpus
+
+    Returns
+    -------
+    float
+        Le score maximal
+    """
+    return max(valeurs)
+
+def somme(valeurs,nbdoc):
+    """Somme des scores du terme, dans l'ordre des documents
+
+    Parameters
+    ----------
+    valeurs : iterable[float]
+        Scores du terme dans les documents qui le contiennent
+
+    nbdoc : int
+        Nombre de documents du corpus
+
+    Returns
+    -------
+    float
+        La somme des scores
+    """
+    return sum(valeurs)
+
+def moyenne(valeurs,nbdoc):
+    """Moyenne des scores du terme sur tous les documents du corpus.
+
+    La somme est exacte (sur des entiers python) et n'est arrondie qu'une fois
+    à la division, le résultat est donc le même qu'avec statistics.mean sur
+    les scores complétés par des zéros, y compris un entier si tous les scores
+    sont entiers et que la moyenne tombe juste.
+
+    Parameters
+    ----------
+    valeurs : iterable[float]
+        Scores du terme dans les documents qui le contiennent
+
+    nbdoc : int
+        Nombre de documents du corpus
+
+    Returns
+    -------
+    float
+        La moyenne des scores
+    """
+    total = 0
+    entiers = True
+    for v in valeurs:
+        if(isinstance(v,int)):
+            total += v*ECHELLE_FLOAT
+        else:
+            entiers = False
+            numerateur,denominateur = v.as_integer_ratio()
+            total += numerateur*(ECHELLE_FLOAT//denominateur)
+    diviseur = nbdoc*ECHELLE_FLOAT
+    if(entiers and total % diviseur == 0):
+        return total//diviseur
+    #la division d'entiers python est arrondie correctement
+    return total/diviseur
+
+def moyenneTopK(valeurs,nbdoc,k):
+    """Moyenne des k meilleurs scores du terme. Si moins de k documents
+    contiennent le terme, les autres documents comptent pour 0.
+
+    Parameters
+    ----------
+    valeurs : iterable[float]
+        Scores du terme dans les documents qui le contiennent
+
+    nbdoc : int
+        Nombre de documents du corpus
+
+    k : int
+        Nombre de scores gardés
+
+    Returns
+    -------
+    float
+        La moyenne des k meilleurs scores
+    """
+    meilleurs = heapq.nlargest(k,valeurs)
+    return sum(meilleurs)/min(k,nbdoc)
+
+def percentile(valeurs,nbdoc,p,nbCentroides):
+    """Percentile approché des scores du terme sur tous les documents du corpus.
+
+    Les scores sont résumés au fil de l'eau par au plus environ nbCentroides
+    centroïdes (valeur moyenne, poids), plus fins aux extrémités qu'au milieu
+    comme dans un t-digest. Les documents qui ne contiennent pas le terme ont
+    un score de 0, les plus petits car les scores sont positifs : ils sont
+    gardés à part comme une masse exacte en 0 et ne sont jamais fusionnés
+    avec les autres scores. Sans fusion, le résultat est celui de
+    numpy.percentile sur les scores complétés par des zéros.
+
+    Parameters
+    ----------
+    valeurs : iterable[float]
+        Scores du terme dans les documents qui le contiennent
+
+    nbdoc : int
+        Nombre de documents du corpus
+
+    p : float
+        Le percentile voulu, entre 0 et 100
+
+    nbCentroides : int
+        Nombre de centroïdes gardés pour résumer les scores
+
+    Returns
+    -------
+    float
+        Le percentile approché
+    """
+    centroides = []
+    tampon = []
+    nb = 0
+    for v in valeurs:
+        tampon.append(v)
+        nb += 1
+        if(len(tampon) >= nbCentroides):
+            centroides = fusionnerCentroides(centroides,tampon,nbCentroides)
+            tampon = []
+    centroides = fusionnerCentroides(centroides,tampon,nbCentroides)
+    return quantileCentroides(centroides,p/100,max(nbdoc-nb,0))
+
+def fusionnerCentroides(centroides,tampon,nbCentroides):
+    """Ajoute des valeurs aux centroïdes puis fusionne les centroïdes voisins
+    tant que leur poids reste sous la limite du t-digest, 4*N*q*(1-q)/nbCentroides
+    où q est la position du centroïde dans la distribution.
+
+    Parameters
+    ----------
+    centroides : list[tuple[float,int]]
+        Centroïdes (valeur, poids) triés par valeur
+
+    tampon : list[float|tuple[float,int]]
+        Valeurs à ajouter, ou centroïdes (valeur, poids)
+
+    nbCentroides : int
+        Nombre de centroïdes visé
+
+    Returns
+    -------
+    list[tuple[float,int]]
+        Les nouveaux centroïdes triés par valeur
+    """
+    tous = sorted(centroides+[v if isinstance(v,tuple) else (v,1) for v in tampon])
+    total = sum(poids for _,poids in tous)
+    fusionnes = []
+    cumul = 0
+    for valeur,poids in tous:
+        if(fusionnes):
+            valeurPrec,poidsPrec = fusionnes[-1]
+            poidsFusion = poidsPrec+poids
+            q = (cumul-poidsPrec+poidsFusion/2)/total
+            if(poidsFusion <= max(1,4*total*q*(1-q)/nbCentroides)):
+                fusionnes[-1] = (valeurPrec+(valeur-valeurPrec)*poids/poidsFusion,poidsFusion)
+                cumul += poids
+                continue
+        fusionnes.append((valeur,poids))
+        cumul += poids
+    return fusionnes
+
+def quantileCentroides(centroides,q,nbZeros=0):
+    """Estime un quantile par interpolation linéaire entre les positions des
+    valeurs triées, comme numpy.percentile. Un centroïde de poids w occupe w
+    positions et sa valeur est placée au milieu de celles-ci. Les nbZeros
+    zéros occupent les premières positions.
+
+    Parameters
+    ----------
+    centroides : list[tuple[float,int]]
+        Centroïdes (valeur, poids) triés par valeur, de valeurs positives
+
+    q : float
+        Le quantile voulu, entre 0 et 1
+
+    nbZeros : int
+        Nombre de valeurs 0 en plus des centroïdes
+
+    Returns
+    -------
+    float
+        Le quantile approché
+    """
+    #points (position, valeur), les zéros sont une masse exacte qui finit à nbZeros-1
+    points = []
+    if(nbZeros > 0):
+        points.append((nbZeros-1,0.0))
+    cumul = nbZeros
+    for valeur,poids in centroides:
+        points.append((cumul+(poids-1)/2,valeur))
+        cumul += poids
+    if(not points):
+        return 0.0
+    cible = q*(cumul-1)
+    positions = [position for position,_ in points]
+    i = bisect.bisect_left(positions,cible)
+    if(i == 0):
+        return points[0][1]
+    if(i == len(points)):
+        return points[-1][1]
+    (x0,v0),(x1,v1) = points[i-1],points[i]
+    return v0+(v1-v0)*(cible-x0)/(x1-x0)
+
+FONCTION_AGREGATION = {FORMULES_AGREGATION.MAX : maximum, \
+                       FORMULES_AGREGATION.SUM : somme, \
+                       FORMULES_AGREGATION.MEAN : moyenne}
+
+def fonctionAgregation(config):
+    """Renvoie la formule d'agrégation de la config, avec ses paramètres
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    callable[[iterable[float],int],float]
+        La formule, qui prend les scores d'un terme et le nombre de documents
+    """
+    formule = config.getFormuleAgregation()
+    if(formule == FORMULES_AGREGATION.TOPK_MEAN):
+        return partial(moyenneTopK,k=config.getAgregationK())
+    if(formule == FORMULES_AGREGATION.PERCENTILE):
+        return partial(percentile,p=config.getAgregationPercentile(),
+                       nbCentroides=config.getAgregationCentroides())
+    return FONCTION_AGREGATION[formule]
@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
-from statistics import mean
-from config.config import FORMULES_AGREGATION
-
-FONCTION_AGREGATION = {FORMULES_AGREGATION.MAX : max, \
-                       FORMULES_AGREGATION.SUM : sum, \
-                       FORMULES_AGREGATION.MEAN : mean}
+import heapq
+from config.config import MOTEURS_SCORING
+from classeur import moteurVectoriel
+from classeur.agregations import fonctionAgregation
 
 class Classeur:
     """Cette classe permet d'attribuer un score aux termes d'un corpus"""
+    #True pour les classeurs dont le score est combiné avec la C-value si
+    #CVALUE est vrai dans la config
+    combinableCValue = False
+
     def __init__(self,config):
         """Constructeur de la classe Classeur
 
@@ -18,7 +20,10 @@ class Classeur:
             de la configuration
         """
         self.config=config
-        self.formuleAgregation = FONCTION_AGREGATION[config.getFormuleAgregation()]
+        self.formuleAgregation = fonctionAgregation(config)
+        #le calcul vectoriel n'est utilisé que si numpy est installé
+        self.vectoriel = config.getMoteurScoring() == MOTEURS_SCORING.VECTORIEL and \
+                         moteurVectoriel.estDisponible()
 
     def noter(self,indexCorpus):
         """Méthode qui attribue un score à chacun des termes du corpus
@@ -40,26 +45,78 @@ class Classeur:
         """
         raise NotImplementedError
 
-    def classer(self,indexCorpus):
-        """Attribue un score aux termes du corpus puis les trie en fonction du
-        score, puis par ordre alphabétique si égalité sur le score
+    def noterSansCValue(self,indexCorpus):
+        """Attribue un score à chacun des termes du corpus, sans le combiner
+        avec la C-value. Pour les classeurs qui ne sont pas combinables avec la
+        C-value c'est le score donné par noter.
+
+        Parameters
+        ----------
+        indexCorpus : Indexation
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores en valeur
+        """
+        return self.noter(indexCorpus)
+
+    def classer(self,indexCorpus,topK=None):
+        """Attribue un score aux termes du corpus puis les trie avec la méthode
+        trier
 
         Parameters
         ----------
         indexCorpus : Indexation
             L'index du corpus
 
+        topK : int
+            Nombre de termes à garder, les mieux notés. Si None on prend la
+            valeur de la config, si 0 on garde tous les termes.
+
         Returns
         -------
         List[tuple[tuple[str*],float]]
             Liste triée par ordre décroissant des scores des termes
         """
         #on récupère le dictionnaire terme/score
-        dictTerme = self.noter(indexCorpus)
-        #D'abord le tri par ordre alphabétique
-        tmp = sorted(dictTerme.items(), key=lambda t: ' '.join(t[0]))
-        #Puis le tri par score
-        return sorted(tmp, key=lambda t: t[1], reverse=True)
+        return self.trier(self.noter(indexCorpus),topK)
+
+    def trier(self,dictTerme,topK=None):
+        """Trie les termes en fonction de leur score, puis par ordre
+        alphabétique si égalité sur le score
+
+        Si on ne garde que les topK premiers termes, on cherche d'abord le score
+        du topK-ième terme sans trier, puis on ne trie que les termes qui ont
+        au moins ce score.
+
+        Parameters
+        ----------
+        dictTerme : dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores en valeur
+
+        topK : int
+            Nombre de termes à garder, les mieux notés. Si None on prend la
+            valeur de la config, si 0 on garde tous les termes.
+
+        Returns
+        -------
+        List[tuple[tuple[str*],float]]
+            Liste triée par ordre décroissant des scores des termes
+        """
+        if(topK is None):
+            topK = self.config.getTopK()
+        #tri par score décroissant puis par ordre alphabétique
+        cle = lambda t: (-t[1],' '.join(t[0]))
+
+        if(topK == 0 or topK >= len(dictTerme)):
+            return sorted(dictTerme.items(), key=cle)
+
+        #seuls les termes qui ont au moins le score du topK-ième peuvent être gardés
+        seuil = heapq.nlargest(topK,dictTerme.values())[-1]
+        candidats = [t for t in dictTerme.items() if t[1] >= seuil]
+        return sorted(candidats, key=cle)[:topK]
 
     def normaliserScoreClassement(self,dictTermesScores):
         """Normalise en place le score des termes du dictionnaire passé en paramètre.
@@ -71,10 +128,16 @@ class Classeur:
         dictTermesScores : dict[tuples[str*],float]
             Dictionnaire du score pour un terme
         """
+        if(not dictTermesScores):
+            return
         scoremax = max(dictTermesScores.values())
         scoremin = min(dictTermesScores.values())
         for terme in dictTermesScores.keys():
-            dictTermesScores[terme] = (dictTermesScores[terme]-scoremin) / (scoremax-scoremin)
+            if(scoremax-scoremin == 0):
+                #cas particulier où tous les termes ont le même score, comme pour normaliserIndex
+                dictTermesScores[terme] = 1
+            else:
+                dictTermesScores[terme] = (dictTermesScores[terme]-scoremin) / (scoremax-scoremin)
             
     def agregerScore(self,nbdoc,indexInvScore):
         """Renvoie un dictionnaire de scores pour les termes du dictionnaire passé en argument, 
@@ -83,7 +146,8 @@ class Classeur:
         Parameters
         ----------
         nbdoc : int 
-            nombre de document dans le corpus. Important pour la moyenne.
+            nombre de document dans le corpus. Important pour la moyenne et
+            le percentile.
             
         indexInvScore : dict[tuple[str*],dict[int,float]] 
             Score d'un terme dans les documents
@@ -93,11 +157,6 @@ class Classeur:
         dict[tuple[str*],float]
             Dictionnaire de score agrégé pour un terme
         """
-        if(self.config.getFormuleAgregation() == FORMULES_AGREGATION.MEAN):
-            #on ajoute autant de zéros qu'il y a de document où le terme n'apparait pas
-            return {terme : self.formuleAgregation(list(dictDocScore.values())+[0]*(nbdoc-len(dictDocScore)))  \
-                 for terme,dictDocScore in indexInvScore.items()}
-                 
-        return {terme : self.formuleAgregation(dictDocScore.values())  \
+        #les documents où le terme n'apparait pas comptent pour 0 sans être ajoutés
+        return {terme : self.formuleAgregation(dictDocScore.values(),nbdoc)  \
                  for terme,dictDocScore in indexInvScore.items()}
-        
\ No newline at end of file
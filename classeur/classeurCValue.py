@@ -21,6 +21,9 @@ class ClasseurCValue(Classeur):
     def noter(self,indexCorpus):
         """Méthode qui attribue comme score aux termes, leur C-value.
 
+        Les termes imbriqués et la fréquence des termes sont donnés par l'index
+        des termes imbriqués de l'indexeur, calculé une seule fois par indexeur.
+
         Parameters
         ----------
         indexCorpus : Indexation
@@ -31,21 +34,20 @@ class ClasseurCValue(Classeur):
         dict[tuple[str*],float]
             Dictionnaire avec les termes en clé et les scores en valeur
         """
-        dictTermesFreq = {terme : sum(dictDocFreq.values()) \
-                         for terme,dictDocFreq in indexCorpus.getIndexInv().items()}
+        imbrication = indexCorpus.getIndexImbrication()
+        freqs = imbrication.getFreqs()
 
         dictTermeScore = dict()
-        termesImb = self.calculTermesImbriques(set(dictTermesFreq.keys()))
-
-        for terme,ensSousTermes in termesImb.items():
+        for idTerme,terme in enumerate(imbrication.getTermes()):
             nbmot = len(terme)
-            if(len(ensSousTermes)==0):
-                score = dictTermesFreq[terme]
+            conteneurs = imbrication.getConteneurs(idTerme)
+            if(len(conteneurs)==0):
+                score = freqs[idTerme]
             else:
                 somme=0
-                for sousTerme in ensSousTermes:
-                    somme += dictTermesFreq[sousTerme]
-                score = (dictTermesFreq[terme] - (1/len(ensSousTermes)) * somme )
+                for idConteneur in conteneurs:
+                    somme += freqs[idConteneur]
+                score = (freqs[idTerme] - (1/len(conteneurs)) * somme )
             score *=  math.log2(nbmot+1)#+1 pour les single-word
             dictTermeScore[terme] = score
 
@@ -53,32 +55,7 @@ class ClasseurCValue(Classeur):
         return dictTermeScore
 
 
-    def calculTermesImbriques(self,ensTermes):
-        """Calcule des termes imbriqués à partir d'un ensemble de termes
-
-        Returns
-        -------
-        dict[tuple[str*],set[tuple[str*]]]
-            Dictionnaire avec en clé un terme et en valeur tous les termes qui
-            sont imbriqués dans le terme en clé.
-        """
-        dictTermeImb = dict()
-        for terme in ensTermes:
-            if(terme not in dictTermeImb):
-                dictTermeImb[terme] = set()
-            nbmot = len(terme)
-            #recherche de tout les sous-termes possible et de leur existance
-            for taille in range(1,nbmot):
-                for i in range(0,nbmot-taille+1):
-                    sousterme = terme[i:i+taille]
-                    if(sousterme in ensTermes):
-                        if(sousterme not in dictTermeImb):
-                            dictTermeImb[sousterme] = {terme}
-                        else:
-                            dictTermeImb[sousterme].add(terme)
-        return dictTermeImb
-
-    def scoreAvecCValue(self,indexCorpus,dictTermesScores):
+    def scoreAvecCValue(self,indexCorpus,dictTermesScores,cValue=None):
         """Calcule la moyenne géométrique avec le score donné en paramètre et
         la C-value.
 
@@ -87,13 +64,18 @@ class ClasseurCValue(Classeur):
         dictTermesScores : dict[tuples[str*],float]
             Dictionnaire du score pour un terme
 
+        cValue : dict[tuples[str*],float]
+            La C-value des termes de l'index si elle est déjà calculée, sinon
+            elle est calculée avec noter
+
         Returns
         -------
         dict[tuple[str*],float]
             Dictionnaire de terme en clé et score en valeur
         """
         dictTermeScoreFinale = dict()
-        cValue = self.noter(indexCorpus)
+        if(cValue is None):
+            cValue = self.noter(indexCorpus)
         for terme,score in dictTermesScores.items():
             scoreCValue = cValue[terme]
             if(scoreCValue+score == 0):
@@ -101,3 +83,27 @@ class ClasseurCValue(Classeur):
             else:
                 dictTermeScoreFinale[terme] = (2*scoreCValue*score)/(scoreCValue+score)
         return dictTermeScoreFinale
+
+    def combinerCValue(self,indexCorpus,dictTermesScores,cValue=None):
+        """Combine le score donné en paramètre avec la C-value puis normalise
+        le résultat. Le dictionnaire passé en paramètre n'est pas modifié.
+
+        Parameters
+        ----------
+        indexCorpus : Indexation
+            L'index du corpus
+
+        dictTermesScores : dict[tuples[str*],float]
+            Dictionnaire du score pour un terme
+
+        cValue : dict[tuples[str*],float]
+            La C-value des termes de l'index si elle est déjà calculée
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire de terme en clé et score en valeur
+        """
+        dictTermeScoreFinale = self.scoreAvecCValue(indexCorpus,dictTermesScores,cValue)
+        self.normaliserScoreClassement(dictTermeScoreFinale)
+        return dictTermeScoreFinale
@@ -30,5 +30,6 @@ class ClasseurFrequence(Classeur):
             Dictionnaire de terme en clé et score en valeur
         """
         indexInv = indexCorpus.getIndexInv()
-        return {terme : self.formuleAgregation(dictDocFreq.values()) \
+        #on n'agrège que sur les documents qui contiennent le terme
+        return {terme : self.formuleAgregation(dictDocFreq.values(),len(dictDocFreq)) \
                 for terme,dictDocFreq in indexInv.items()}
@@ -1,13 +1,42 @@
 # -*- coding: utf-8 -*-
 from classeur.classeur import Classeur
 from classeur.classeurCValue import ClasseurCValue
+from config.config import METHODES_SCORING
 from classeur.outilsClasseur import normaliserIndex, inverserIndex
+from classeur import moteurVectoriel
+
+#Poids d'un terme dans un document avant multiplication par l'idf, en fonction
+#de sa fréquence tf, de la longueur normalisée du document (1-b+b*dl/avgdl) et
+#des paramètres k et delta. Les formules s'appliquent aussi aux tableaux numpy.
+FORMULE_OKAPI = {METHODES_SCORING.OKAPI : \
+                     lambda tf,longueur,k,delta : (tf*(k+1))/(tf+k*longueur),\
+                 METHODES_SCORING.OKAPI_PLUS : \
+                     lambda tf,longueur,k,delta : (tf*(k+1))/(tf+k*longueur)+delta,\
+                 METHODES_SCORING.OKAPI_L : \
+                     lambda tf,longueur,k,delta : ((k+1)*(tf/longueur+delta))/(k+tf/longueur+delta)}
+
+#Variantes dont l'idf est borné à 0 pour que delta reste une borne inférieure du score
+METHODES_IDF_POSITIF = [METHODES_SCORING.OKAPI_PLUS,METHODES_SCORING.OKAPI_L]
 
 class ClasseurOkapi(Classeur):
     """Cette classe attribue comme score aux termes, leur score okapi
     d'après un corpus de référence et selon l'agrégation choisie dans la config.
+
+    Il y a trois formules, on peut choisir dans le fichier de config.
+        - OKAPI -> BM25
+        - OKAPI_PLUS -> BM25+ : ajoute delta au poids de chaque terme présent
+            pour que les longs documents ne soient pas trop pénalisés
+        - OKAPI_L -> BM25L : ajoute delta à la fréquence normalisée par la
+            longueur du document
+
+    L'idf d'okapi, log((N-n+0.5)/(n+0.5)), est négatif pour les termes présents
+    dans plus de la moitié des documents de référence : delta rendrait alors
+    leur score encore plus négatif. Pour OKAPI_PLUS et OKAPI_L l'idf est donc
+    borné à 0, BM25 garde l'idf d'origine.
     """
-    def __init__(self,config,indexCorpusRef):
+    combinableCValue = True
+
+    def __init__(self,config,statsRef):
         """Constructeur de la classe ClasseurOkapi
 
         Parameters
@@ -16,13 +45,38 @@ class ClasseurOkapi(Classeur):
              Objet qui contient tous les paramètres de la configuration de
              l'extraction.
 
-        indexCorpusRef : Indexeur
-            L'index du corpus de référence qui permet de calculer l'idf pour okapi.
+        statsRef : StatistiquesReference
+            Les statistiques du corpus de référence qui permettent de calculer l'idf pour okapi.
+            Un Indexeur du corpus de référence convient aussi.
         """
         super().__init__(config)
-        self.indexCorpusRef = indexCorpusRef
-        self.k = 2.0
-        self.b = 0.75
+        self.statsRef = statsRef
+        if(config.getMethodeScoring() not in list(FORMULE_OKAPI.keys())):
+            raise RuntimeError('Le fichier de configuration ne correspond pas à une methode de scoring okapi')
+        self.formuleOkapi = FORMULE_OKAPI[config.getMethodeScoring()]
+        self.k = config.getOkapiK()
+        self.b = config.getOkapiB()
+        self.delta = config.getOkapiDelta()
+        self.idfPositif = config.getMethodeScoring() in METHODES_IDF_POSITIF
+
+    def getIDFTerme(self,terme):
+        """Renvoie l'idf pour okapi du terme d'après le corpus de référence,
+        borné à 0 pour OKAPI_PLUS et OKAPI_L.
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Le terme dont on veut l'idf.
+
+        Returns
+        -------
+        float
+            L'idf du terme
+        """
+        idf = self.statsRef.getIDFOkapiTerme(terme)
+        if(self.idfPositif):
+            return max(idf,0.0)
+        return idf
 
     def noter(self,indexCorpus):
         """Méthode qui attribue un score aux termes.
@@ -30,18 +84,91 @@ class ClasseurOkapi(Classeur):
         config, normalisé par document puis pris selon l'agrégation choisie
         dans la config.
         """
+        dictTermesOkapi = self.noterSansCValue(indexCorpus)
+
+        #Calcul avec ou sans c-value selon la config
+        if(self.config.getCValue()):
+            dictTermesOkapi = ClasseurCValue(self.config).combinerCValue(indexCorpus,dictTermesOkapi)
+
+        return dictTermesOkapi
+
+    def noterSansCValue(self,indexCorpus):
+        """Calcule le score okapi agrégé et normalisé des termes, sans la C-value.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores en valeur
+        """
+        if(self.vectoriel):
+            dictTermesOkapi = self.noterVectoriel(indexCorpus)
+        else:
+            dictTermesOkapi = self.noterParDocument(indexCorpus)
+
+        #Fait une normalisation sur le score final avant de le retourner
+        self.normaliserScoreClassement(dictTermesOkapi)
+        return dictTermesOkapi
+
+    def noterVectoriel(self,indexCorpus):
+        """Calcule le score okapi agrégé des termes avec numpy, sur tout l'index
+        à la fois. La longueur normalisée de chaque document n'est calculée
+        qu'une fois.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores agrégés en valeur
+        """
+        np = moteurVectoriel.np
+        avgdl = self.statsRef.getNbMoyenMot()
+
+        def poidsOccurrences(index,debuts,colonnes,frequences):
+            dl = np.array([index.getNbMotDocument(iddoc) for iddoc in index.getIdsDoc()],dtype=np.int64)
+            longueurs = 1-self.b+self.b*(dl/avgdl)
+            #longueur normalisée du document de chaque occurrence
+            longueursOccurrences = np.repeat(longueurs,np.diff(debuts))
+            return self.formuleOkapi(frequences,longueursOccurrences,self.k,self.delta)
+
+        return moteurVectoriel.noterVectoriel(indexCorpus,self.config.getFormuleAgregation(),self.formuleAgregation,
+                                              self.getIDFTerme,poidsOccurrences)
+
+    def noterParDocument(self,indexCorpus):
+        """Calcule le score okapi agrégé des termes document par document.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores agrégés en valeur
+        """
         index = indexCorpus.getIndex()
-        avgdl = self.indexCorpusRef.getCorpus().getNbMoyenMot()
+        avgdl = self.statsRef.getNbMoyenMot()
 
         #on construit l'index mais avec comme valeur d'okapi depuis l'index du corpus
         okapiIndex = dict()
         for doc,dictTermeFreq in index.items():
+            #la longueur normalisée ne dépend que du document
+            dl = indexCorpus.getNbMotDocument(doc)
+            longueur = 1-self.b+self.b*(dl/avgdl)
             #dict[tuples[str*],float] -> dictionnaire du score okapi(en valeur) pour chaque terme(en clé) dans le doc
             tmp = dict()
             for term, freq in dictTermeFreq.items():
-                idf = self.indexCorpusRef.getIDFOkapiTerme(term)
-                dl = indexCorpus.getCorpus().getDocumentById(doc).getNbMot()
-                okapi = (freq * (self.k + 1))/(freq + (self.k * (1-self.b+self.b*(dl/avgdl))))
+                idf = self.getIDFTerme(term)
+                okapi = self.formuleOkapi(freq,longueur,self.k,self.delta)
                 tmp[term] = idf*okapi
             okapiIndex[doc] = tmp
 
@@ -53,15 +180,4 @@ class ClasseurOkapi(Classeur):
         okapiIndexInv = inverserIndex(okapiIndex)
 
         #Agrège les résultats
-        dictTermesOkapi = self.agregerScore(indexCorpus.getCorpus().size(),okapiIndexInv)
-
-        #Fait une normalisation sur le score final avant de le retourner
-        self.normaliserScoreClassement(dictTermesOkapi)
-
-        #Calcul avec ou sans c-value selon la config
-        if(self.config.getCValue()):
-            cValue = ClasseurCValue(self.config)
-            dictTermesOkapi = cValue.scoreAvecCValue(indexCorpus,dictTermesOkapi)
-            self.normaliserScoreClassement(dictTermesOkapi)
-
-        return dictTermesOkapi
+        return self.agregerScore(indexCorpus.getCorpus().size(),okapiIndexInv)
@@ -4,10 +4,15 @@ from classeur.classeur import Classeur
 from classeur.classeurCValue import ClasseurCValue
 from config.config import METHODES_SCORING
 from classeur.outilsClasseur import normaliserIndex, inverserIndex
+from classeur import moteurVectoriel
 
 FORMULE_TFIDF = {METHODES_SCORING.TFIDF_STANDARD : lambda tf,idf : tf*idf,\
                  METHODES_SCORING.TFIDF_LOG : lambda tf,idf : (1+math.log(tf))*idf}
 
+#Partie de la formule qui ne dépend que du tf, pour le calcul vectoriel
+FACTEUR_TF = {METHODES_SCORING.TFIDF_STANDARD : lambda tf : tf,\
+              METHODES_SCORING.TFIDF_LOG : lambda tf : 1+math.log(tf)}
+
 class ClasseurTFIDF(Classeur):
     """Cette classe attribue comme score aux termes, leur tfidf d'après un
     corpus de référence et selon l'agrégation choisie dans la config.
@@ -17,7 +22,9 @@ class ClasseurTFIDF(Classeur):
         - Log -> (1+log(tf))*idf : accorde moins d'importance aux tf que dans
             la formule standard
     """
-    def __init__(self,config,indexCorpusRef):
+    combinableCValue = True
+
+    def __init__(self,config,statsRef):
         """Constructeur de la classe ClasseurTFIDF
 
         Parameters
@@ -26,14 +33,16 @@ class ClasseurTFIDF(Classeur):
              Objet qui contient tous les paramètres de la configuration de
              l'extraction.
 
-        indexCorpusRef : Indexeur
-            L'index du corpus de référence qui permet de calculer l'idf.
+        statsRef : StatistiquesReference
+            Les statistiques du corpus de référence qui permettent de calculer l'idf.
+            Un Indexeur du corpus de référence convient aussi.
         """
         super().__init__(config)
-        self.indexCorpusRef = indexCorpusRef
+        self.statsRef = statsRef
         if(config.getMethodeScoring() not in list(FORMULE_TFIDF.keys())):
             raise RuntimeError('Le fichier de configuration ne correspond pas à une methode de scoring tfidf')
         self.formuleTFIDF = FORMULE_TFIDF[config.getMethodeScoring()]
+        self.facteurTF = FACTEUR_TF[config.getMethodeScoring()]
 
     def noter(self,indexCorpus):
         """Méthode qui attribue un score aux termes.
@@ -41,6 +50,67 @@ class ClasseurTFIDF(Classeur):
         le fichier de config, normalisé par document puis pris selon l'agrégation
         choisie dans la config.
         """
+        dictTermesTFIDF = self.noterSansCValue(indexCorpus)
+
+        #Calcul avec ou sans c-value selon la config
+        if(self.config.getCValue()):
+            dictTermesTFIDF = ClasseurCValue(self.config).combinerCValue(indexCorpus,dictTermesTFIDF)
+
+        return dictTermesTFIDF
+
+    def noterSansCValue(self,indexCorpus):
+        """Calcule le score tfidf agrégé et normalisé des termes, sans la C-value.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores en valeur
+        """
+        if(self.vectoriel):
+            dictTermesTFIDF = self.noterVectoriel(indexCorpus)
+        else:
+            dictTermesTFIDF = self.noterParDocument(indexCorpus)
+
+        #Fait une normalisation sur le score final avant de le retourner
+        self.normaliserScoreClassement(dictTermesTFIDF)
+        return dictTermesTFIDF
+
+    def noterVectoriel(self,indexCorpus):
+        """Calcule le tfidf agrégé des termes avec numpy, sur tout l'index à la fois.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores agrégés en valeur
+        """
+        return moteurVectoriel.noterVectoriel(indexCorpus,self.config.getFormuleAgregation(),self.formuleAgregation,
+            self.statsRef.getIDFTerme,
+            lambda index,debuts,colonnes,frequences : \
+                moteurVectoriel.appliquerParValeur(self.facteurTF,frequences))
+
+    def noterParDocument(self,indexCorpus):
+        """Calcule le tfidf agrégé des termes document par document.
+
+        Parameters
+        ----------
+        indexCorpus : Indexeur
+            L'index du corpus
+
+        Returns
+        -------
+        dict[tuple[str*],float]
+            Dictionnaire avec les termes en clé et les scores agrégés en valeur
+        """
         index = indexCorpus.getIndex()
 
         #on construit l'index mais avec comme valeur le tfidf depuis l'index du corpus
@@ -49,7 +119,7 @@ class ClasseurTFIDF(Classeur):
             #dict[tuples[str*],float] -> dictionnaire du score tfidf(en valeur) pour chaque terme(en clé) dans le doc
             tmp = dict()
             for term, tf in dictTermeFreq.items():
-                idf = self.indexCorpusRef.getIDFTerme(term)
+                idf = self.statsRef.getIDFTerme(term)
                 tfidf = self.formuleTFIDF(tf,idf)
                 tmp[term]=tfidf
             tfidfIndex[doc] = tmp
@@ -62,15 +132,4 @@ class ClasseurTFIDF(Classeur):
         tfidfIndexInv = inverserIndex(tfidfIndex)
 
         #Agrège les résultats
-        dictTermesTFIDF = self.agregerScore(indexCorpus.getCorpus().size(),tfidfIndexInv)
-
-        #Fait une normalisation sur le score final avant de le retourner
-        self.normaliserScoreClassement(dictTermesTFIDF)
-
-        #Calcul avec ou sans c-value selon la config
-        if(self.config.getCValue()):
-            cValue = ClasseurCValue(self.config)
-            dictTermesTFIDF = cValue.scoreAvecCValue(indexCorpus,dictTermesTFIDF)
-            self.normaliserScoreClassement(dictTermesTFIDF)
-
-        return dictTermesTFIDF
+        return self.agregerScore(indexCorpus.getCorpus().size(),tfidfIndexInv)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Dans ce module on trouve le calcul vectoriel des scores avec numpy. L'index est
+vu comme une matrice creuse documents x termes : pour chaque document, les
+positions de ses termes vont de debuts[doc] à debuts[doc+1] dans les tableaux
+colonnes (id du terme) et valeurs.
+
+Les opérations sont faites dans le même ordre que le calcul document par
+document des classeurs, les scores obtenus sont donc exactement les mêmes.
+"""
+from config.config import FORMULES_AGREGATION
+try:
+    import numpy as np
+except ImportError:
+    #sans numpy les classeurs calculent les scores document par document
+    np = None
+
+def estDisponible():
+    """Indique si le calcul vectoriel est possible
+
+    Returns
+    -------
+    bool
+        True si numpy est installé
+    """
+    return np is not None
+
+def matriceIndex(indexCorpus):
+    """Renvoie l'index du corpus sous la forme d'une matrice creuse
+
+    Parameters
+    ----------
+    indexCorpus : Indexeur
+        L'index du corpus
+
+    Returns
+    -------
+    tuple[Indexeur,ndarray,ndarray,ndarray]
+        L'index sans documents ajoutés ou retirés (compacté si besoin), le
+        début des termes de chaque document, l'id des termes et leur fréquence
+    """
+    if(indexCorpus.aDelta()):
+        indexCorpus = indexCorpus.compacte()
+    debutsDoc,termesDoc,freqsDoc = indexCorpus.getTableauxDoc()
+    debuts = np.frombuffer(debutsDoc,dtype=np.int64)
+    colonnes = np.frombuffer(termesDoc,dtype=np.int32).astype(np.intp)
+    frequences = np.frombuffer(freqsDoc,dtype=np.int32)
+    return indexCorpus,debuts,colonnes,frequences
+
+def appliquerParValeur(fonction,valeurs):
+    """Applique une fonction python à chaque valeur distincte du tableau puis
+    renvoie le résultat pour chaque élément. Permet d'utiliser math.log plutôt
+    que np.log pour obtenir exactement les mêmes valeurs qu'en python.
+
+    Parameters
+    ----------
+    fonction : callable[[int],float]
+        La fonction à appliquer
+
+    valeurs : ndarray
+        Les valeurs, avec beaucoup de répétitions (des fréquences)
+
+    Returns
+    -------
+    ndarray
+        Le résultat de la fonction pour chaque élément de valeurs
+    """
+    distinctes,inverse = np.unique(valeurs,return_inverse=True)
+    table = np.array([fonction(int(v)) for v in distinctes],dtype=np.float64)
+    return table[inverse]
+
+def normaliserParDocument(scores,debuts):
+    """Recentre entre 0 et 1 les scores de chaque document, comme normaliserIndex.
+    Si tous les termes d'un document ont le même score, ils ont tous 1.
+
+    Parameters
+    ----------
+    scores : ndarray
+        Score de chaque terme de chaque document
+
+    debuts : ndarray
+        Début des termes de chaque document dans scores
+
+    Returns
+    -------
+    ndarray
+        Les scores normalisés
+    """
+    if(len(scores) == 0):
+        return scores
+    longueurs = np.diff(debuts)
+    #les documents sans terme n'ont pas de score à normaliser
+    nonVides = longueurs > 0
+    debutsNonVides = debuts[:-1][nonVides]
+    scoremax = np.maximum.reduceat(scores,debutsNonVides)
+    scoremin = np.minimum.reduceat(scores,debutsNonVides)
+    etendue = scoremax-scoremin
+
+    docs = np.repeat(np.arange(len(debutsNonVides)),longueurs[nonVides])
+    etendueTerme = etendue[docs]
+    constant = etendueTerme == 0
+    with np.errstate(invalid='ignore',divide='ignore'):
+        normalises = (scores-scoremin[docs])/etendueTerme
+    normalises[constant] = 1.0
+    return normalises
+
+def agreger(scores,colonnes,nbTermes,nbdoc,formuleAgregation,fonctionAgregation):
+    """Agrège les scores de chaque terme dans les documents, comme agregerScore.
+    MAX et SUM sont calculés avec numpy, les autres formules avec leur
+    fonction python sur les scores regroupés par terme.
+
+    Parameters
+    ----------
+    scores : ndarray
+        Score de chaque terme de chaque document, document par document
+
+    colonnes : ndarray
+        L'id du terme de chaque score
+
+    nbTermes : int
+        Nombre de termes
+
+    nbdoc : int
+        Nombre de documents du corpus, utilisé pour la moyenne
+
+    formuleAgregation : FORMULES_AGREGATION
+        La formule d'agrégation
+
+    fonctionAgregation : callable[[iterable[float],int],float]
+        La fonction d'agrégation de la formule, voir classeur.agregations
+
+    Returns
+    -------
+    list[float]
+        Score agrégé de chaque terme, dans l'ordre des id
+    """
+    if(formuleAgregation == FORMULES_AGREGATION.MAX):
+        resultat = np.full(nbTermes,-np.inf)
+        np.maximum.at(resultat,colonnes,scores)
+        return resultat.tolist()
+
+    if(formuleAgregation == FORMULES_AGREGATION.SUM):
+        #add.at additionne les éléments dans l'ordre, donc document par document
+        resultat = np.zeros(nbTermes)
+        np.add.at(resultat,colonnes,scores)
+        return resultat.tolist()
+
+    #sinon on regroupe les scores par terme, dans l'ordre des documents
+    ordre = np.argsort(colonnes,kind='stable')
+    debutsTerme = np.searchsorted(colonnes[ordre],np.arange(nbTermes+1)).tolist()
+    scoresTries = scores[ordre].tolist()
+    return [fonctionAgregation(scoresTries[debutsTerme[t]:debutsTerme[t+1]],nbdoc) \
+            for t in range(nbTermes)]
+
+def noterVectoriel(indexCorpus,formuleAgregation,fonctionAgregation,poidsTerme,poidsOccurrences):
+    """Calcule le score agrégé de chaque terme du corpus. Le score d'un terme
+    dans un document est poidsOccurrences*poidsTerme(terme), normalisé par
+    document puis agrégé selon la formule.
+
+    Parameters
+    ----------
+    indexCorpus : Indexeur
+        L'index du corpus
+
+    formuleAgregation : FORMULES_AGREGATION
+        La formule d'agrégation
+
+    fonctionAgregation : callable[[iterable[float],int],float]
+        La fonction d'agrégation de la formule
+
+    poidsTerme : callable[[tuple[str*]],float]
+        Renvoie le poids d'un terme (son idf), appelée une fois par terme
+
+    poidsOccurrences : callable[[Indexeur,ndarray,ndarray,ndarray],ndarray]
+        Renvoie le poids de chaque occurrence d'un terme dans un document
+        depuis l'index et la matrice (debuts, colonnes, fréquences)
+
+    Returns
+    -------
+    dict[tuple[str*],float]
+        Dictionnaire avec les termes en clé et les scores en valeur
+    """
+    indexCorpus,debuts,colonnes,frequences = matriceIndex(indexCorpus)
+    termes = [indexCorpus.getTermeParId(idTerme) for idTerme in range(indexCorpus.getNbIdsTerme())]
+
+    poids = np.array([poidsTerme(terme) for terme in termes],dtype=np.float64)
+    scores = poidsOccurrences(indexCorpus,debuts,colonnes,frequences)*poids[colonnes]
+    scores = normaliserParDocument(scores,debuts)
+    scoresTermes = agreger(scores,colonnes,len(termes),indexCorpus.getNbDoc(),
+                           formuleAgregation,fonctionAgregation)
+    return dict(zip(termes,scoresTermes))
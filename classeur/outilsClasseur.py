@@ -14,6 +14,9 @@ def normaliserIndex(index):
     """
     
     for iddoc,dictTermesTfidf in index.items():
+        if(not dictTermesTfidf):
+            #document sans terme
+            continue
         scoremax = max(dictTermesTfidf.values())
         scoremin = min(dictTermesTfidf.values())
         for terme in dictTermesTfidf.keys():
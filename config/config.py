@@ -2,16 +2,76 @@
 import re
 import copy
 from enum import Enum
-from distutils.util import strtobool
 
 METHODES_EXTRACTION = Enum('METHODES_EXTRACTION', 'POSTAG NGRAMMES')
-METHODES_SCORING = Enum('METHODES_SCORING', 'FREQUENCE TFIDF_STANDARD TFIDF_LOG OKAPI')
-FORMULES_AGREGATION = Enum('FORMULES_AGREGATION', 'MAX SUM MEAN')
+METHODES_SCORING = Enum('METHODES_SCORING', 'FREQUENCE TFIDF_STANDARD TFIDF_LOG OKAPI OKAPI_PLUS OKAPI_L')
+FORMULES_AGREGATION = Enum('FORMULES_AGREGATION', 'MAX SUM MEAN TOPK_MEAN PERCENTILE')
+MOTEURS_SCORING = Enum('MOTEURS_SCORING', 'VECTORIEL PYTHON')
 
 PARAMS_OBLIGATOIRE = ['STEM','METHODEEXTRACTION','LONGUEURMIN','LONGUEURMAX',
                       'SEUILNBOCCMIN','METHODESCORING','FORMULEAGREGATION',
                       'CVALUE','CORPUSPATH','OUTPUTPATH']
 
+#Paramètres facultatifs avec leur valeur par défaut
+PARAMS_FACULTATIFS = {'TAILLELOT':'1000','NBPROCESSUS':'1','TAILLEBLOC':'0',
+                      'MODELESPACY':'fr_core_news_sm',
+                      'COMPOSANTSSPACY':'tok2vec,morphologizer,parser,attribute_ruler',
+                      'TAILLECACHESTEM':'100000','TAILLECACHEMOTS':'100000','TAILLECACHEREF':'1024',
+                      'MOTEURSCORING':'VECTORIEL','OKAPIK':'2.0','OKAPIB':'0.75',
+                      'OKAPIDELTA':'1.0','TOPK':'0','AGREGATIONK':'10',
+                      'AGREGATIONPERCENTILE':'90','AGREGATIONCENTROIDES':'100'}
+
+#Valeurs acceptées pour un booléen, les mêmes que distutils.util.strtobool
+#(distutils est long à importer et n'existe plus à partir de python 3.12)
+VALEURS_VRAI = ('y','yes','t','true','on','1')
+VALEURS_FAUX = ('n','no','f','false','off','0')
+
+def texteVersBool(valeur):
+    """Convertit la valeur d'un paramètre booléen du fichier de config.
+
+    Parameters
+    ----------
+    valeur : str
+        La valeur, sans tenir compte de la casse
+
+    Returns
+    -------
+    bool
+        Le booléen correspondant à la valeur
+
+    Raises
+    ------
+    ValueError
+        Si la valeur n'est pas un booléen valide
+    """
+    valeur = valeur.lower()
+    if(valeur in VALEURS_VRAI):
+        return True
+    if(valeur in VALEURS_FAUX):
+        return False
+    raise ValueError("valeur booléenne invalide %r" % (valeur,))
+
+def valeurTexte(valeur):
+    """Renvoie la valeur d'un paramètre donnée en python sous la forme du
+    fichier de config : le nom pour une énumération, les éléments séparés par
+    des virgules pour une liste.
+
+    Parameters
+    ----------
+    valeur : object
+        La valeur du paramètre
+
+    Returns
+    -------
+    str
+        La valeur comme dans le fichier de config
+    """
+    if(isinstance(valeur,Enum)):
+        return valeur.name
+    if(isinstance(valeur,(list,tuple))):
+        return ','.join(str(v) for v in valeur)
+    return str(valeur)
+
 class Config:
     """
     Objet de configuration des paramètres de l'extraction et du scoring de termes
@@ -41,6 +101,7 @@ class Config:
         La façon dont laquelle on attribue un score au termes. Soit juste la
         FREQUENCE, soit avec un TFIDF_STANDARD c'est-à-dire la formule est : tf*idf
         ou bien TFIDF_LOG formule : (1+log(tf))*idf, ou encore la methode OKAPI
+        (BM25) et ses variantes OKAPI_PLUS (BM25+) et OKAPI_L (BM25L)
 
     formuleAgregation : FORMULES_AGREGATION
         Quand il y a plusieurs documents dans le corpus on doit agréger le score
@@ -57,6 +118,66 @@ class Config:
 
     outputPath  : str
         Chemin du fichier de sortie dans lequel on écrira le résultat
+
+    tailleLot : int
+        (facultatif) Nombre de documents traités ensemble lors de l'extraction
+        par lots. Avec plusieurs processus c'est la taille maximale d'un paquet,
+        les petits corpus sont découpés en paquets plus petits.
+
+    nbProcessus : int
+        (facultatif) Nombre de processus utilisés pour l'extraction.
+
+    tailleBloc : int
+        (facultatif) Taille maximale en caractères des blocs analysés par spacy.
+        Les textes plus longs sont découpés, si 0 seuls les textes plus longs
+        que la limite de spacy le sont.
+
+    modeleSpacy : str
+        (facultatif) Nom du modèle spacy utilisé pour le POS tagging.
+
+    composantsSpacy : list[str]
+        (facultatif) Composants du pipeline spacy à garder, les autres ne sont
+        pas exécutés. Si la liste est vide on garde tout le pipeline.
+
+    tailleCacheStem : int
+        (facultatif) Nombre maximal de mots dont on garde le stem en cache.
+
+    tailleCacheMots : int
+        (facultatif) Nombre maximal de mots dont l'extracteur garde les classes
+        (mot vide, ponctuation...) pour le nettoyage des termes.
+
+    tailleCacheRef : int
+        (facultatif) Taille maximale en Mo du cache des index du corpus de
+        référence.
+
+    moteurScoring : MOTEURS_SCORING
+        (facultatif) Si VECTORIEL, les scores sont calculés avec numpy sur
+        tout l'index à la fois, si numpy est installé. Si PYTHON, ils sont
+        calculés document par document.
+
+    okapiK : float
+        (facultatif) Paramètre k d'okapi, saturation de la fréquence des termes.
+
+    okapiB : float
+        (facultatif) Paramètre b d'okapi, entre 0 et 1, importance de la
+        longueur des documents.
+
+    okapiDelta : float
+        (facultatif) Paramètre delta des variantes OKAPI_PLUS et OKAPI_L.
+
+    topK : int
+        (facultatif) Nombre de termes gardés dans le classement, les mieux
+        notés. Si 0 on garde tous les termes.
+
+    agregationK : int
+        (facultatif) Nombre de meilleurs scores moyennés par l'agrégation TOPK_MEAN.
+
+    agregationPercentile : float
+        (facultatif) Percentile, entre 0 et 100, calculé par l'agrégation PERCENTILE.
+
+    agregationCentroides : int
+        (facultatif) Nombre de centroïdes qui résument les scores d'un terme
+        pour l'agrégation PERCENTILE, plus il y en a plus le percentile est précis.
     """
     def __init__(self,path):
         """Constructeur de la classe Config
@@ -95,37 +216,36 @@ class Config:
         #On retire les commentaires et les lignes vides
         lignesParams = re.findall('^[^#\n].*$',txt,flags=re.MULTILINE)
 
+        self.affecterParametres([ligne.split('=') for ligne in lignesParams])
+
+    def affecterParametres(self,couplesParams):
+        """Donne leur valeur à tous les paramètres : les paramètres facultatifs
+        absents prennent leur valeur par défaut, puis on vérifie que tous les
+        paramètres obligatoires sont présents et que les valeurs sont cohérentes.
+
+        Parameters
+        ----------
+        couplesParams : iterable[tuple[str,str]]
+            Les couples (paramètre, valeur), comme dans le fichier de config
+
+        Raises
+        ------
+        KeyError
+            Si la valeur d'un paramètre à choix n'est pas valide
+        ValueError
+            Si une valeur n'est pas valide, si un paramètre n'existe pas ou
+            si un paramètre obligatoire est absent
+        """
+        #Les paramètres facultatifs prennent d'abord leur valeur par défaut
+        couplesParams = list(PARAMS_FACULTATIFS.items()) + list(couplesParams)
+
         #Permet de verifier que tous les paramètres ont été entrés
         dictVerifParams = {param:False for param in PARAMS_OBLIGATOIRE}
 
         #On crée nos paramètres
-        for ligne in lignesParams:
-            param,valeur = ligne.split('=')
-            param,valeur = param.strip().upper(),valeur.strip()
-
-            if(param == 'STEM'):
-                self.stem = bool(strtobool(valeur))
-            elif(param == 'METHODEEXTRACTION'):
-                self.methodeExtraction = METHODES_EXTRACTION[valeur.upper()]
-            elif(param == 'LONGUEURMIN'):
-                self.longueurMin = int(valeur)
-            elif(param == 'LONGUEURMAX'):
-                self.longueurMax = int(valeur)
-            elif(param == 'SEUILNBOCCMIN'):
-                self.seuilNbOccMin = int(valeur)
-            elif(param == 'METHODESCORING'):
-                self.methodeScoring = METHODES_SCORING[valeur.upper()]
-            elif(param == 'FORMULEAGREGATION'):
-                self.formuleAgregation = FORMULES_AGREGATION[valeur.upper()]
-            elif(param == 'CVALUE'):
-                self.cValue = bool(strtobool(valeur))
-            elif(param == 'CORPUSPATH'):
-                self.corpusPath = valeur
-            elif(param == 'OUTPUTPATH'):
-                self.outputPath = valeur
-            else:
-                raise ValueError(param+" n'est pas un paramètre")
-
+        for param,valeur in couplesParams:
+            param,valeur = param.strip().upper(),str(valeur).strip()
+            self.affecterParametre(param,valeur)
             dictVerifParams[param] = True
 
         #On vérifie que tous les paramètres sont présents sinon on lève une exception
@@ -133,9 +253,123 @@ class Config:
             if(not present):
                 raise ValueError('Il manque au moins le paramètre suivant dans le fichier de config : '+param)
 
+        self.verifierParams()
+
+    def affecterParametre(self,param,valeur):
+        """Donne sa valeur à un paramètre
+
+        Parameters
+        ----------
+        param : str
+            Nom du paramètre, en majuscules
+
+        valeur : str
+            Valeur du paramètre, comme dans le fichier de config
+
+        Raises
+        ------
+        KeyError
+            Si la valeur d'un paramètre à choix n'est pas valide
+        ValueError
+            Si une valeur entière ou un booléen n'est pas valide, ou si le
+            paramètre n'existe pas
+        """
+        if(param == 'STEM'):
+            self.stem = texteVersBool(valeur)
+        elif(param == 'METHODEEXTRACTION'):
+            self.methodeExtraction = METHODES_EXTRACTION[valeur.upper()]
+        elif(param == 'LONGUEURMIN'):
+            self.longueurMin = int(valeur)
+        elif(param == 'LONGUEURMAX'):
+            self.longueurMax = int(valeur)
+        elif(param == 'SEUILNBOCCMIN'):
+            self.seuilNbOccMin = int(valeur)
+        elif(param == 'METHODESCORING'):
+            self.methodeScoring = METHODES_SCORING[valeur.upper()]
+        elif(param == 'FORMULEAGREGATION'):
+            self.formuleAgregation = FORMULES_AGREGATION[valeur.upper()]
+        elif(param == 'CVALUE'):
+            self.cValue = texteVersBool(valeur)
+        elif(param == 'CORPUSPATH'):
+            self.corpusPath = valeur
+        elif(param == 'OUTPUTPATH'):
+            self.outputPath = valeur
+        elif(param == 'TAILLELOT'):
+            self.tailleLot = int(valeur)
+        elif(param == 'NBPROCESSUS'):
+            self.nbProcessus = int(valeur)
+        elif(param == 'TAILLEBLOC'):
+            self.tailleBloc = int(valeur)
+        elif(param == 'MODELESPACY'):
+            self.modeleSpacy = valeur
+        elif(param == 'COMPOSANTSSPACY'):
+            self.composantsSpacy = [c.strip() for c in valeur.split(',') if c.strip()]
+        elif(param == 'TAILLECACHESTEM'):
+            self.tailleCacheStem = int(valeur)
+        elif(param == 'TAILLECACHEMOTS'):
+            self.tailleCacheMots = int(valeur)
+        elif(param == 'TAILLECACHEREF'):
+            self.tailleCacheRef = int(valeur)
+        elif(param == 'MOTEURSCORING'):
+            self.moteurScoring = MOTEURS_SCORING[valeur.upper()]
+        elif(param == 'OKAPIK'):
+            self.okapiK = float(valeur)
+        elif(param == 'OKAPIB'):
+            self.okapiB = float(valeur)
+        elif(param == 'OKAPIDELTA'):
+            self.okapiDelta = float(valeur)
+        elif(param == 'TOPK'):
+            self.topK = int(valeur)
+        elif(param == 'AGREGATIONK'):
+            self.agregationK = int(valeur)
+        elif(param == 'AGREGATIONPERCENTILE'):
+            self.agregationPercentile = float(valeur)
+        elif(param == 'AGREGATIONCENTROIDES'):
+            self.agregationCentroides = int(valeur)
+        else:
+            raise ValueError(param+" n'est pas un paramètre")
+
+    def verifierParams(self):
+        """Vérifie que les valeurs des paramètres sont cohérentes
+
+        Raises
+        ------
+        ValueError
+            Si une valeur n'est pas valide
+        """
         if(self.longueurMin>self.longueurMax):
             raise ValueError('LONGUEURMAX doit être supérieur ou égale à LONGUEURMIN')
 
+        if(self.tailleLot<1 or self.nbProcessus<1):
+            raise ValueError('TAILLELOT et NBPROCESSUS doivent être supérieurs ou égaux à 1')
+
+        if(self.tailleBloc<0):
+            raise ValueError('TAILLEBLOC doit être positif')
+
+        if(self.tailleCacheStem<1):
+            raise ValueError('TAILLECACHESTEM doit être supérieur ou égal à 1')
+
+        if(self.tailleCacheMots<1):
+            raise ValueError('TAILLECACHEMOTS doit être supérieur ou égal à 1')
+
+        if(self.tailleCacheRef<1):
+            raise ValueError('TAILLECACHEREF doit être supérieur ou égal à 1')
+
+        if(self.okapiK<0 or self.okapiDelta<0):
+            raise ValueError('OKAPIK et OKAPIDELTA doivent être positifs')
+
+        if(self.okapiB<0 or self.okapiB>1):
+            raise ValueError('OKAPIB doit être compris entre 0 et 1')
+
+        if(self.topK<0):
+            raise ValueError('TOPK doit être positif')
+
+        if(self.agregationK<1 or self.agregationCentroides<1):
+            raise ValueError('AGREGATIONK et AGREGATIONCENTROIDES doivent être supérieurs ou égaux à 1')
+
+        if(self.agregationPercentile<0 or self.agregationPercentile>100):
+            raise ValueError('AGREGATIONPERCENTILE doit être compris entre 0 et 100')
+
     def getStem(self):
         """Getter stem
 
@@ -192,7 +426,7 @@ class Config:
         Returns
         -------
         Enum METHODES_SCORING
-            FREQUENCE | TFIDF_STANDARD | TFIDF_LOG | OKAPI
+            FREQUENCE | TFIDF_STANDARD | TFIDF_LOG | OKAPI | OKAPI_PLUS | OKAPI_L
         """
         return self.methodeScoring
 
@@ -202,7 +436,7 @@ class Config:
         Returns
         -------
         Enum FORMULES_AGREGATION
-           MAX | SUM | MEAN
+           MAX | SUM | MEAN | TOPK_MEAN | PERCENTILE
         """
         return self.formuleAgregation
 
@@ -236,6 +470,167 @@ class Config:
         """
         return self.outputPath
 
+    def getTailleLot(self):
+        """Getter tailleLot
+
+        Returns
+        -------
+        int
+            Nombre de documents traités ensemble lors de l'extraction par lots
+        """
+        return self.tailleLot
+
+    def getNbProcessus(self):
+        """Getter nbProcessus
+
+        Returns
+        -------
+        int
+            Nombre de processus utilisés pour l'extraction
+        """
+        return self.nbProcessus
+
+    def getTailleBloc(self):
+        """Getter tailleBloc
+
+        Returns
+        -------
+        int
+            Taille maximale en caractères des blocs analysés par spacy, 0 pour
+            la limite de spacy
+        """
+        return self.tailleBloc
+
+    def getModeleSpacy(self):
+        """Getter modeleSpacy
+
+        Returns
+        -------
+        str
+            Nom du modèle spacy
+        """
+        return self.modeleSpacy
+
+    def getComposantsSpacy(self):
+        """Getter composantsSpacy
+
+        Returns
+        -------
+        list[str]
+            Composants du pipeline spacy à garder, tous si la liste est vide
+        """
+        return self.composantsSpacy
+
+    def getTailleCacheStem(self):
+        """Getter tailleCacheStem
+
+        Returns
+        -------
+        int
+            Nombre maximal de mots dont on garde le stem en cache
+        """
+        return self.tailleCacheStem
+
+    def getTailleCacheMots(self):
+        """Getter tailleCacheMots
+
+        Returns
+        -------
+        int
+            Nombre maximal de mots dont l'extracteur garde les classes
+        """
+        return self.tailleCacheMots
+
+    def getTailleCacheRef(self):
+        """Getter tailleCacheRef
+
+        Returns
+        -------
+        int
+            Taille maximale en Mo du cache des index du corpus de référence
+        """
+        return self.tailleCacheRef
+
+    def getMoteurScoring(self):
+        """Getter moteurScoring
+
+        Returns
+        -------
+        Enum MOTEURS_SCORING
+            VECTORIEL | PYTHON, façon de calculer les scores
+        """
+        return self.moteurScoring
+
+    def getOkapiK(self):
+        """Getter okapiK
+
+        Returns
+        -------
+        float
+            Paramètre k d'okapi
+        """
+        return self.okapiK
+
+    def getOkapiB(self):
+        """Getter okapiB
+
+        Returns
+        -------
+        float
+            Paramètre b d'okapi
+        """
+        return self.okapiB
+
+    def getOkapiDelta(self):
+        """Getter okapiDelta
+
+        Returns
+        -------
+        float
+            Paramètre delta des variantes d'okapi
+        """
+        return self.okapiDelta
+
+    def getTopK(self):
+        """Getter topK
+
+        Returns
+        -------
+        int
+            Nombre de termes gardés dans le classement, 0 pour tous les garder
+        """
+        return self.topK
+
+    def getAgregationK(self):
+        """Getter agregationK
+
+        Returns
+        -------
+        int
+            Nombre de meilleurs scores moyennés par l'agrégation TOPK_MEAN
+        """
+        return self.agregationK
+
+    def getAgregationPercentile(self):
+        """Getter agregationPercentile
+
+        Returns
+        -------
+        float
+            Percentile calculé par l'agrégation PERCENTILE
+        """
+        return self.agregationPercentile
+
+    def getAgregationCentroides(self):
+        """Getter agregationCentroides
+
+        Returns
+        -------
+        int
+            Nombre de centroïdes de l'agrégation PERCENTILE
+        """
+        return self.agregationCentroides
+
     def copy(self):
         """Renvoie une copie de cet objet
 
@@ -245,3 +640,67 @@ class Config:
             Une copie de l'objet
         """
         return copy.copy(self)
+
+    @classmethod
+    def depuisParametres(cls,parametres=None,**kwargs):
+        """Construit une configuration sans fichier, depuis un dictionnaire de
+        paramètres et/ou des arguments nommés. Les noms des paramètres ne
+        tiennent pas compte de la casse (longueurMin ou LONGUEURMIN) et les
+        valeurs peuvent être des objets python (True, 3, 0.5...) ou des
+        chaînes comme dans le fichier de config. CORPUSPATH et OUTPUTPATH ne
+        sont pas obligatoires.
+
+        Parameters
+        ----------
+        parametres : dict[str,object]
+            Les paramètres et leur valeur
+
+        **kwargs
+            D'autres paramètres, ils remplacent ceux de parametres
+
+        Returns
+        -------
+        Config
+            La configuration
+
+        Raises
+        ------
+        KeyError
+            Si la valeur d'un paramètre à choix n'est pas valide
+        ValueError
+            Si une valeur n'est pas valide, si un paramètre n'existe pas ou
+            si un paramètre obligatoire est absent
+        """
+        tousParams = {'CORPUSPATH':'','OUTPUTPATH':''}
+        for param,valeur in list((parametres or dict()).items())+list(kwargs.items()):
+            tousParams[param.strip().upper()] = valeurTexte(valeur)
+        config = cls.__new__(cls)
+        config.affecterParametres(tousParams.items())
+        return config
+
+    def modifier(self,parametres):
+        """Renvoie une copie de cet objet où certains paramètres sont remplacés
+
+        Parameters
+        ----------
+        parametres : dict[str,str]
+            Les paramètres à remplacer et leur valeur, comme dans le fichier de
+            config
+
+        Returns
+        -------
+        Config
+            Une copie de l'objet avec les nouvelles valeurs
+
+        Raises
+        ------
+        KeyError
+            Si la valeur d'un paramètre à choix n'est pas valide
+        ValueError
+            Si un paramètre n'existe pas ou si une valeur n'est pas valide
+        """
+        config = self.copy()
+        for param,valeur in parametres.items():
+            config.affecterParametre(param.strip().upper(),valeurTexte(valeur).strip())
+        config.verifierParams()
+        return config
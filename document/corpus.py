@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from collections import deque
 from statistics import mean
 
 class Corpus:
@@ -45,6 +46,24 @@ class Corpus:
         self.nbMoyenMot = None #invalide le nombre de mots moyen qui change
         self.collection[iddoc]=doc
 
+    def retirerDocument(self,iddoc):
+        """Retirer un document du corpus
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document à retirer
+
+        Raises
+        ------
+        KeyError
+            Si l'iddoc ne correspond à aucun document du corpus
+        """
+        if(iddoc not in self.collection):
+            raise KeyError("iddoc "+str(iddoc)+" n'est pas présent dans le corpus")
+        self.nbMoyenMot = None #invalide le nombre de mots moyen qui change
+        del self.collection[iddoc]
+
     def getDocumentById(self, iddoc):
         """Getter de document avec l'id
 
@@ -89,15 +108,43 @@ class Corpus:
         return self.nbMoyenMot
 
     def extraction(self,extracteur):
-        """Méthode appelant la méthode extraction de chaque document.
+        """Méthode qui extrait les termes de chaque document.
 
         Parameters
         ----------
         extracteur : Extracteur
             Objet Extracteur traitant le contenu pour extraire les termes
         """
-        for doc in self:
-            doc.extraction(extracteur)
+        for doc in self.extraireDocuments(extracteur):
+            pass
+
+    def extraireDocuments(self,extracteur):
+        """Générateur qui extrait les termes des documents par lots grâce à la
+        méthode analyserLot de l'extracteur et renvoie chaque document une fois
+        que ses termes sont extraits.
+
+        Parameters
+        ----------
+        extracteur : Extracteur
+            Objet Extracteur traitant le contenu pour extraire les termes
+
+        Yields
+        ------
+        Document
+            Document dont les termes viennent d'être extraits
+        """
+        #documents envoyés à l'extracteur dont on attend encore le résultat
+        enAttente = deque()
+        def contenus():
+            for doc in self:
+                enAttente.append(doc)
+                yield doc.getContenu()
+
+        self.nbMoyenMot = None #invalide le nombre de mots moyen qui peut changer
+        for termes,nbMot in extracteur.analyserLot(contenus()):
+            doc = enAttente.popleft()
+            doc.affecterExtraction(termes,nbMot)
+            yield doc
 
     def getCollection(self):
         """Getter de la collection de document
@@ -108,3 +155,113 @@ class Corpus:
             La collection de document du corpus
         """
         return self.collection
+
+class CorpusParesseux(Corpus):
+    """
+    Corpus rempli au fur et à mesure depuis un générateur de documents.
+
+    Les documents ne sont créés que lorsqu'on parcourt le corpus, ce qui permet
+    de ne pas avoir tout le fichier source en mémoire au même moment.
+
+    Attributes
+    ----------
+    generateur : iterator[Document]
+        Générateur des documents qui n'ont pas encore été ajoutés au corpus.
+        Vaut None une fois le générateur épuisé.
+    garderContenu : bool
+        Si False, le contenu des documents est libéré après leur extraction.
+    """
+    def __init__(self,generateur,garderContenu=True):
+        """Constructeur de la classe CorpusParesseux
+
+        Parameters
+        ----------
+        generateur : iterator[Document]
+            Générateur des documents du corpus
+        garderContenu : bool
+            Si False, le contenu des documents est libéré après leur extraction.
+        """
+        super().__init__()
+        self.generateur = generateur
+        self.garderContenu = garderContenu
+
+    def __iter__(self):
+        """Permet d'itérer sur les documents dans les boucles for.
+        Les documents déjà lus sont renvoyés en premier, puis ceux du générateur.
+        """
+        for doc in list(self.collection.values()):
+            yield doc
+        while(self.generateur is not None):
+            doc = next(self.generateur,None)
+            if(doc is None):
+                self.generateur = None
+                break
+            self.addDocument(doc)
+            yield doc
+
+    def remplir(self):
+        """Consomme le reste du générateur pour que le corpus soit complet"""
+        for _ in self:
+            pass
+
+    def getDocumentById(self, iddoc):
+        """Getter de document avec l'id, lit tout le générateur si besoin
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document que l'on veut récupérer
+
+        Returns
+        -------
+        Document
+            Le document d'id iddoc
+        """
+        self.remplir()
+        return super().getDocumentById(iddoc)
+
+    def retirerDocument(self,iddoc):
+        """Retirer un document du corpus, lit tout le générateur si besoin
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document à retirer
+        """
+        self.remplir()
+        super().retirerDocument(iddoc)
+
+    def size(self):
+        """
+        Returns
+        -------
+        int
+            Le nombre de documents dans le corpus, une fois le générateur lu
+        """
+        self.remplir()
+        return super().size()
+
+    def getCollection(self):
+        """Getter de la collection de document, lit tout le générateur si besoin
+
+        Returns
+        -------
+        dict[int,Document]
+            La collection de document du corpus
+        """
+        self.remplir()
+        return super().getCollection()
+
+    def extraction(self,extracteur):
+        """Méthode appelant la méthode extraction de chaque document au fur et
+        à mesure de la lecture. Libère le contenu des documents si garderContenu
+        est à False.
+
+        Parameters
+        ----------
+        extracteur : Extracteur
+            Objet Extracteur traitant le contenu pour extraire les termes
+        """
+        for doc in self.extraireDocuments(extracteur):
+            if(not self.garderContenu):
+                doc.libererContenu()
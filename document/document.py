@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from nltk.tokenize import word_tokenize
+import threading
 
 class Document:
     """
@@ -16,11 +16,14 @@ class Document:
         Par défaut à None. Après appel de la méthode extraction contient la
         liste des termes extraits à partir du contenu.
     nbMot : int
-        Nombre de mots dans le document
+        Nombre de mots dans le document. Par défaut à None, il est donné par
+        l'extracteur lors de l'extraction ou calculé au premier appel du getter.
     """
 
-    #cpt, variable de classe pour avoir un id unique à la création
+    #cpt, variable de classe pour avoir un id unique à la création, protégée
+    #par un verrou car des documents peuvent être créés par plusieurs threads
     cpt = 0
+    verrouCpt = threading.Lock()
     def __init__(self, contenu):
         """Constructeur de la classe Document
 
@@ -29,11 +32,12 @@ class Document:
         contenu : str
             Le contenu du document
         """
-        self.id = Document.cpt
-        Document.cpt+=1
+        with Document.verrouCpt:
+            self.id = Document.cpt
+            Document.cpt+=1
         self.contenu = contenu
         self.termes = None
-        self.nbMot = len(word_tokenize(self.contenu,'french'))
+        self.nbMot = None #donné par l'extracteur ou calculé lors de l'appel au getter
 
     def getId(self):
         """Getter d'attribut id
@@ -79,20 +83,50 @@ class Document:
     def getNbMot(self):
         """Getter d'attribut nbMot
 
+        Si l'extraction n'a pas encore donné le nombre de mots, le contenu est
+        segmenté pour le calculer.
+
         Returns
         -------
         int
             Le nombre de mots dans le document
         """
+        if(self.nbMot is None):
+            #nltk n'est importé que si le nombre de mots n'est pas donné par l'extraction
+            from nltk.tokenize import word_tokenize
+            self.nbMot = len(word_tokenize(self.contenu,'french'))
         return self.nbMot
 
     def extraction(self,extracteur):
         """Methode permetant d'extraire les termes du document selon le
         traitement fait par l'extracteur. Place le resultat dans l'attribut termes
+        et le nombre de mots compté par l'extracteur dans l'attribut nbMot, ce
+        qui évite de segmenter une seconde fois le contenu.
 
         Parameters
         ----------
         extracteur : Extracteur
             Objet Extracteur traitant le contenu pour extraire les termes
         """
-        self.termes = extracteur.extraire(self.contenu)
+        self.affecterExtraction(*extracteur.analyser(self.contenu))
+
+    def affecterExtraction(self,termes,nbMot):
+        """Place le résultat d'une extraction faite par l'extracteur dans les
+        attributs termes et nbMot.
+
+        Parameters
+        ----------
+        termes : list[tuple[str*]]
+            Les termes extraits du document
+        nbMot : int
+            Le nombre de mots du document compté par l'extracteur
+        """
+        self.termes = termes
+        self.nbMot = nbMot
+
+    def libererContenu(self):
+        """Libère le contenu du document pour économiser la mémoire, une fois
+        que les termes ont été extraits. Le nombre de mots reste disponible.
+        """
+        self.getNbMot()
+        self.contenu = None
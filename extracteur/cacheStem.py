@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+import pickle
+from collections import OrderedDict
+from indexeur.cacheReference import CacheReference, verrouFichier, EXTENSION_VERROU
+
+class CacheStem:
+    """
+    Cache borné qui garde le stem des mots déjà rencontrés pour ne pas appeler
+    le stemmer à chaque occurrence d'un mot. Quand le cache est plein, on retire
+    le mot utilisé le moins récemment.
+
+    Attributes
+    ----------
+    stemmer : SnowballStemmer
+        Objet permettant de faire du stemming
+
+    tailleMax : int
+        Nombre maximal de mots gardés dans le cache
+
+    cache : OrderedDict[str,str]
+        Le stem de chaque mot du cache, du moins au plus récemment utilisé
+
+    nbSucces : int
+        Nombre de mots trouvés dans le cache
+
+    nbEchecs : int
+        Nombre de mots absents du cache qu'il a fallu donner au stemmer
+
+    nouveaux : dict[str,str]
+        Stems calculés par le stemmer depuis le dernier appel à
+        retirerNouveaux, None si on ne les garde pas (voir suivreNouveaux)
+    """
+    def __init__(self,stemmer,tailleMax):
+        """Constructeur de la classe CacheStem
+
+        Parameters
+        ----------
+        stemmer : SnowballStemmer
+            Objet permettant de faire du stemming
+        tailleMax : int
+            Nombre maximal de mots gardés dans le cache
+        """
+        self.stemmer = stemmer
+        self.tailleMax = tailleMax
+        self.cache = OrderedDict()
+        self.nbSucces = 0
+        self.nbEchecs = 0
+        self.nouveaux = None
+
+    def stem(self,mot):
+        """Renvoie le stem du mot, depuis le cache si possible.
+
+        Parameters
+        ----------
+        mot : str
+            Le mot dont on veut le stem
+
+        Returns
+        -------
+        str
+            Le stem du mot
+        """
+        stem = self.cache.get(mot)
+        if(stem is not None):
+            self.nbSucces += 1
+            self.cache.move_to_end(mot)
+            return stem
+
+        self.nbEchecs += 1
+        stem = self.stemmer.stem(mot)
+        self.cache[mot] = stem
+        if(self.nouveaux is not None):
+            self.nouveaux[mot] = stem
+        if(len(self.cache) > self.tailleMax):
+            self.cache.popitem(last=False)
+        return stem
+
+    def getNbSucces(self):
+        """Getter nbSucces
+
+        Returns
+        -------
+        int
+            Nombre de mots trouvés dans le cache
+        """
+        return self.nbSucces
+
+    def getNbEchecs(self):
+        """Getter nbEchecs
+
+        Returns
+        -------
+        int
+            Nombre de mots qu'il a fallu donner au stemmer
+        """
+        return self.nbEchecs
+
+    def getTauxSucces(self):
+        """Renvoie la proportion de mots trouvés dans le cache
+
+        Returns
+        -------
+        float
+            nbSucces/(nbSucces+nbEchecs), 0 si le cache n'a pas été utilisé
+        """
+        total = self.nbSucces+self.nbEchecs
+        if(total == 0):
+            return 0
+        return self.nbSucces/total
+
+    def suivreNouveaux(self):
+        """Garde désormais les stems calculés par le stemmer, pour les
+        transmettre à un autre cache (celui du processus principal lors d'une
+        extraction sur plusieurs processus).
+        """
+        self.nouveaux = dict()
+
+    def retirerNouveaux(self):
+        """Renvoie les stems calculés depuis le dernier appel et recommence
+        à les compter.
+
+        Returns
+        -------
+        dict[str,str]
+            Le stem de chaque mot calculé par le stemmer, vide si suivreNouveaux
+            n'a pas été appelée
+        """
+        nouveaux = self.nouveaux or dict()
+        if(self.nouveaux is not None):
+            self.nouveaux = dict()
+        return nouveaux
+
+    def ajouter(self,dictMotStem):
+        """Ajoute des mots et leur stem au cache, dans la limite de tailleMax.
+
+        Parameters
+        ----------
+        dictMotStem : dict[str,str]
+            Le stem de chaque mot
+        """
+        for mot,stem in dictMotStem.items():
+            self.cache[mot] = stem
+        while(len(self.cache) > self.tailleMax):
+            self.cache.popitem(last=False)
+
+    def sauvegarder(self,path):
+        """Sauvegarde le contenu du cache dans un fichier pickle à l'emplacement path.
+        Le fichier est écrit à côté puis renommé, sous un verrou de fichier : un
+        lecteur ne le voit jamais à moitié écrit, même si plusieurs constructions
+        du corpus de référence le sauvegardent en même temps.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de sauvegarde
+        """
+        cache = dict(self.cache)
+        def ecrire(pathTemporaire):
+            with open(pathTemporaire,'wb') as f:
+                pickle.Pickler(f).dump(cache)
+        with verrouFichier(path+EXTENSION_VERROU):
+            CacheReference.ecrireAtomique(path,ecrire)
+
+    def charger(self,path):
+        """Ajoute au cache les mots sauvegardés dans le fichier pickle à
+        l'emplacement path, dans la limite de tailleMax.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de la sauvegarde
+
+        Raises
+        ------
+        pickle.UnpicklingError, EOFError, OSError
+            Si le fichier ne peut pas être lu
+        """
+        with open(path,'rb') as f:
+            self.ajouter(pickle.Unpickler(f).load())
@@ -1,11 +1,102 @@
 # -*- coding: utf-8 -*-
+import os
+import math
+import pickle
 import string
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, chain
 from nltk.stem import SnowballStemmer
 from nltk.tokenize import word_tokenize
+from extracteur.cacheStem import CacheStem
+from extracteur.ressources import DOSSIER_RESSOURCES,PATH_MOTSVIDES,PATH_CACHESTEM
 
-#Chemin vers un fichier qui contient un ensemble de mots vides, un mot par ligne
-PATH_MOTSVIDES = 'ressources/stopwords.fr'
+#Ponctuation et espaces retirés en début et fin de terme
+CARACTERES_RETIRABLES = string.punctuation+string.whitespace
+#Caractères qui n'ont pas de sens dans un terme
+CARACTERES_NON_SENS = '.,;()[]!?:"{}'
+
+#Classes des mots calculées par Extracteur.classerMot
+MOT_RETIRABLE = 1 #mot vide ou ponctuation, retiré en début et fin de terme
+MOT_UNE_LETTRE = 2
+MOT_NOMBRE = 4
+MOT_NON_SENS = 8 #contient un caractère qui n'a pas de sens dans un terme
+
+#Extracteur propre à un processus de travail de l'extraction parallèle
+extracteurTravailleur = None
+
+def initialiserTravailleur(classeExtracteur,config):
+    """Crée l'extracteur d'un processus de travail, appelée une seule fois au
+    démarrage de chaque processus.
+
+    Parameters
+    ----------
+    classeExtracteur : type
+        Classe de l'extracteur à créer
+    config : Config
+        Objet qui contient tous les paramètres de la configuration de l'extraction.
+    """
+    global extracteurTravailleur
+    extracteurTravailleur = classeExtracteur(config)
+    if(config.getStem()):
+        #les stems calculés ici sont renvoyés avec chaque paquet au processus principal
+        extracteurTravailleur.getCacheStem().suivreNouveaux()
+
+def analyserPaquet(textes):
+    """Analyse un paquet de textes dans un processus de travail.
+
+    Parameters
+    ----------
+    textes : list[str]
+        Textes desquels on veut extraire les termes
+
+    Returns
+    -------
+    tuple[list[tuple[list[tuple[str*]],int]],dict,dict]
+        Le résultat de la méthode analyser pour chaque texte, le dictionnaire
+        dictStemTerme rempli par ce paquet seulement et les stems calculés par
+        le stemmer pour ce paquet (None pour les deux si pas de stemming)
+    """
+    extracteur = extracteurTravailleur
+    if(not extracteur.config.getStem()):
+        return [extracteur.analyser(texte) for texte in textes],None,None
+    extracteur.dictStemTerme = dict()
+    resultats = [extracteur.analyser(texte) for texte in textes]
+    return resultats,extracteur.dictStemTerme,extracteur.getCacheStem().retirerNouveaux()
+
+def decouperPaquets(textes,tailleLot,nbProcessus):
+    """Découpe les textes en paquets pour les processus de travail. Un paquet
+    a au plus tailleLot textes, mais un petit corpus est découpé en paquets
+    plus petits pour que tous les processus aient du travail (environ quatre
+    paquets par processus).
+
+    Le nombre de textes n'est pas connu à l'avance (corpus lu au fur et à
+    mesure) : on lit d'avance au plus 2*nbProcessus*tailleLot textes, autant que
+    les paquets en attente en gardent déjà. Si le corpus s'arrête avant, sa
+    taille est connue et sert à calculer celle des paquets.
+
+    Parameters
+    ----------
+    textes : iterable[str]
+        Les textes
+    tailleLot : int
+        Nombre maximal de textes d'un paquet
+    nbProcessus : int
+        Nombre de processus de travail
+
+    Returns
+    -------
+    iterator[list[str]]
+        Les paquets de textes, dans l'ordre
+    """
+    textes = iter(textes)
+    nbAvance = 2*nbProcessus*tailleLot
+    debut = list(islice(textes,nbAvance))
+    taillePaquet = tailleLot
+    if(len(debut) < nbAvance):
+        taillePaquet = max(1,min(tailleLot,math.ceil(len(debut)/(4*nbProcessus))))
+    textes = chain(debut,textes)
+    return iter(lambda: list(islice(textes,taillePaquet)),[])
 
 class Extracteur:
     """
@@ -23,8 +114,23 @@ class Extracteur:
     stemmer : SnowballStemmer
         Objet permettant de faire du stemming
 
+    cacheStem : CacheStem
+        Cache du stem des mots déjà rencontrés, rempli depuis la sauvegarde
+        PATH_CACHESTEM si elle existe
+
     motsVides : set[str]
         Ensemble des mots vides
+
+    classesMots : dict[str,int]
+        Classes de chaque mot déjà rencontré par nettoyerTerme. Quand il
+        dépasse tailleCacheMots mots, il est vidé avec motsRetirables et
+        motsNonSens au début de l'appel suivant à nettoyerTerme
+
+    motsRetirables : set[str]
+        Mots déjà rencontrés qui sont retirés en début et fin de terme
+
+    motsNonSens : set[str]
+        Mots déjà rencontrés qui contiennent un caractère sans sens dans un terme
     """
 
     def __init__(self, config):
@@ -41,11 +147,20 @@ class Extracteur:
         if(self.config.getStem()):
             self.dictStemTerme = dict()
             self.stemmer = SnowballStemmer('french')
+            self.cacheStem = CacheStem(self.stemmer,config.getTailleCacheStem())
+            if(os.path.exists(PATH_CACHESTEM)):
+                try:
+                    self.cacheStem.charger(PATH_CACHESTEM)
+                except (pickle.UnpicklingError,EOFError,OSError):
+                    #fichier illisible : on démarre avec un cache vide
+                    self.cacheStem = CacheStem(self.stemmer,config.getTailleCacheStem())
 
         #on charge l'ensemble de mots vides
         with open(PATH_MOTSVIDES,'r',encoding='utf-8') as f:
             self.motsVides = set(f.read().split('\n'))
 
+        self.viderClassesMots()
+
     def extraire(self,texte):
         """Méthode d'extraction des termes du texte.
 
@@ -54,6 +169,28 @@ class Extracteur:
         texte : str
              Texte duquel on veut extraire les termes
 
+        Returns
+        -------
+        list[tuple[str*]]
+            liste de termes correspondants à la configuration.
+        """
+        return self.analyser(texte)[0]
+
+    def analyser(self,texte):
+        """Méthode d'extraction des termes du texte qui renvoie aussi le nombre
+        de mots du texte, compté sur la segmentation faite pour l'extraction.
+
+        Parameters
+        ----------
+        texte : str
+             Texte duquel on veut extraire les termes
+
+        Returns
+        -------
+        tuple[list[tuple[str*]],int]
+            liste de termes correspondants à la configuration et nombre de mots
+            du texte.
+
         Raises
         ------
         NotImplementedError
@@ -61,6 +198,99 @@ class Extracteur:
         """
         raise NotImplementedError
 
+    def analyserLot(self,textes):
+        """Générateur qui analyse une suite de textes et renvoie pour chacun,
+        dans le même ordre, le résultat de la méthode analyser.
+
+        Si la configuration demande plusieurs processus, les textes sont
+        analysés par paquets d'au plus tailleLot textes sur un ensemble de
+        processus (voir decouperPaquets).
+
+        Parameters
+        ----------
+        textes : iterable[str]
+             Textes desquels on veut extraire les termes
+
+        Yields
+        ------
+        tuple[list[tuple[str*]],int]
+            liste de termes et nombre de mots de chaque texte
+        """
+        if(self.config.getNbProcessus() > 1):
+            yield from self.analyserLotParallele(textes)
+        else:
+            for texte in textes:
+                yield self.analyser(texte)
+
+    def analyserLotParallele(self,textes):
+        """Générateur qui analyse les textes par paquets sur un ensemble de
+        processus. Chaque processus a son propre extracteur, le dictionnaire
+        dictStemTerme de chaque paquet est fusionné dans celui de cet extracteur
+        dans l'ordre des textes, comme lors d'une analyse dans un seul processus.
+        Les stems calculés par les processus sont ajoutés au cache mot/stem de
+        cet extracteur, qui peut ainsi être sauvegardé après l'extraction.
+
+        Parameters
+        ----------
+        textes : iterable[str]
+             Textes desquels on veut extraire les termes
+
+        Yields
+        ------
+        tuple[list[tuple[str*]],int]
+            liste de termes et nombre de mots de chaque texte
+        """
+        nbProcessus = self.config.getNbProcessus()
+        paquets = decouperPaquets(textes,self.config.getTailleLot(),nbProcessus)
+
+        with ProcessPoolExecutor(max_workers=nbProcessus,initializer=initialiserTravailleur,\
+                                 initargs=(type(self),self.config)) as executeur:
+            #on limite le nombre de paquets en attente pour ne pas lire tous les textes d'un coup
+            enCours = deque()
+            for paquet in paquets:
+                enCours.append(executeur.submit(analyserPaquet,paquet))
+                if(len(enCours) >= 2*nbProcessus):
+                    yield from self.recevoirPaquet(enCours.popleft().result())
+            while(enCours):
+                yield from self.recevoirPaquet(enCours.popleft().result())
+
+    def recevoirPaquet(self,resultatPaquet):
+        """Récupère le résultat d'un paquet analysé par un processus de travail
+        et fusionne son dictionnaire dictStemTerme et ses stems calculés.
+
+        Parameters
+        ----------
+        resultatPaquet : tuple[list[tuple[list[tuple[str*]],int]],dict,dict]
+            Valeur renvoyée par la fonction analyserPaquet
+
+        Returns
+        -------
+        list[tuple[list[tuple[str*]],int]]
+            liste de termes et nombre de mots de chaque texte du paquet
+        """
+        resultats,dictStemTerme,nouveauxStems = resultatPaquet
+        if(dictStemTerme is not None):
+            self.fusionnerDictStemTerme(dictStemTerme)
+            self.cacheStem.ajouter(nouveauxStems)
+        return resultats
+
+    def fusionnerDictStemTerme(self,dictStemTerme):
+        """Ajoute les occurrences d'un autre dictionnaire stem/terme à celles
+        du dictionnaire dictStemTerme de l'extracteur.
+
+        Parameters
+        ----------
+        dictStemTerme : dict[tuple[str*],dict[tuple[str*],int]]
+            Dictionnaire stem/terme à fusionner
+        """
+        for stem,dictTermeOcc in dictStemTerme.items():
+            if(stem not in self.dictStemTerme):
+                self.dictStemTerme[stem] = dict(dictTermeOcc)
+            else:
+                dictStem = self.dictStemTerme[stem]
+                for terme,occ in dictTermeOcc.items():
+                    dictStem[terme] = dictStem.get(terme,0) + occ
+
     def termeToStem(self,listeTermes):
         """Méthode qui renvoie la liste des stems correspondants à la liste des
         termes donnée en paramètre. Met à jour le dictionnaire dictStemTerme.
@@ -87,10 +317,7 @@ class Extracteur:
 
         listeStem = []
         for terme in listeTermes :
-            stem = []
-            for mot in terme:
-                stem.append(self.stemmer.stem(mot))
-            stem = tuple(stem)
+            stem = tuple([self.cacheStem.stem(mot) for mot in terme])
             listeStem.append(stem)
 
             #mise à jour du dictionnaire
@@ -104,6 +331,16 @@ class Extracteur:
 
         return listeStem
 
+    def getCacheStem(self):
+        """Getter cacheStem
+
+        Returns
+        -------
+        CacheStem
+            Le cache mot/stem de l'extracteur
+        """
+        return self.cacheStem
+
     def stemToTerme(self,listeStem):
         """Méthode qui renvoie la liste des termes correspondants à la liste des
         stems donnée en paramètre. Le terme qui correspond au stem est celui qui
@@ -180,49 +417,89 @@ class Extracteur:
         list[tuple[str*]]
             Liste des termes nettoyés
         """
+        #les classes ne sont oubliées qu'entre deux appels, un appel a besoin
+        #des classes de tous les mots de ses termes
+        if(len(self.classesMots) > self.config.getTailleCacheMots()):
+            self.viderClassesMots()
+        classesMots = self.classesMots
+        motsRetirables = self.motsRetirables
+        motsNonSens = self.motsNonSens
         listeTermePropre = []
         for terme in listeTermeTmp:
+            #on classe les mots jamais rencontrés
+            if(not classesMots.keys() >= set(terme)):
+                for mot in terme:
+                    if(mot not in classesMots):
+                        self.classerMot(mot)
+
+            #on retire les mots vides et la ponctuation en début et en fin de terme
             termetmp = terme
-            
-            #on retire les mots vides et la ponctuation en début de terme
-            while(len(termetmp)>0 and (termetmp[0] in self.motsVides \
-                  or termetmp[0] in string.punctuation+string.whitespace)):
-                termetmp = termetmp[1:]
-            #on retire les mots vides et la ponctuation en fin de terme
-            while(len(termetmp)>0 and (termetmp[-1] in self.motsVides or \
-                  termetmp[-1] in string.punctuation+string.whitespace)):
-                termetmp = termetmp[:-1]
-            
-            #si le terme est vide on invalide 
+            if(termetmp and (termetmp[0] in motsRetirables or termetmp[-1] in motsRetirables)):
+                debut,fin = 0,len(termetmp)
+                while(debut<fin and termetmp[debut] in motsRetirables):
+                    debut += 1
+                while(fin>debut and termetmp[fin-1] in motsRetirables):
+                    fin -= 1
+                termetmp = termetmp[debut:fin]
+
+            #si le terme est vide on invalide
             if(len(termetmp) <= 0):
                 continue
-            
-            #Si le terme est composé d'un mot de une lettre => invalide
-            if(len(termetmp) == 1 and len(termetmp[0])==1):
-                continue
 
-            #Si le terme est composé d'un mot et que c'est un nombre => invalide
-            if(len(termetmp) == 1 and termetmp[0].isdigit()):
+            #Si le terme est composé d'un mot de une lettre ou d'un nombre => invalide
+            if(len(termetmp) == 1 and classesMots[termetmp[0]] & (MOT_UNE_LETTRE|MOT_NOMBRE)):
                 continue
 
             #Les points, les virgules, les parenthèses, ...
             #dans les termes n'ont pas de sens on invalide le terme
-            valide = True
-            caractereNonSens = '.,;()[]!?:"{}'
-            t=' '.join([mot for mot in termetmp])
-            for l in t:
-                if(l in caractereNonSens):
-                    valide = False
-                    break
-            if(not valide):
+            if(not motsNonSens.isdisjoint(termetmp)):
                 continue
-                
+
             #si on est arrivé à cette ligne c'est que le terme a été validé
             #alors on l'ajoute à la liste des termes propres
             listeTermePropre.append(termetmp)
 
         return listeTermePropre
 
+    def viderClassesMots(self):
+        """Oublie les classes des mots déjà rencontrés par nettoyerTerme"""
+        self.classesMots = dict()
+        self.motsRetirables = set()
+        self.motsNonSens = set()
+
+    def classerMot(self,mot):
+        """Calcule les classes d'un mot utilisées par nettoyerTerme et les garde
+        dans le dictionnaire classesMots, pour que chaque mot distinct ne soit
+        classé qu'une fois. Les mots retirables et ceux qui n'ont pas de sens
+        sont aussi gardés dans des ensembles pour tester un terme d'un coup.
+
+        Parameters
+        ----------
+        mot : str
+            Le mot à classer
+
+        Returns
+        -------
+        int
+            Les classes du mot : combinaison de MOT_RETIRABLE, MOT_UNE_LETTRE,
+            MOT_NOMBRE et MOT_NON_SENS
+        """
+        classes = 0
+        if(mot in self.motsVides or mot in CARACTERES_RETIRABLES):
+            classes |= MOT_RETIRABLE
+        if(len(mot) == 1):
+            classes |= MOT_UNE_LETTRE
+        if(mot.isdigit()):
+            classes |= MOT_NOMBRE
+        if(any(l in CARACTERES_NON_SENS for l in mot)):
+            classes |= MOT_NON_SENS
+        self.classesMots[mot] = classes
+        if(classes & MOT_RETIRABLE):
+            self.motsRetirables.add(mot)
+        if(classes & MOT_NON_SENS):
+            self.motsNonSens.add(mot)
+        return classes
+
     def termeBonneLongueur(self,listeTerme):
         """Retire les termes de la liste qui ne sont pas comformes à la taille
         prévue par la configuration
@@ -278,8 +555,22 @@ class Extracteur:
             Liste des mots du texte
         """
         #on sépare les mots
-        txtSplit = word_tokenize(texte,'French')
+        return self.separerApostrophes(word_tokenize(texte,'French'))
+
+    def separerApostrophes(self,txtSplit):
+        """Sépare les mots qui ont une apostrophe dans une liste de mots
+        donnée par word_tokenize.
+
+        Parameters
+        ----------
+        txtSplit : list[str]
+            Liste des mots donnée par word_tokenize
 
+        Returns
+        -------
+        list[str]
+            Liste des mots où les apostrophes sont séparées
+        """
         #on sépare les mots qui ont une aposthrophe car word_tokenize ne le fait pas
         txtSplitTmp = []
         for mot in txtSplit:
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import string
+from nltk.tokenize import word_tokenize
 from extracteur.extracteur import Extracteur
 
 
@@ -24,7 +25,7 @@ class ExtracteurNGrammes(Extracteur):
         """
         super().__init__(config)
 
-    def extraire(self,texte):
+    def analyser(self,texte):
         """Méthode d'extraction des termes du texte.
 
         Parameters
@@ -34,20 +35,20 @@ class ExtracteurNGrammes(Extracteur):
 
         Returns
         -------
-        list[tuple[str*]]
-            liste de termes correspondants à la configuration.
+        tuple[list[tuple[str*]],int]
+            liste de termes correspondants à la configuration et nombre de mots
+            du texte donné par word_tokenize.
         """
         #on met tout en miniscule
         txt = texte.lower()
 
-        #on sépare les mots
-        txtSplit = self.segmenter(txt)
+        #on sépare les mots, le nombre de mots est pris avant de séparer les apostrophes
+        mots = word_tokenize(txt,'French')
+        txtSplit = self.separerApostrophes(mots)
 
-        termes = []
-        for n in range(self.config.getLongueurMin(),self.config.getLongueurMax()):
-            termes += self.nGrammes(txtSplit, n)
+        termes = self.nGrammesBornes(txtSplit,self.config.getLongueurMin(),self.config.getLongueurMax())
 
-        return self.finaliser(termes)
+        return self.finaliser(termes),len(mots)
 
     def nGrammes(self,listeMots,n):
         """On récupére les ngrammes à partir d'une liste de mot.
@@ -62,27 +63,76 @@ class ExtracteurNGrammes(Extracteur):
         list[tuple[str*]]
             liste de ngrammes
         """
-        listeTermes = []
+        return self.nGrammesBornes(listeMots,n,n+1)
+
+    def nGrammesBornes(self,listeMots,nMin,nMax):
+        """On récupére les ngrammes de taille nMin à nMax-1 à partir d'une liste
+        de mot, classés par taille puis par position. Un ngramme est valide s'il
+        est entouré de mots vides ou de ponctuation et s'il ne commence ni ne
+        termine par un mot vide.
+
+        Les mots sont d'abord classés une seule fois, puis les ngrammes valides
+        sont énumérés comme des intervalles de positions. Un tuple n'est créé
+        que pour les ngrammes qui sont gardés.
+
+        Parameters
+        ----------
+        listeMots : list[str]
 
-        for i in range(len(listeMots)-n+1):
-            #on forme un terme potentiel qu'on valide ou pas par la suite
-            termePotentiel = listeMots[i:i+n]
-
-            #on valide le terme potentiel s'il est entouré de mots vides ou ponctuation
-            if(i>0 and listeMots[i-1] not in string.punctuation and \
-               listeMots[i-1] not in self.motsVides ):
-                #le terme n'est pas valide
-                continue
-            if(i+n<len(listeMots) and listeMots[i+n] not in string.punctuation and \
-               listeMots[i+n] not in self.motsVides ):
-                #le terme n'est pas valide
-                continue
-            if(termePotentiel[0] in self.motsVides or termePotentiel[-1] in self.motsVides):
-                #si le terme commence ou termine par un mot vide, il n'est pas valide
-                #car les mots vides avant et après sont retiré et donc il ne sera
-                #plus un terme de longueur n passé en argument
-                continue
-
-            listeTermes.append(tuple(termePotentiel))
+        nMin : int
+            Taille minimale des ngrammes
+
+        nMax : int
+            Taille des ngrammes à partir de laquelle on s'arrête (exclue)
+
+        Return
+        ------
+        list[tuple[str*]]
+            liste de ngrammes
+        """
+        estFrontiere,estVide = self.classerMots(listeMots)
+        nbMots = len(listeMots)
+
+        #positions où un ngramme peut commencer : après une frontière et pas sur un mot vide
+        debuts = [i for i in range(nbMots) if (i==0 or estFrontiere[i-1]) and not estVide[i]]
+        #positions (exclues) où un ngramme peut finir : avant une frontière et pas sur un mot vide
+        finValide = bytearray(nbMots+1)
+        for j in range(1,nbMots+1):
+            finValide[j] = (j==nbMots or estFrontiere[j]) and not estVide[j-1]
+
+        listeTermes = []
+        for n in range(max(nMin,1),nMax):
+            for i in debuts:
+                if(i+n > nbMots):
+                    break
+                if(finValide[i+n]):
+                    listeTermes.append(tuple(listeMots[i:i+n]))
 
         return listeTermes
+
+    def classerMots(self,listeMots):
+        """Associe un identifiant entier à chaque mot distinct de la liste, puis
+        classe chaque mot distinct une seule fois : mot vide, ou frontière
+        (mot vide ou ponctuation) pour les ngrammes.
+
+        Parameters
+        ----------
+        listeMots : list[str]
+
+        Returns
+        -------
+        tuple[bytearray,bytearray]
+            Pour chaque position de la liste, 1 si le mot est une frontière et
+            1 si le mot est un mot vide.
+        """
+        vocabulaire = dict()
+        ids = [vocabulaire.setdefault(mot,len(vocabulaire)) for mot in listeMots]
+
+        #les identifiants suivent l'ordre d'insertion dans le vocabulaire
+        videVocabulaire = bytearray(mot in self.motsVides for mot in vocabulaire)
+        frontiereVocabulaire = bytearray(vide or mot in string.punctuation \
+                                         for mot,vide in zip(vocabulaire,videVocabulaire))
+
+        estFrontiere = bytearray(frontiereVocabulaire[i] for i in ids)
+        estVide = bytearray(videVocabulaire[i] for i in ids)
+        return estFrontiere,estVide
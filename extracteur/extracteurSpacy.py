@@ -1,7 +1,55 @@
 # -*- coding: utf-8 -*-
+import threading
+from itertools import islice
 import spacy
 from extracteur.extracteur import Extracteur
 
+#Séparateurs où l'on coupe de préférence les textes trop longs, du plus au moins
+#préféré : paragraphe, ligne, phrase puis mot
+SEPARATEURS_BLOCS = ['\n\n','\n','. ',' ']
+
+#Modèles spacy déjà chargés par le processus, la clé est le nom du modèle et
+#le tuple des composants gardés. Ils sont partagés par tous les extracteurs.
+MODELES_CHARGES = dict()
+#Longueur maximale des textes (max_length) de chaque modèle chargé, lue au
+#chargement. Les extracteurs ne modifient jamais le modèle partagé.
+LONGUEURS_MAX = dict()
+#Verrou de chaque modèle chargé : un modèle partagé n'analyse qu'un texte ou
+#qu'un lot à la fois, même si plusieurs threads ont chacun leur extracteur
+VERROUS_MODELES = dict()
+verrouModeles = threading.Lock()
+
+def chargerModele(nomModele,composants):
+    """Renvoie le modèle spacy de nom nomModele en ne gardant que les composants
+    demandés. Le modèle n'est chargé qu'une fois par processus.
+
+    Parameters
+    ----------
+    nomModele : str
+        Nom du modèle spacy
+    composants : list[str]
+        Noms des composants du pipeline à garder, si la liste est vide on
+        garde tout le pipeline.
+
+    Returns
+    -------
+    Language
+        Le modèle spacy chargé
+    """
+    cle = (nomModele,tuple(composants))
+    with verrouModeles:
+        if(cle not in MODELES_CHARGES):
+            nlp = spacy.load(nomModele)
+            if(len(composants) > 0):
+                #on retire les composants inutiles pour qu'ils ne soient ni
+                #exécutés ni gardés en mémoire
+                for nom in [nom for nom in nlp.pipe_names if nom not in composants]:
+                    nlp.remove_pipe(nom)
+            MODELES_CHARGES[cle] = nlp
+            LONGUEURS_MAX[cle] = nlp.max_length
+            VERROUS_MODELES[cle] = threading.RLock()
+        return MODELES_CHARGES[cle]
+
 
 class ExtracteurSpacy(Extracteur):
     """
@@ -11,6 +59,24 @@ class ExtracteurSpacy(Extracteur):
     ----------
     nlp : spacy
         Objet permettant de faire le POS tagging
+
+    tailleLot : int
+        Nombre de textes envoyés ensemble à spacy lors de l'analyse par lots
+
+    nbProcessus : int
+        Nombre de processus utilisés par spacy lors de l'analyse par lots
+
+    tailleBloc : int
+        Taille maximale en caractères des blocs analysés par spacy, les textes
+        plus longs sont découpés en plusieurs blocs. Elle est propre à
+        l'extracteur, le max_length du modèle partagé n'est jamais modifié.
+
+    longueurMaxModele : int
+        max_length d'origine du modèle, les textes plus longs sont refusés
+        par spacy s'ils ne sont pas déjà découpés en tokens
+
+    verrouModele : threading.RLock
+        Verrou du modèle partagé, tenu pendant chaque appel à spacy
     """
 
     def __init__(self,config):
@@ -23,10 +89,23 @@ class ExtracteurSpacy(Extracteur):
              l'extraction.
         """
         super().__init__(config)
-        self.nlp = spacy.load("fr_core_news_sm")
+        self.nlp = chargerModele(config.getModeleSpacy(),config.getComposantsSpacy())
+        self.tailleLot = config.getTailleLot()
+        self.nbProcessus = config.getNbProcessus()
+
+        #Par défaut on ne découpe que les textes que spacy refuserait, selon la
+        #limite d'origine du modèle et non celle qu'un autre code aurait changée
+        cle = (config.getModeleSpacy(),tuple(config.getComposantsSpacy()))
+        self.longueurMaxModele = LONGUEURS_MAX[cle]
+        self.verrouModele = VERROUS_MODELES[cle]
+        self.tailleBloc = config.getTailleBloc()
+        if(self.tailleBloc == 0):
+            self.tailleBloc = self.longueurMaxModele
 
-    def extraire(self,texte):
-        """Méthode d'extraction des termes du texte.
+    def analyser(self,texte):
+        """Méthode d'extraction des termes du texte. Si le texte est plus long
+        que tailleBloc, il est analysé bloc par bloc et les termes des blocs
+        sont mis bout à bout avant d'être finalisés.
 
         Parameters
         ----------
@@ -35,20 +114,187 @@ class ExtracteurSpacy(Extracteur):
 
         Returns
         -------
-        list[tuple[str*]]
-            liste de termes correspondant à la configuration.
+        tuple[list[tuple[str*]],int]
+            liste de termes correspondant à la configuration et nombre de mots
+            du texte, compté sur les tokens de spacy hors espaces.
+        """
+        listeTerme = []
+        nbMot = 0
+        for bloc in self.decouperTexte(texte):
+            with self.verrouModele:
+                txtTag = self.nlp(self.tokeniser(self.preparerTexte(bloc)))
+            listeTerme += self.termesBruts(txtTag)
+            nbMot += self.compterMots(txtTag)
+        return self.finaliser(listeTerme),nbMot
+
+    def analyserLot(self,textes):
+        """Générateur qui analyse une suite de textes par lots avec nlp.pipe,
+        éventuellement sur plusieurs processus, et renvoie pour chacun, dans le
+        même ordre, le résultat de la méthode analyser.
+
+        Seule l'analyse de spacy se fait dans les processus, la sélection des
+        termes et le stemming se font dans le processus courant. Le dictionnaire
+        dictStemTerme est donc le même qu'avec une analyse texte par texte.
+        Les textes longs sont découpés en blocs comme dans la méthode analyser.
+
+        Avec plusieurs processus, les processus de spacy ont leur propre copie
+        du modèle et la limite est vérifiée avant le lancement de nlp.pipe :
+        les blocs qui dépassent la limite du modèle (tailleBloc plus grand ou
+        bloc allongé par la mise en minuscule) sont découpés en tokens ici, les
+        autres sont envoyés tels quels et découpés dans les processus.
+
+        Le verrou du modèle partagé n'est tenu que pendant que spacy analyse un
+        paquet d'au plus tailleLot blocs. La sélection des termes, le stemming
+        et le travail de l'appelant entre deux textes se font sans le verrou.
+
+        Parameters
+        ----------
+        textes : iterable[str]
+             Textes desquels on veut extraire les termes
+
+        Yields
+        ------
+        tuple[list[tuple[str*]],int]
+            liste de termes et nombre de mots de chaque texte
+        """
+        #chaque bloc est accompagné de l'indice de son texte, un texte donne au moins un bloc
+        blocs = ((self.entreePipe(self.preparerTexte(bloc)),itexte) for itexte,texte in enumerate(textes) \
+                 for bloc in self.decouperTexte(texte))
+        docs = self.nlp.pipe(blocs,as_tuples=True,batch_size=self.tailleLot,n_process=self.nbProcessus)
+
+        itexteCourant = None
+        while(True):
+            #seule l'analyse par spacy d'un paquet de blocs se fait sous le verrou
+            with self.verrouModele:
+                paquet = list(islice(docs,self.tailleLot))
+            if(not paquet):
+                break
+            for txtTag,itexte in paquet:
+                if(itexte != itexteCourant):
+                    #tous les blocs du texte précédent sont analysés
+                    if(itexteCourant is not None):
+                        yield self.finaliser(listeTerme),nbMot
+                    itexteCourant = itexte
+                    listeTerme = []
+                    nbMot = 0
+                listeTerme += self.termesBruts(txtTag)
+                nbMot += self.compterMots(txtTag)
+
+        if(itexteCourant is not None):
+            yield self.finaliser(listeTerme),nbMot
+
+    def decouperTexte(self,texte):
+        """Générateur qui découpe le texte en blocs d'au plus tailleBloc caractères.
+        On coupe de préférence entre deux paragraphes, sinon entre deux lignes,
+        deux phrases ou deux mots. Un texte donne toujours au moins un bloc.
+
+        Parameters
+        ----------
+        texte : str
+             Texte à découper
+
+        Yields
+        ------
+        str
+            Les blocs du texte dans l'ordre
+        """
+        debut = 0
+        while(len(texte)-debut > self.tailleBloc):
+            fin = debut+self.tailleBloc
+            coupe = fin
+            for separateur in SEPARATEURS_BLOCS:
+                i = texte.rfind(separateur,debut+1,fin)
+                if(i > debut):
+                    coupe = i+len(separateur)
+                    break
+            yield texte[debut:coupe]
+            debut = coupe
+        yield texte[debut:]
+
+    def preparerTexte(self,texte):
+        """Prépare le texte avant de le donner à spacy.
+
+        Parameters
+        ----------
+        texte : str
+             Texte duquel on veut extraire les termes
+
+        Returns
+        -------
+        str
+            Le texte en minuscule sans saut de ligne
         """
         #on met tout en miniscule et on remplace les sauts de lignes qui posent des problèmes à spacy
-        txt = texte.replace('\n',' ').lower()
+        return texte.replace('\n',' ').lower()
+
+    def tokeniser(self,texte):
+        """Découpe le texte préparé en tokens avec le tokenizer du modèle.
 
-        if(self.nlp.max_length < len(txt)):
-            #Le texte est trop grand, spacy nous met en garde et peut lever allocationError.
-            #Une solution pourrait être de le couper en plusieurs blocs qu'on analyserait
-            #bloc par bloc de taille plus raisonnable.
-            self.nlp.max_length = len(txt)
+        Le pipeline reçoit ainsi un Doc et spacy ne compare pas la longueur du
+        texte à max_length : la taille des blocs est bornée par tailleBloc,
+        propre à l'extracteur, sans modifier le modèle partagé. La mise en
+        minuscule peut allonger légèrement un bloc au delà de tailleBloc.
 
-        txtTag = self.nlp(txt)
+        Parameters
+        ----------
+        texte : str
+             Texte préparé par preparerTexte
 
+        Returns
+        -------
+        Doc
+            Le texte découpé en tokens, pas encore analysé
+        """
+        return self.nlp.tokenizer(texte)
+
+    def entreePipe(self,texte):
+        """Renvoie ce qui est donné à nlp.pipe pour un texte préparé : le texte
+        lui-même s'il respecte la limite d'origine du modèle, sinon le texte
+        déjà découpé en tokens, que spacy accepte quelle que soit sa longueur.
+
+        Parameters
+        ----------
+        texte : str
+             Texte préparé par preparerTexte
+
+        Returns
+        -------
+        str|Doc
+            Le texte ou ses tokens
+        """
+        if(len(texte) <= self.longueurMaxModele):
+            return texte
+        return self.tokeniser(texte)
+
+    def compterMots(self,txtTag):
+        """Compte les mots d'un texte analysé par spacy
+
+        Parameters
+        ----------
+        txtTag : Doc
+            Le texte analysé par spacy
+
+        Returns
+        -------
+        int
+            Le nombre de tokens qui ne sont pas des espaces
+        """
+        return sum(1 for t in txtTag if not t.is_space)
+
+    def termesBruts(self,txtTag):
+        """Sélectionne les termes d'un texte analysé par spacy, avant qu'ils
+        soient nettoyés et finalisés.
+
+        Parameters
+        ----------
+        txtTag : Doc
+            Le texte analysé par spacy
+
+        Returns
+        -------
+        list[tuple[str*]]
+            liste des termes temporaires du texte
+        """
         #On recupère l'ensemble des noms dans le texte qui donneront les termes par la suite.
         #On fait une première sélection en retirant les noms dépendants d'autres noms
         #sauf si c'est lui même ce qui signifie qu'il serait la racine.
@@ -76,5 +322,4 @@ class ExtracteurSpacy(Extracteur):
             if('(' in termetmp):
                 listeTerme[iterme] = termetmp[:termetmp.index('(')]
 
-        #on compose nos termes finaux qu'on renvoie
-        return self.finaliser(listeTerme)
+        return listeTerme
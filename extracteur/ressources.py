@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+Chemins des ressources du projet. Ce module n'importe que la bibliothèque
+standard pour pouvoir être importé sans charger nltk ni spacy.
+"""
+import os
+
+#Dossier des ressources du projet, les chemins ne dépendent pas du répertoire courant
+DOSSIER_RESSOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'ressources')
+#Chemin vers un fichier qui contient un ensemble de mots vides, un mot par ligne
+PATH_MOTSVIDES = os.path.join(DOSSIER_RESSOURCES,'stopwords.fr')
+#Chemin vers la sauvegarde du cache mot/stem, enregistrée avec l'index de référence
+PATH_CACHESTEM = os.path.join(DOSSIER_RESSOURCES,'cacheStem.pkl')
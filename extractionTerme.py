@@ -1,29 +1,132 @@
 # -*- coding: utf-8 -*-
 """
 Programme principale pour l'extraction de terme.
-A appeler avec un fichier de config en argument
+A appeler avec un fichier de config en argument, l'option --topk permet de
+n'écrire que les termes les mieux notés.
 """
-import sys
+import argparse
 import os
 import csv
+import importlib
 from config.config import Config,METHODES_EXTRACTION,METHODES_SCORING
 from indexeur.indexeur import Indexeur
-from extracteur.extracteurSpacy import ExtracteurSpacy
-from extracteur.extracteurNGrammes import ExtracteurNGrammes
+from indexeur.indexeurDisque import IndexeurDisque,VERSION_INDEX
+from indexeur.cacheReference import CacheReference
+from indexeur.statistiquesReference import StatistiquesReference
+from extracteur.ressources import PATH_CACHESTEM,PATH_MOTSVIDES,DOSSIER_RESSOURCES
 from parserCorpus.parserArticle import ParserArticle
 from parserCorpus.parserSplit import ParserSplit
-from classeur.classeurTFIDF import ClasseurTFIDF
-from classeur.classeurFrequence import ClasseurFrequence
-from classeur.classeurCValue import ClasseurCValue
-from classeur.classeurOkapi import ClasseurOkapi
 
-PATH_CORPUSREF = 'ressources/corpus_ref.fr'
+PATH_CORPUSREF = os.path.join(DOSSIER_RESSOURCES,'corpus_ref.fr')
+#Dossier du cache des index et statistiques du corpus de référence
+DOSSIER_CACHEREF = os.path.join(DOSSIER_RESSOURCES,'cacheReference')
+
+#Extracteur de chaque méthode d'extraction : module et classe. Le module n'est
+#importé que lorsque la méthode est utilisée, spacy n'est chargé que pour POSTAG
+EXTRACTEURS = {METHODES_EXTRACTION.POSTAG : ('extracteur.extracteurSpacy','ExtracteurSpacy'),
+               METHODES_EXTRACTION.NGRAMMES : ('extracteur.extracteurNGrammes','ExtracteurNGrammes')}
+
+#Classeur de chaque méthode de scoring : module, classe et si le classeur a besoin
+#des statistiques du corpus de référence
+CLASSEURS = {METHODES_SCORING.FREQUENCE : ('classeur.classeurFrequence','ClasseurFrequence',False),
+             METHODES_SCORING.TFIDF_STANDARD : ('classeur.classeurTFIDF','ClasseurTFIDF',True),
+             METHODES_SCORING.TFIDF_LOG : ('classeur.classeurTFIDF','ClasseurTFIDF',True),
+             METHODES_SCORING.OKAPI : ('classeur.classeurOkapi','ClasseurOkapi',True),
+             METHODES_SCORING.OKAPI_PLUS : ('classeur.classeurOkapi','ClasseurOkapi',True),
+             METHODES_SCORING.OKAPI_L : ('classeur.classeurOkapi','ClasseurOkapi',True)}
+
+def importerClasse(module,classe):
+    """Importe un module s'il ne l'est pas déjà et renvoie une de ses classes
+
+    Parameters
+    ----------
+    module : str
+        Nom complet du module
+    classe : str
+        Nom de la classe dans le module
+
+    Returns
+    -------
+    type
+        La classe demandée
+    """
+    return getattr(importlib.import_module(module),classe)
+
+def utiliseReference(config):
+    """Indique si le classeur de la configuration a besoin des statistiques
+    du corpus de référence. Sinon il n'est pas utile de les charger (ni de les
+    calculer si elles ne sont pas dans le cache).
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    bool
+        True si le classeur utilise les statistiques du corpus de référence
+    """
+    return CLASSEURS[config.getMethodeScoring()][2]
+
+def recupererCacheReference(config):
+    """Permet de récupérer le cache des fichiers calculés depuis le corpus de
+    référence.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    CacheReference
+        Le cache des index et statistiques du corpus de référence
+    """
+    return CacheReference(DOSSIER_CACHEREF,config.getTailleCacheRef()*1024*1024)
+
+def cleReference(config,cache):
+    """Calcule la clé des fichiers du corpus de référence pour cette configuration.
+    Elle dépend du contenu du corpus de référence et des mots vides, de la
+    version des bibliothèques utilisées et de tous les paramètres qui changent
+    les termes extraits du corpus de référence.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    cache : CacheReference
+        Le cache des fichiers du corpus de référence
+
+    Returns
+    -------
+    str
+        La clé des fichiers du corpus de référence
+    """
+    #nltk et spacy ne sont importés que pour leur version, le démarrage reste rapide
+    import nltk
+    parametres = ['indexeur='+str(VERSION_INDEX),
+                  'nltk='+nltk.__version__,
+                  'methodeExtraction='+config.getMethodeExtraction().name,
+                  'stem='+str(config.getStem()),
+                  'seuilNbOccMin='+str(config.getSeuilNbOccMin())]
+    if(config.getMethodeExtraction() == METHODES_EXTRACTION.POSTAG):
+        #les termes dépendent du modèle spacy et des composants gardés
+        import spacy
+        parametres += ['spacy='+spacy.__version__,
+                       'modeleSpacy='+config.getModeleSpacy(),
+                       'versionModele='+str(spacy.util.get_package_version(config.getModeleSpacy())),
+                       'composantsSpacy='+','.join(config.getComposantsSpacy()),
+                       'tailleBloc='+str(config.getTailleBloc())]
+    return cache.cle(parametres,[PATH_CORPUSREF,PATH_MOTSVIDES])
 
 def recupererIndexeurReference(config):
     """Permet de récupérer l'indexeur du corpus de référence correspondant à
     la configuration.
 
-    Comme le traitement est long, si l'indexeur a déjà été créé alors il est chargé,
+    Comme le traitement est long, l'indexeur est gardé dans le cache du corpus
+    de référence. S'il y est déjà il est ouvert depuis son fichier binaire,
     sinon il est calculé puis enregistré pour les prochaines fois.
 
     Parameters
@@ -36,38 +139,87 @@ def recupererIndexeurReference(config):
     Indexeur
         L'indexeur du corpus de référence correspondant à la configuration
     """
-    pathInd = 'ressources/indRef_'+str(config.getMethodeExtraction().name)+ \
-            '_'+str(config.getStem())+'.pkl'
-
-    #si le fichier existe
-    if(os.path.exists(pathInd)):
-        return Indexeur.charger(pathInd)
-    #sinon on le crée
-    else:
-        #On modifie la config pour que tous les chargements soit moins long
-        #Pour l'indexeur du corpus de référence on prend toujours une config où la longueur
-        #des termes est comprise entre 1 et 8.
-        #Comme ça, on ne créé pas un indexeur pour chaque configuration de longueur différente.
-        #Et ça ne change rien, si on demande les termes plus petit ils seront présent dans celui là.
-        #Si on demande plus grand ça ne changera pas ou peu l'idf car il est peu probable de
-        #trouver les mêmes termes de longueur plus grande que 8 dans le corpus de référence.
-        configRef = config.copy()
-        configRef.longueurMin = 1
-        configRef.longueurMax = 8
-
-        #récupère le corpus de référence
-        corpusRef = ParserArticle().parse(PATH_CORPUSREF)
-
-        #on crée l'extracteur correspondant au fichier de config
-        extracteur = recupererExtracteur(configRef)
-
-        #on extrait les termes du corpus de référence
-        corpusRef.extraction(extracteur)
-        #on crée l'indexation et on la sauvegarde pour ne pas recalculer la prochaine fois
-        indexation = Indexeur(corpusRef)
-        indexation.sauvegarder(pathInd)
-
-        return indexation
+    cache = recupererCacheReference(config)
+    return cache.recuperer(cleReference(config,cache),'idx',
+                           lambda path: construireIndexeurReference(config,path),
+                           IndexeurDisque)
+
+def construireIndexeurReference(config,path):
+    """Calcule l'indexeur du corpus de référence et l'écrit au format binaire.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    path : str
+        Chemin où écrire l'indexeur
+    """
+    #On modifie la config pour que tous les chargements soit moins long
+    #Pour l'indexeur du corpus de référence on prend toujours une config où la longueur
+    #des termes est comprise entre 1 et 8.
+    #Comme ça, on ne créé pas un indexeur pour chaque configuration de longueur différente.
+    #Et ça ne change rien, si on demande les termes plus petit ils seront présent dans celui là.
+    #Si on demande plus grand ça ne changera pas ou peu l'idf car il est peu probable de
+    #trouver les mêmes termes de longueur plus grande que 8 dans le corpus de référence.
+    configRef = config.copy()
+    configRef.longueurMin = 1
+    configRef.longueurMax = 8
+
+    #récupère le corpus de référence, les articles sont lus au fur et à mesure
+    #de l'extraction et leur contenu est libéré une fois les termes extraits
+    corpusRef = ParserArticle().parseParesseux(PATH_CORPUSREF,garderContenu=False)
+
+    #on crée l'extracteur correspondant au fichier de config
+    extracteur = recupererExtracteur(configRef)
+
+    #on extrait les termes du corpus de référence
+    corpusRef.extraction(extracteur)
+    #on crée l'indexation et on la sauvegarde pour ne pas recalculer la prochaine fois
+    indexation = Indexeur(corpusRef)
+    IndexeurDisque.ecrire(indexation,path)
+
+    #on garde le cache mot/stem pour que les prochains extracteurs démarrent avec
+    if(configRef.getStem()):
+        extracteur.getCacheStem().sauvegarder(PATH_CACHESTEM)
+
+def recupererStatistiquesReference(config):
+    """Permet de récupérer les statistiques du corpus de référence (idf des
+    termes et nombre moyen de mots) correspondant à la configuration.
+
+    Les statistiques sont gardées dans le cache du corpus de référence avec la
+    même clé que l'indexeur. Si elles n'y sont pas elles sont calculées depuis
+    l'indexeur de référence puis enregistrées.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    StatistiquesReference
+        Les statistiques du corpus de référence correspondant à la configuration
+    """
+    cache = recupererCacheReference(config)
+    return cache.recuperer(cleReference(config,cache),'stats',
+                           lambda path: construireStatistiquesReference(config,path),
+                           StatistiquesReference.charger)
+
+def construireStatistiquesReference(config,path):
+    """Calcule les statistiques du corpus de référence depuis son indexeur et
+    les enregistre.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    path : str
+        Chemin où enregistrer les statistiques
+    """
+    with recupererIndexeurReference(config) as indexation:
+        StatistiquesReference.depuisIndexeur(indexation).sauvegarder(path)
 
 def recupererExtracteur(config):
     """Permet de récupérer l'extracteur correspondant à la configuration
@@ -82,14 +234,10 @@ def recupererExtracteur(config):
     Extracteur
         L'extracteur correspondant à la configuration
     """
-    #on crée l'extracteur correspondant au fichier de config
-    if(config.getMethodeExtraction() == METHODES_EXTRACTION.POSTAG):
-        return ExtracteurSpacy(config)
-
-    if(config.getMethodeExtraction() == METHODES_EXTRACTION.NGRAMMES):
-        return ExtracteurNGrammes(config)
+    module,classe = EXTRACTEURS[config.getMethodeExtraction()]
+    return importerClasse(module,classe)(config)
 
-def recupererClasseur(config,indexCorpusRef):
+def recupererClasseur(config,statsRef):
     """Permet de récupérer le classeur correspondant à la configuration
 
     Parameters
@@ -97,24 +245,19 @@ def recupererClasseur(config,indexCorpusRef):
     config : Config
         objet de configuration
 
-    indexCorpusRef: Indexeur
-        Certains classeurs ont besoin d'un corpus de référence
+    statsRef: StatistiquesReference
+        Certains classeurs ont besoin des statistiques d'un corpus de référence,
+        None pour ceux qui n'en ont pas besoin (voir utiliseReference)
 
     Returns
     -------
     Classeur
         Classeur correspondant à la configuration
     """
-    #on crée l'extracteur correspondant au fichier de config
-    if(config.getMethodeScoring() == METHODES_SCORING.FREQUENCE):
-        return ClasseurFrequence(config)
-
-    elif(config.getMethodeScoring() == METHODES_SCORING.TFIDF_STANDARD or\
-       config.getMethodeScoring() == METHODES_SCORING.TFIDF_LOG):
-        return ClasseurTFIDF(config,indexCorpusRef)
-
-    elif(config.getMethodeScoring() == METHODES_SCORING.OKAPI):
-        return ClasseurOkapi(config,indexCorpusRef)
+    module,classe,avecReference = CLASSEURS[config.getMethodeScoring()]
+    if(avecReference):
+        return importerClasse(module,classe)(config,statsRef)
+    return importerClasse(module,classe)(config)
 
 def ecrireCSV(lignes,csvpath):
     """Ecrit dans un fichier csv le classement des termes obtenus avant.
@@ -133,18 +276,62 @@ def ecrireCSV(lignes,csvpath):
             strTerme = ' '.join(terme)
             csvWriter.writerow([str(i),strTerme,str(score)])
 
+def ecrireClassement(listeTermesTrie,extracteur,config,csvpath):
+    """Ecrit dans un fichier csv le classement des termes donné par un classeur.
+    Si stem est vrai dans la config, les stems sont remplacés par leur forme
+    la plus fréquente dans le corpus.
+
+    Parameters
+    ----------
+    listeTermesTrie : list[tuple[tuple[str*],float]]
+        Les termes classés avec leur score
+
+    extracteur : Extracteur
+        L'extracteur qui a extrait les termes du corpus
+
+    config : Config
+        objet de configuration
+
+    csvpath : str
+        Chemin du fichier csv
+    """
+    #on découpe la liste des termes et scores
+    listeTermes = [terme for terme,score in listeTermesTrie]
+    listeScores = [score for terme,score in listeTermesTrie]
+
+    #si stem = True alors on reconstruit les stems en des termes plus compréhensibles
+    if(config.getStem()):
+        listeTermes = extracteur.stemToTerme(listeTermes)
+
+    #on écrit dans un csv le résultat
+    lignes = zip(list(range(1,len(listeTermes)+1)),listeTermes,listeScores)
+    ecrireCSV(lignes,csvpath)
+
 if __name__=='__main__':
     #on récupère le chemin d'où on appelle le script
     cheminAppel = os.getcwd()
     #Pour la suite on se place dans le repértoire qui contient le script
     os.chdir(os.path.abspath(os.path.dirname( __file__)))
 
+    #récupération des arguments de la ligne de commande
+    parser = argparse.ArgumentParser(description="Extraction des termes d'un corpus")
+    parser.add_argument('config',help='chemin du fichier de config')
+    parser.add_argument('--topk',type=int,default=None,
+                        help='nombre de termes écrits, les mieux notés (remplace TOPK de la config)')
+    arguments = parser.parse_args()
+
     #récupération du fichier de config et initialise l'objet Config
-    pathConfig = sys.argv[1]
+    pathConfig = arguments.config
     config = Config(os.path.join(cheminAppel,pathConfig))
+    if(arguments.topk is not None):
+        if(arguments.topk < 0):
+            parser.error('--topk doit être positif')
+        config.topK = arguments.topk
 
-    #on récupère l'indexation de référence
-    indRef = recupererIndexeurReference(config)
+    #on récupère les statistiques du corpus de référence, si le classeur s'en sert
+    statsRef = None
+    if(utiliseReference(config)):
+        statsRef = recupererStatistiquesReference(config)
 
     #on récupère le corpus à traiter
     pathCorpus = config.getCorpusPath()
@@ -158,19 +345,10 @@ if __name__=='__main__':
     indexCorpus = Indexeur(corpus)
 
     #on récupère le classeur pour classer les termes du corpus
-    classeur = recupererClasseur(config,indRef)
-
-    #on récupère les termes classés avec leur score
-    listeTermesTrie = classeur.classer(indexCorpus)
+    classeur = recupererClasseur(config,statsRef)
 
-    #on découpe la liste des termes et scores
-    listeTermes = [terme for terme,score in listeTermesTrie]
-    listeScores = [score for terme,score in listeTermesTrie]
+    #on récupère les termes classés avec leur score, seulement les topK premiers si demandé
+    listeTermesTrie = classeur.classer(indexCorpus,config.getTopK())
 
-    #si stem = True alors on reconstruit les stems en des termes plus compréhensibles
-    if(config.getStem()):
-        listeTermes = extracteur.stemToTerme(listeTermes)
-
-    #on écrit dans un csv le résultat
-    lignes = zip(list(range(1,len(listeTermes)+1)),listeTermes,listeScores)
-    ecrireCSV(lignes,os.path.join(cheminAppel,config.getOutputPath()))
+    #on écrit le classement dans un csv
+    ecrireClassement(listeTermesTrie,extracteur,config,os.path.join(cheminAppel,config.getOutputPath()))
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Programme pour l'extraction de terme avec plusieurs configurations sur le même
+corpus. A appeler avec les fichiers de config en arguments.
+
+Les configurations qui extraient les mêmes termes du corpus sont regroupées :
+pour chaque groupe le corpus est lu, ses termes sont extraits et indexés une
+seule fois, puis chaque configuration du groupe est classée sur l'index commun.
+Avec POSTAG la longueur des termes ne change que le filtre appliqué à la fin de
+l'extraction, les configurations de longueurs différentes sont donc dans le
+même groupe et l'index est filtré pour chaque longueur.
+"""
+import argparse
+import os
+from config.config import Config,METHODES_EXTRACTION
+from indexeur.indexeur import Indexeur
+from parserCorpus.parserSplit import ParserSplit
+from extractionTerme import recupererStatistiquesReference,recupererExtracteur,\
+                            recupererClasseur,ecrireClassement,utiliseReference,importerClasse
+
+def cleExtraction(config):
+    """Renvoie la clé des paramètres qui changent les termes extraits du corpus.
+    Deux configurations avec la même clé partagent l'extraction et l'index.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    tuple
+        La clé d'extraction de la configuration
+    """
+    cle = (os.path.abspath(config.getCorpusPath()),config.getMethodeExtraction(),
+           config.getStem(),config.getSeuilNbOccMin())
+    if(config.getMethodeExtraction() == METHODES_EXTRACTION.POSTAG):
+        #la longueur des termes n'est pas dans la clé, l'index est filtré ensuite
+        return cle+(config.getModeleSpacy(),tuple(config.getComposantsSpacy()),config.getTailleBloc())
+    #les n-grammes générés dépendent des longueurs, et le nettoyage peut raccourcir
+    #un n-gramme plus long en un terme de la bonne longueur
+    return cle+(config.getLongueurMin(),config.getLongueurMax())
+
+def cleScoring(config):
+    """Renvoie la clé des paramètres qui changent le score des termes, hors
+    C-value. Deux configurations du même groupe, de même longueur et avec la
+    même clé ont le même score avant la combinaison avec la C-value.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    tuple
+        La clé de scoring de la configuration
+    """
+    return (config.getMethodeScoring(),config.getFormuleAgregation(),config.getAgregationK(),
+            config.getAgregationPercentile(),config.getAgregationCentroides(),
+            config.getOkapiK(),config.getOkapiB(),config.getOkapiDelta(),config.getMoteurScoring())
+
+def grouperConfigs(configs):
+    """Regroupe les configurations par clé d'extraction, dans l'ordre de la
+    première configuration de chaque groupe.
+
+    Parameters
+    ----------
+    configs : list[Config]
+        Les configurations
+
+    Returns
+    -------
+    list[list[Config]]
+        Les groupes de configurations
+    """
+    groupes = dict()
+    for config in configs:
+        groupes.setdefault(cleExtraction(config),[]).append(config)
+    return list(groupes.values())
+
+def executerGroupe(configs):
+    """Extrait et indexe une fois les termes du corpus d'un groupe de
+    configurations, puis écrit le classement de chaque configuration.
+
+    Les statistiques du corpus de référence sont chargées une fois, l'index est
+    filtré une fois par longueur, la C-value est calculée une fois par longueur
+    et le score avant C-value une fois par longueur et clé de scoring.
+
+    Parameters
+    ----------
+    configs : list[Config]
+        Configurations de même clé d'extraction
+    """
+    #config d'extraction du groupe, qui garde les termes de toutes les longueurs demandées
+    configGroupe = configs[0].copy()
+    configGroupe.longueurMin = min(config.getLongueurMin() for config in configs)
+    configGroupe.longueurMax = max(config.getLongueurMax() for config in configs)
+
+    #la clé du corpus de référence ne dépend pas des longueurs, elle est la même pour tout le groupe.
+    #Elles ne sont chargées que si un classeur du groupe s'en sert
+    statsRef = None
+    if(any(utiliseReference(config) for config in configs)):
+        statsRef = recupererStatistiquesReference(configGroupe)
+
+    corpus = ParserSplit().parse(configGroupe.getCorpusPath())
+    extracteur = recupererExtracteur(configGroupe)
+    corpus.extraction(extracteur)
+    indexCorpus = Indexeur(corpus)
+
+    indexLongueur = {(configGroupe.getLongueurMin(),configGroupe.getLongueurMax()) : indexCorpus}
+    cValueLongueur = dict()
+    scores = dict()
+    for config in configs:
+        longueurs = (config.getLongueurMin(),config.getLongueurMax())
+        if(longueurs not in indexLongueur):
+            indexLongueur[longueurs] = indexCorpus.filtrerLongueur(*longueurs)
+        index = indexLongueur[longueurs]
+
+        classeur = recupererClasseur(config,statsRef)
+        cle = (longueurs,cleScoring(config))
+        if(cle not in scores):
+            scores[cle] = classeur.noterSansCValue(index)
+        dictTerme = scores[cle]
+
+        if(classeur.combinableCValue and config.getCValue()):
+            classeurCValue = importerClasse('classeur.classeurCValue','ClasseurCValue')(config)
+            if(longueurs not in cValueLongueur):
+                cValueLongueur[longueurs] = classeurCValue.noter(index)
+            dictTerme = classeurCValue.combinerCValue(index,dictTerme,cValueLongueur[longueurs])
+
+        ecrireClassement(classeur.trier(dictTerme,config.getTopK()),extracteur,config,config.getOutputPath())
+
+def executerGrille(configs):
+    """Écrit le classement de chaque configuration, en partageant l'extraction
+    et l'index entre les configurations qui le permettent.
+
+    Parameters
+    ----------
+    configs : list[Config]
+        Les configurations, les chemins du corpus et du csv sont absolus ou
+        relatifs au répertoire courant
+    """
+    for groupe in grouperConfigs(configs):
+        executerGroupe(groupe)
+
+if __name__=='__main__':
+    #on récupère le chemin d'où on appelle le script
+    cheminAppel = os.getcwd()
+    #Pour la suite on se place dans le repértoire qui contient le script
+    os.chdir(os.path.abspath(os.path.dirname( __file__)))
+
+    #récupération des arguments de la ligne de commande
+    parser = argparse.ArgumentParser(description="Extraction des termes d'un corpus avec plusieurs configurations")
+    parser.add_argument('configs',nargs='+',help='chemins des fichiers de config')
+    arguments = parser.parse_args()
+
+    #les chemins du corpus et du csv de chaque config sont relatifs au répertoire d'appel
+    configs = []
+    for pathConfig in arguments.configs:
+        config = Config(os.path.join(cheminAppel,pathConfig))
+        config.corpusPath = os.path.join(cheminAppel,config.getCorpusPath())
+        config.outputPath = os.path.join(cheminAppel,config.getOutputPath())
+        configs.append(config)
+
+    executerGrille(configs)
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import hashlib
+import threading
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:
+    #sous Windows on verrouille avec msvcrt
+    fcntl = None
+    import msvcrt
+
+#Version du contenu du cache, à changer si la façon de construire les entrées change
+VERSION_CACHE = 1
+#Fichier du dossier de cache qui garde les empreintes des fichiers déjà calculées
+NOM_EMPREINTES = 'empreintes.pkl'
+#Extension des fichiers de verrou et des fichiers en cours d'écriture
+EXTENSION_VERROU = '.lock'
+EXTENSION_TEMPORAIRE = '.tmp'
+#Taille des morceaux lus pour calculer l'empreinte d'un fichier
+TAILLE_MORCEAU = 1 << 20
+
+def verrouValide(f,path):
+    """Indique si le fichier de verrou ouvert f est toujours celui qui se
+    trouve à l'emplacement path. Ce n'est plus le cas si evincer l'a supprimé
+    pendant qu'on attendait le verrou : le verrou pris ne protège alors plus rien.
+
+    Parameters
+    ----------
+    f : file
+        Le fichier de verrou ouvert
+    path : str
+        Chemin du fichier de verrou
+
+    Returns
+    -------
+    bool
+        True si path désigne encore le fichier ouvert
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    statOuvert = os.fstat(f.fileno())
+    return (stat.st_dev,stat.st_ino) == (statOuvert.st_dev,statOuvert.st_ino)
+
+def deverrouiller(f):
+    """Libère le verrou pris sur le fichier ouvert f
+
+    Parameters
+    ----------
+    f : file
+        Le fichier de verrou ouvert
+    """
+    if(fcntl is not None):
+        fcntl.flock(f.fileno(),fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(),msvcrt.LK_UNLCK,1)
+
+@contextmanager
+def verrouFichier(path):
+    """Verrou exclusif entre processus sur le fichier path, créé si besoin.
+    S'utilise avec with, le verrou est libéré à la sortie du bloc. Si le
+    fichier de verrou est supprimé pendant l'attente, on verrouille le nouveau.
+
+    Parameters
+    ----------
+    path : str
+        Chemin du fichier de verrou
+    """
+    while(True):
+        with open(path,'a+b') as f:
+            if(fcntl is not None):
+                fcntl.flock(f.fileno(),fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                #msvcrt.locking abandonne au bout de 10 secondes, on réessaie
+                while(True):
+                    try:
+                        msvcrt.locking(f.fileno(),msvcrt.LK_LOCK,1)
+                        break
+                    except OSError:
+                        pass
+            if(not verrouValide(f,path)):
+                deverrouiller(f)
+                continue
+            try:
+                yield
+            finally:
+                deverrouiller(f)
+            return
+
+@contextmanager
+def essayerVerrouFichier(path):
+    """Comme verrouFichier mais sans attendre : renvoie (avec with) True si le
+    verrou est pris, False s'il est déjà tenu ailleurs ou si le fichier de
+    verrou vient d'être supprimé.
+
+    Parameters
+    ----------
+    path : str
+        Chemin du fichier de verrou
+    """
+    with open(path,'a+b') as f:
+        try:
+            if(fcntl is not None):
+                fcntl.flock(f.fileno(),fcntl.LOCK_EX|fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(),msvcrt.LK_NBLCK,1)
+        except OSError:
+            yield False
+            return
+        if(not verrouValide(f,path)):
+            deverrouiller(f)
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            deverrouiller(f)
+
+class CacheReference:
+    """
+    Cache des fichiers calculés depuis le corpus de référence (index,
+    statistiques). Chaque entrée est nommée par une clé qui est l'empreinte de
+    tout ce qui influence son contenu : le contenu des fichiers de ressources
+    et les paramètres de l'extraction. Si l'un d'eux change, la clé change et
+    l'entrée est recalculée au lieu d'être réutilisée.
+
+    Les entrées sont écrites dans un fichier temporaire puis renommées, un
+    lecteur ne voit donc jamais un fichier à moitié écrit. Un verrou par entrée
+    évite que plusieurs processus la calculent en même temps, il est aussi pris
+    pour l'ouvrir. Quand la taille du dossier dépasse tailleMax, les entrées
+    utilisées le moins récemment sont supprimées, sauf celles dont le verrou
+    est tenu.
+
+    Attributes
+    ----------
+    dossier : str
+        Dossier qui contient les entrées du cache
+
+    tailleMax : int
+        Taille maximale en octets des entrées du cache
+
+    empreintes : dict[str,tuple[int,int,str]]
+        Pour chaque fichier de ressource déjà lu, sa taille, sa date de
+        modification et l'empreinte de son contenu
+    """
+    def __init__(self,dossier,tailleMax):
+        """Constructeur de la classe CacheReference
+
+        Parameters
+        ----------
+        dossier : str
+            Dossier qui contient les entrées du cache, créé si besoin
+
+        tailleMax : int
+            Taille maximale en octets des entrées du cache
+        """
+        self.dossier = dossier
+        self.tailleMax = tailleMax
+        os.makedirs(dossier,exist_ok=True)
+        self.empreintes = self.chargerEmpreintes(os.path.join(dossier,NOM_EMPREINTES))
+
+    def empreinteFichier(self,path):
+        """Renvoie l'empreinte sha256 du contenu du fichier. Elle n'est
+        recalculée que si la taille ou la date de modification du fichier ont
+        changé depuis le dernier calcul.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier
+
+        Returns
+        -------
+        str
+            L'empreinte du contenu du fichier en hexadécimal
+        """
+        pathAbsolu = os.path.abspath(path)
+        stat = os.stat(pathAbsolu)
+        connue = self.empreintes.get(pathAbsolu)
+        if(connue is not None and connue[0] == stat.st_size and connue[1] == stat.st_mtime_ns):
+            return connue[2]
+
+        h = hashlib.sha256()
+        with open(pathAbsolu,'rb') as f:
+            for morceau in iter(lambda: f.read(TAILLE_MORCEAU),b''):
+                h.update(morceau)
+        empreinte = h.hexdigest()
+
+        self.empreintes[pathAbsolu] = (stat.st_size,stat.st_mtime_ns,empreinte)
+        pathEmpreintes = os.path.join(self.dossier,NOM_EMPREINTES)
+        with verrouFichier(pathEmpreintes+EXTENSION_VERROU):
+            #on garde les empreintes enregistrées entre temps par d'autres processus
+            empreintes = self.chargerEmpreintes(pathEmpreintes)
+            empreintes.update(self.empreintes)
+            self.ecrireAtomique(pathEmpreintes,lambda path: self.sauvegarderEmpreintes(path,empreintes))
+        return empreinte
+
+    def chargerEmpreintes(self,path):
+        """Charge les empreintes des fichiers enregistrées dans le cache.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de sauvegarde
+
+        Returns
+        -------
+        dict[str,tuple[int,int,str]]
+            Les empreintes, vide si le fichier n'existe pas ou est illisible
+        """
+        if(not os.path.exists(path)):
+            return dict()
+        try:
+            with open(path,'rb') as f:
+                return pickle.Unpickler(f).load()
+        except (OSError,pickle.UnpicklingError,EOFError):
+            #les empreintes seront recalculées
+            return dict()
+
+    def sauvegarderEmpreintes(self,path,empreintes):
+        """Sauvegarde les empreintes des fichiers dans un fichier pickle.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de sauvegarde
+
+        empreintes : dict[str,tuple[int,int,str]]
+            Les empreintes à sauvegarder
+        """
+        with open(path,'wb') as f:
+            pickle.Pickler(f).dump(empreintes)
+
+    def cle(self,parametres,fichiers):
+        """Calcule la clé d'une entrée du cache.
+
+        Parameters
+        ----------
+        parametres : list[str]
+            Les paramètres qui influencent le contenu de l'entrée
+
+        fichiers : list[str]
+            Chemins des fichiers dont le contenu influence l'entrée
+
+        Returns
+        -------
+        str
+            La clé de l'entrée en hexadécimal
+        """
+        h = hashlib.sha256()
+        elements = ['version='+str(VERSION_CACHE)] + list(parametres) + \
+                   [self.empreinteFichier(path) for path in fichiers]
+        for element in elements:
+            h.update(element.encode('utf-8'))
+            h.update(b'\x00')
+        return h.hexdigest()
+
+    def chemin(self,cle,extension):
+        """Renvoie le chemin d'une entrée du cache
+
+        Parameters
+        ----------
+        cle : str
+            Clé de l'entrée
+
+        extension : str
+            Extension qui distingue les entrées de même clé
+
+        Returns
+        -------
+        str
+            Le chemin de l'entrée
+        """
+        return os.path.join(self.dossier,cle+'.'+extension)
+
+    def recuperer(self,cle,extension,construire,ouvrir):
+        """Renvoie l'entrée du cache, calculée et enregistrée si elle n'existe
+        pas encore.
+
+        Parameters
+        ----------
+        cle : str
+            Clé de l'entrée
+
+        extension : str
+            Extension qui distingue les entrées de même clé
+
+        construire : callable[[str],None]
+            Fonction qui calcule l'entrée et l'écrit dans le fichier passé en
+            paramètre
+
+        ouvrir : callable[[str],object]
+            Fonction qui ouvre l'entrée depuis son fichier
+
+        Returns
+        -------
+        object
+            L'entrée renvoyée par ouvrir
+        """
+        path = self.chemin(cle,extension)
+        #le verrou de l'entrée empêche qu'elle soit supprimée par evincer entre
+        #le test d'existence et son ouverture
+        with verrouFichier(path+EXTENSION_VERROU):
+            #un autre processus a pu la calculer pendant qu'on attendait le verrou,
+            #ou la supprimer avant qu'on le prenne : on la calcule alors à nouveau
+            if(not os.path.exists(path)):
+                self.ecrireAtomique(path,construire)
+                self.evincer(path)
+            #la date de modification sert à savoir quelles entrées sont utilisées
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return ouvrir(path)
+
+    @staticmethod
+    def ecrireAtomique(path,ecrire):
+        """Ecrit un fichier dans un fichier temporaire puis le renomme, le
+        fichier path est donc soit l'ancien soit le nouveau, jamais à moitié écrit.
+        Sert aussi pour les fichiers de ressources écrits hors du cache.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier
+
+        ecrire : callable[[str],None]
+            Fonction qui écrit le fichier au chemin passé en paramètre
+        """
+        #le nom temporaire est propre au processus et au thread qui écrit
+        pathTemporaire = path+'.'+str(os.getpid())+'.'+str(threading.get_ident())+EXTENSION_TEMPORAIRE
+        try:
+            ecrire(pathTemporaire)
+            os.replace(pathTemporaire,path)
+        finally:
+            if(os.path.exists(pathTemporaire)):
+                os.remove(pathTemporaire)
+
+    def evincer(self,pathGarde=None):
+        """Supprime les entrées utilisées le moins récemment tant que la taille
+        des entrées dépasse tailleMax. Une entrée n'est supprimée que si son
+        verrou est libre : elle n'est ni en calcul ni en cours d'ouverture. Son
+        fichier de verrou est supprimé avec elle, pendant qu'on le tient.
+
+        Parameters
+        ----------
+        pathGarde : str
+            Chemin d'une entrée à ne pas supprimer, celle qu'on vient d'écrire
+        """
+        entrees = []
+        for nom in os.listdir(self.dossier):
+            if(nom == NOM_EMPREINTES or nom.endswith(EXTENSION_VERROU) or nom.endswith(EXTENSION_TEMPORAIRE)):
+                continue
+            path = os.path.join(self.dossier,nom)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entrees.append((stat.st_mtime_ns,stat.st_size,path))
+
+        taille = sum(t for _,t,_ in entrees)
+        for _,t,path in sorted(entrees):
+            if(taille <= self.tailleMax):
+                break
+            if(pathGarde is not None and os.path.abspath(path) == os.path.abspath(pathGarde)):
+                continue
+            with essayerVerrouFichier(path+EXTENSION_VERROU) as libre:
+                if(not libre):
+                    #entrée utilisée par un autre processus ou thread
+                    continue
+                try:
+                    os.remove(path)
+                    taille -= t
+                except OSError:
+                    #entrée encore ouverte par un autre processus sous Windows
+                    continue
+                try:
+                    #ceux qui attendent ce verrou verront qu'il a été supprimé (verrouValide)
+                    os.remove(path+EXTENSION_VERROU)
+                except OSError:
+                    pass
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+class IndexImbrication:
+    """
+    Index des termes imbriqués d'un Indexeur : pour chaque terme, les termes de
+    l'index qui le contiennent (une suite de mots consécutifs plus courte). Il
+    donne aussi la fréquence totale de chaque terme dans le corpus.
+
+    Les mots des termes sont remplacés par des entiers puis les termes sont
+    rangés dans un arbre préfixe (trie). Pour trouver les termes contenus dans
+    un terme, on descend dans l'arbre depuis chaque position du terme : on
+    s'arrête dès qu'aucun terme ne continue ce préfixe, sans créer de tuple
+    pour chaque sous-terme.
+
+    Attributes
+    ----------
+    termes : list[tuple[str*]]
+        Les termes de l'index, la position dans la liste est l'id du terme
+
+    freqs : list[int]
+        Fréquence totale de chaque terme dans le corpus
+
+    conteneurs : list[tuple[int*]]
+        Pour chaque terme, l'id des termes qui le contiennent
+    """
+    def __init__(self,indexeur):
+        """Constructeur de la classe IndexImbrication
+
+        Parameters
+        ----------
+        indexeur : Indexeur
+            L'index dont on veut les termes imbriqués
+        """
+        #les id des termes sont ceux des tableaux de l'index
+        if(indexeur.aDelta()):
+            indexeur = indexeur.compacte()
+        self.termes = [indexeur.getTermeParId(idTerme) for idTerme in range(indexeur.getNbIdsTerme())]
+
+        #fréquence totale de chaque terme, depuis les fréquences par document de l'index
+        _,termesDoc,freqsDoc = indexeur.getTableauxDoc()
+        self.freqs = [0]*len(self.termes)
+        freqs = self.freqs
+        for idTerme,freq in zip(termesDoc,freqsDoc):
+            freqs[idTerme] += freq
+
+        self.calculConteneurs()
+
+    def calculConteneurs(self):
+        """Construit l'arbre préfixe des termes puis calcule les conteneurs de
+        chaque terme.
+        """
+        #on remplace chaque mot par un entier
+        vocabulaire = dict()
+        termesMots = [[vocabulaire.setdefault(mot,len(vocabulaire)) for mot in terme] \
+                      for terme in self.termes]
+        nbMots = len(vocabulaire)
+
+        #arbre préfixe : le fils d'un noeud par un mot est enfants[noeud*nbMots+mot],
+        #le noeud 0 est la racine, termeNoeud donne l'id du terme qui finit au noeud ou -1
+        enfants = dict()
+        termeNoeud = [-1]
+        for idTerme,mots in enumerate(termesMots):
+            noeud = 0
+            for mot in mots:
+                cle = noeud*nbMots+mot
+                suivant = enfants.get(cle)
+                if(suivant is None):
+                    suivant = len(termeNoeud)
+                    enfants[cle] = suivant
+                    termeNoeud.append(-1)
+                noeud = suivant
+            termeNoeud[noeud] = idTerme
+
+        #pour chaque terme, on descend dans l'arbre depuis chacune de ses positions,
+        #depuis la première position on s'arrête avant le terme lui-même
+        conteneurs = [None]*len(self.termes)
+        enfant = enfants.get
+        for idTerme,mots in enumerate(termesMots):
+            nbmot = len(mots)
+            for debut in range(nbmot):
+                noeud = 0
+                for fin in range(debut,nbmot if debut > 0 else nbmot-1):
+                    noeud = enfant(noeud*nbMots+mots[fin])
+                    if(noeud is None):
+                        break
+                    idSousTerme = termeNoeud[noeud]
+                    if(idSousTerme >= 0):
+                        if(conteneurs[idSousTerme] is None):
+                            conteneurs[idSousTerme] = {idTerme}
+                        else:
+                            conteneurs[idSousTerme].add(idTerme)
+
+        self.conteneurs = [() if ens is None else tuple(ens) for ens in conteneurs]
+
+    def getTermes(self):
+        """Getter termes
+
+        Returns
+        -------
+        list[tuple[str*]]
+            Les termes de l'index
+        """
+        return self.termes
+
+    def getFreqs(self):
+        """Getter freqs
+
+        Returns
+        -------
+        list[int]
+            Fréquence totale de chaque terme dans le corpus
+        """
+        return self.freqs
+
+    def getFreqTerme(self,idTerme):
+        """Renvoie la fréquence totale d'un terme dans le corpus
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme dans l'index des termes imbriqués
+
+        Returns
+        -------
+        int
+            La fréquence totale du terme
+        """
+        return self.freqs[idTerme]
+
+    def getConteneurs(self,idTerme):
+        """Renvoie les termes qui contiennent un terme
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme dans l'index des termes imbriqués
+
+        Returns
+        -------
+        tuple[int*]
+            L'id des termes qui contiennent le terme
+        """
+        return self.conteneurs[idTerme]
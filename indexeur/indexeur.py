@@ -1,26 +1,86 @@
 # -*- coding: utf-8 -*-
 import math
 import pickle
+from array import array
 from collections import Counter
+from statistics import mean
+from indexeur.vuesIndex import VueIndex, VueIndexInv
+from indexeur.indexImbrication import IndexImbrication
 
 class Indexeur:
     """
     Objet permettant l'indexation des termes d'un corpus et des fonctionnalités
     d'accés aux valeurs de l'index et de calcul (comme l'idf) d'un terme dans le corpus.
 
+    L'index est gardé sous une forme compacte : chaque terme a un id entier et
+    les fréquences sont rangées dans des tableaux d'entiers, par document (index)
+    et par terme (index inverse). Pour chaque document, les positions de ses
+    termes vont de debutsDoc[ligne] à debutsDoc[ligne+1], et de même pour les
+    documents d'un terme avec debutsTerme. Les getters getIndex et getIndexInv
+    présentent ces tableaux sous la forme de dictionnaires.
+
+    Les documents ajoutés ou retirés après la construction ne modifient pas ces
+    tableaux : ils sont gardés à part (documents ajoutés, lignes retirées) et
+    pris en compte par les getters. La méthode compacter les intègre aux
+    tableaux.
+
     Attributes
     ----------
     corpus : Corpus
         Corpus contenant les documents dont on a déjà extrait les termes
 
-    index : dict[int,dict[tuple[str*],int]
-        L'index des documents; la clé est l'id du document, la valeur est un dictionnaire
-        contenant les termes du document en clé et leur fréquence en valeur.
+    termes : list[tuple[str*]]
+        Les termes de l'index, la position dans la liste est l'id du terme
+
+    idTermes : dict[tuple[str*],int]
+        L'id de chaque terme de l'index
+
+    idsDoc : array[int]
+        L'id du document de chaque ligne de l'index
+
+    lignesDoc : dict[int,int]
+        La ligne de l'index de chaque id de document
+
+    nbMotDoc : array[int]
+        Le nombre de mots du document de chaque ligne
+
+    debutsDoc : array[int]
+        Début des termes de chaque ligne dans termesDoc et freqsDoc
+
+    termesDoc : array[int]
+        Id des termes de chaque document, document par document
+
+    freqsDoc : array[int]
+        Fréquence des termes de termesDoc dans leur document
+
+    debutsTerme : array[int]
+        Début des documents de chaque terme dans docsTerme et freqsTerme
+
+    docsTerme : array[int]
+        Ligne des documents qui contiennent chaque terme, terme par terme
+
+    freqsTerme : array[int]
+        Fréquence du terme dans les documents de docsTerme
 
-    indexInv : dict[tuple[str*],dict[int,int]]
-        Index inverse, la clé est un terme, la valeur est un dictionnaire contenant
-        l'id des documents contenant le terme et en valeur la fréquence d'apparition
-        du terme dans le document.
+    lignesRetirees : set[int]
+        Lignes des documents retirés depuis la construction des tableaux
+
+    docsAjoutes : dict[int,tuple[int,dict[tuple[str*],int]]]
+        Pour chaque document ajouté depuis la construction des tableaux, son
+        nombre de mots et la fréquence de ses termes
+
+    docsAjoutesTerme : dict[tuple[str*],dict[int,int]]
+        Index inverse des documents ajoutés
+
+    nbRetiresTerme : Counter[int]
+        Pour l'id de chaque terme, le nombre de documents retirés qui le contenaient
+
+    deltaNbMot : int
+        Nombre de mots ajoutés moins le nombre de mots retirés
+
+    indexImbrication : IndexImbrication
+        Index des termes imbriqués, calculé au premier besoin et oublié dès
+        que l'index change
     """
     def __init__(self,corpusTraite):
         """Constructeur d'Indexation
@@ -42,20 +102,33 @@ class Indexeur:
 
         Returns
         -------
-        dict[int,dict[tuple[str*],int]
-            index
+        Mapping[int,dict[tuple[str*],int]
+            index, vue en lecture seule de l'index compact
         """
-        return self.index
+        return VueIndex(self)
 
     def getIndexInv(self):
         """Getter d'index inverse
 
         Returns
         -------
-        dict[tuple[str*],dict[int,int]]
-            index inverse
+        Mapping[tuple[str*],dict[int,int]]
+            index inverse, vue en lecture seule de l'index compact
         """
-        return self.indexInv
+        return VueIndexInv(self)
+
+    def getIndexImbrication(self):
+        """Getter de l'index des termes imbriqués, calculé une seule fois tant
+        que l'index ne change pas
+
+        Returns
+        -------
+        IndexImbrication
+            L'index des termes imbriqués
+        """
+        if(self.indexImbrication is None):
+            self.indexImbrication = IndexImbrication(self)
+        return self.indexImbrication
 
     def getCorpus(self):
         """Getter du corpus sur lequel on calcule l'index
@@ -67,6 +140,215 @@ class Indexeur:
         """
         return self.corpus
 
+    def getNbDoc(self):
+        """Renvoie le nombre de documents de l'index
+
+        Returns
+        -------
+        int
+            Nombre de documents
+        """
+        return len(self.idsDoc)-len(self.lignesRetirees)+len(self.docsAjoutes)
+
+    def getNbTermes(self):
+        """Renvoie le nombre de termes distincts de l'index
+
+        Returns
+        -------
+        int
+            Nombre de termes
+        """
+        if(not self.aDelta()):
+            return self.getNbIdsTerme()
+        return sum(1 for _ in self.getNbDocTermes())
+
+    def getNbIdsTerme(self):
+        """Renvoie le nombre d'id de termes des tableaux de l'index, les termes
+        qui ne sont que dans des documents ajoutés n'ont pas d'id.
+
+        Returns
+        -------
+        int
+            Nombre d'id de termes
+        """
+        return len(self.termes)
+
+    def getIdsDoc(self):
+        """Getter idsDoc
+
+        Returns
+        -------
+        array[int]
+            L'id de chaque document de l'index, dans l'ordre des lignes puis
+            des documents ajoutés
+        """
+        if(not self.aDelta()):
+            return self.idsDoc
+        return array('q',[iddoc for ligne,iddoc in enumerate(self.idsDoc) \
+                          if ligne not in self.lignesRetirees]+list(self.docsAjoutes))
+
+    def getLigneDoc(self,iddoc):
+        """Renvoie la ligne de l'index du document
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document
+
+        Returns
+        -------
+        int
+            La ligne du document, None si le document n'est pas dans l'index
+        """
+        return self.lignesDoc.get(iddoc)
+
+    def getIdTerme(self,terme):
+        """Renvoie l'id du terme
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Un terme
+
+        Returns
+        -------
+        int
+            L'id du terme, None si le terme n'est pas dans l'index
+        """
+        return self.idTermes.get(terme)
+
+    def getTermeParId(self,idTerme):
+        """Renvoie le terme qui a l'id passé en paramètre
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme
+
+        Returns
+        -------
+        tuple[str*]
+            Le terme
+        """
+        return self.termes[idTerme]
+
+    def getTermesFreqLigne(self,ligne):
+        """Renvoie les termes d'un document et leur fréquence
+
+        Parameters
+        ----------
+        ligne : int
+            La ligne du document dans l'index
+
+        Returns
+        -------
+        dict[tuple[str*],int]
+            Les termes du document en clé et leur fréquence en valeur
+        """
+        termes = self.termes
+        termesDoc,freqsDoc = self.termesDoc,self.freqsDoc
+        return {termes[termesDoc[p]] : freqsDoc[p] \
+                for p in range(self.debutsDoc[ligne],self.debutsDoc[ligne+1])}
+
+    def getDocsFreqTerme(self,idTerme):
+        """Renvoie les documents qui contiennent un terme et la fréquence du
+        terme dans chacun d'eux
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme
+
+        Returns
+        -------
+        dict[int,int]
+            L'id des documents en clé et la fréquence du terme en valeur
+        """
+        idsDoc = self.idsDoc
+        docsTerme,freqsTerme = self.docsTerme,self.freqsTerme
+        positions = range(self.debutsTerme[idTerme],self.debutsTerme[idTerme+1])
+        if(not self.aDelta()):
+            return {idsDoc[docsTerme[p]] : freqsTerme[p] for p in positions}
+
+        lignesRetirees = self.lignesRetirees
+        dictDocFreq = {idsDoc[docsTerme[p]] : freqsTerme[p] for p in positions \
+                       if docsTerme[p] not in lignesRetirees}
+        if(self.docsAjoutesTerme):
+            dictDocFreq.update(self.docsAjoutesTerme.get(self.getTermeParId(idTerme),()))
+        return dictDocFreq
+
+    def getDocsFreq(self,terme):
+        """Renvoie les documents qui contiennent un terme et la fréquence du
+        terme dans chacun d'eux, y compris pour un terme qui n'a pas d'id
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Un terme
+
+        Returns
+        -------
+        dict[int,int]
+            L'id des documents en clé et la fréquence du terme en valeur, None
+            si aucun document de l'index ne contient le terme
+        """
+        idTerme = self.getIdTerme(terme)
+        if(idTerme is None):
+            dictDocFreq = dict(self.docsAjoutesTerme.get(terme,()))
+        else:
+            dictDocFreq = self.getDocsFreqTerme(idTerme)
+        return dictDocFreq if dictDocFreq else None
+
+    def getTableauxDoc(self):
+        """Renvoie les tableaux de l'index par document, sans les documents
+        ajoutés ou retirés depuis la construction des tableaux.
+
+        Returns
+        -------
+        tuple[array[int],array[int],array[int]]
+            debutsDoc, termesDoc et freqsDoc
+        """
+        return self.debutsDoc,self.termesDoc,self.freqsDoc
+
+    def getNbMotDocument(self,iddoc):
+        """Renvoie le nombre de mots d'un document de l'index
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document
+
+        Returns
+        -------
+        int
+            Le nombre de mots du document
+
+        Raises
+        ------
+        KeyError
+            Si le document n'est pas dans l'index
+        """
+        if(iddoc in self.docsAjoutes):
+            return self.docsAjoutes[iddoc][0]
+        ligne = self.getLigneDoc(iddoc)
+        if(ligne is None):
+            raise KeyError("iddoc "+str(iddoc)+" n'est pas présent dans l'index")
+        return self.nbMotDoc[ligne]
+
+    def getNbMoyenMot(self):
+        """Renvoie le nombre moyen de mots des documents de l'index
+
+        Returns
+        -------
+        float
+            Le nombre de mots moyen par document
+        """
+        if(not self.aDelta()):
+            return mean(self.nbMotDoc)
+        if(self.sommeNbMotBase is None):
+            self.sommeNbMotBase = sum(self.nbMotDoc)
+        return (self.sommeNbMotBase+self.deltaNbMot)/self.getNbDoc()
+
     def getNbDocTerme(self,terme):
         """Renvoie le nombre de documents contenants le terme passé en paramètre.
 
@@ -80,10 +362,49 @@ class Indexeur:
         int
             Nombre de documents contenants le terme
         """
-        if (terme not in self.indexInv.keys()):
-            return  0
+        idTerme = self.getIdTerme(terme)
+        if (idTerme is None):
+            return len(self.docsAjoutesTerme.get(terme,()))
         else:
-            return len(self.indexInv[terme])
+            return self.getNbDocIdTerme(idTerme)
+
+    def getNbDocIdTerme(self,idTerme):
+        """Renvoie le nombre de documents contenants le terme d'id passé en paramètre.
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme
+
+        Returns
+        -------
+        int
+            Nombre de documents contenants le terme
+        """
+        n = self.debutsTerme[idTerme+1]-self.debutsTerme[idTerme]
+        if(self.aDelta()):
+            n -= self.nbRetiresTerme[idTerme]
+            if(self.docsAjoutesTerme):
+                n += len(self.docsAjoutesTerme.get(self.getTermeParId(idTerme),()))
+        return n
+
+    def getNbDocTermes(self):
+        """Générateur des termes présents dans au moins un document de l'index
+        et de leur nombre de documents, dans l'ordre des id puis pour les termes
+        qui ne sont que dans des documents ajoutés.
+
+        Yields
+        ------
+        tuple[tuple[str*],int]
+            Un terme et le nombre de documents qui le contiennent
+        """
+        for idTerme in range(self.getNbIdsTerme()):
+            n = self.getNbDocIdTerme(idTerme)
+            if(n > 0):
+                yield self.getTermeParId(idTerme),n
+        for terme,dictDocFreq in self.docsAjoutesTerme.items():
+            if(self.getIdTerme(terme) is None):
+                yield terme,len(dictDocFreq)
 
     def getIDFTerme(self,terme):
         """Calcule l'idf(inverse document frequency) du terme dans l'index
@@ -102,7 +423,7 @@ class Indexeur:
         int
             L'idf du terme
         """
-        N = self.corpus.size()
+        N = self.getNbDoc()
         n = self.getNbDocTerme(terme)
         return math.log((1+N)/(1+n))
 
@@ -122,30 +443,272 @@ class Indexeur:
         int
             L'idf du terme pour okapi
         """
-        N = self.corpus.size()
+        N = self.getNbDoc()
         n = self.getNbDocTerme(terme)
         return math.log((N-n+0.5)/(0.5+n))
 
     def calculIndex(self):
-        """Calcule et initialise les attributs index et indexInv
+        """Calcule et initialise les tableaux de l'index et de l'index inverse
 
         Appelée lors de la construction de l'objet
         """
-        self.index = dict()
-        self.indexInv = dict()
-
-        #calcule de l'index
-        for doc in self.corpus :
-            termes = doc.getTermes()
-            self.index[doc.getId()] = dict(Counter(termes))
-
-        #calcule de l'index inverse à partir de l'index déjà calculé
-        for doc, dictTermeFreq in self.index.items():
-            for terme, freq in dictTermeFreq.items():
-                if(terme not in self.indexInv):
-                    self.indexInv[terme]={doc:freq}
-                else:
-                    self.indexInv[terme][doc] = freq
+        self.construire((doc.getId(),doc.getNbMot(),Counter(doc.getTermes())) \
+                        for doc in self.corpus)
+
+    def construire(self,documents):
+        """Construit les tableaux de l'index puis ceux de l'index inverse.
+
+        Parameters
+        ----------
+        documents : iterable[tuple[int,int,dict[tuple[str*],int]]]
+            Pour chaque document : son id, son nombre de mots et la fréquence
+            de chacun de ses termes
+        """
+        self.termes = []
+        self.idTermes = dict()
+        self.idsDoc = array('q')
+        self.lignesDoc = dict()
+        self.nbMotDoc = array('q')
+        self.debutsDoc = array('q',[0])
+        self.termesDoc = array('i')
+        self.freqsDoc = array('i')
+
+        #calcule de l'index, les termes ont un id dans l'ordre de leur première apparition
+        for iddoc,nbMot,dictTermeFreq in documents:
+            self.lignesDoc[iddoc] = len(self.idsDoc)
+            self.idsDoc.append(iddoc)
+            self.nbMotDoc.append(nbMot)
+            for terme,freq in dictTermeFreq.items():
+                idTerme = self.idTermes.get(terme)
+                if(idTerme is None):
+                    idTerme = len(self.termes)
+                    self.idTermes[terme] = idTerme
+                    self.termes.append(terme)
+                self.termesDoc.append(idTerme)
+                self.freqsDoc.append(freq)
+            self.debutsDoc.append(len(self.termesDoc))
+
+        #calcule de l'index inverse à partir de l'index déjà calculé :
+        #on compte les documents de chaque terme puis on range chaque fréquence à sa place
+        self.debutsTerme = array('q',bytes(8*(len(self.termes)+1)))
+        for idTerme in self.termesDoc:
+            self.debutsTerme[idTerme+1] += 1
+        for idTerme in range(len(self.termes)):
+            self.debutsTerme[idTerme+1] += self.debutsTerme[idTerme]
+
+        prochainePosition = self.debutsTerme[:-1]
+        self.docsTerme = array('i',bytes(4*len(self.termesDoc)))
+        self.freqsTerme = array('i',bytes(4*len(self.termesDoc)))
+        for ligne in range(len(self.idsDoc)):
+            for p in range(self.debutsDoc[ligne],self.debutsDoc[ligne+1]):
+                idTerme = self.termesDoc[p]
+                q = prochainePosition[idTerme]
+                self.docsTerme[q] = ligne
+                self.freqsTerme[q] = self.freqsDoc[p]
+                prochainePosition[idTerme] = q+1
+
+        self.initialiserDelta()
+
+    def initialiserDelta(self):
+        """Vide les documents ajoutés et retirés depuis la construction des tableaux"""
+        self.lignesRetirees = set()
+        self.docsAjoutes = dict()
+        self.docsAjoutesTerme = dict()
+        self.nbRetiresTerme = Counter()
+        self.deltaNbMot = 0
+        self.sommeNbMotBase = None #calculé au premier besoin
+        self.indexImbrication = None
+
+    def aDelta(self):
+        """Indique si des documents ont été ajoutés ou retirés depuis la
+        construction des tableaux
+
+        Returns
+        -------
+        bool
+            True si des documents ont été ajoutés ou retirés
+        """
+        return bool(self.lignesRetirees or self.docsAjoutes)
+
+    def ajouterDocument(self,doc):
+        """Ajoute à l'index un document dont on a déjà extrait les termes, sans
+        recalculer l'index. Le document est aussi ajouté au corpus.
+
+        Parameters
+        ----------
+        doc : Document
+            Document à ajouter
+
+        Raises
+        ------
+        KeyError
+            Si l'index contient déjà un document avec le même id
+        """
+        self.ajouterTermesDocument(doc.getId(),doc.getNbMot(),Counter(doc.getTermes()))
+        if(self.corpus is not None):
+            self.corpus.addDocument(doc)
+
+    def ajouterTermesDocument(self,iddoc,nbMot,dictTermeFreq):
+        """Ajoute à l'index un document à partir de la fréquence de ses termes
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document
+        nbMot : int
+            Le nombre de mots du document
+        dictTermeFreq : dict[tuple[str*],int]
+            La fréquence de chacun des termes du document
+
+        Raises
+        ------
+        KeyError
+            Si l'index contient déjà un document avec le même id
+        """
+        if(iddoc in self.docsAjoutes or self.getLigneDoc(iddoc) is not None):
+            raise KeyError("L'index contient déjà un document avec le même id : "+str(iddoc))
+        dictTermeFreq = dict(dictTermeFreq)
+        self.indexImbrication = None #les termes et leur fréquence changent
+        self.docsAjoutes[iddoc] = (nbMot,dictTermeFreq)
+        for terme,freq in dictTermeFreq.items():
+            self.docsAjoutesTerme.setdefault(terme,dict())[iddoc] = freq
+        self.deltaNbMot += nbMot
+
+    def retirerDocument(self,iddoc):
+        """Retire un document de l'index, sans recalculer l'index. Le document
+        est aussi retiré du corpus.
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document à retirer
+
+        Raises
+        ------
+        KeyError
+            Si le document n'est pas dans l'index
+        """
+        if(iddoc in self.docsAjoutes):
+            self.indexImbrication = None
+            nbMot,dictTermeFreq = self.docsAjoutes.pop(iddoc)
+            for terme in dictTermeFreq:
+                dictDocFreq = self.docsAjoutesTerme[terme]
+                del dictDocFreq[iddoc]
+                if(not dictDocFreq):
+                    del self.docsAjoutesTerme[terme]
+        else:
+            ligne = self.getLigneDoc(iddoc)
+            if(ligne is None):
+                raise KeyError("iddoc "+str(iddoc)+" n'est pas présent dans l'index")
+            nbMot = self.nbMotDoc[ligne]
+            self.indexImbrication = None
+            self.lignesRetirees.add(ligne)
+            del self.lignesDoc[iddoc]
+            for p in range(self.debutsDoc[ligne],self.debutsDoc[ligne+1]):
+                self.nbRetiresTerme[self.termesDoc[p]] += 1
+        self.deltaNbMot -= nbMot
+
+        if(self.corpus is not None):
+            self.corpus.retirerDocument(iddoc)
+
+    def documents(self):
+        """Générateur des documents de l'index, dans l'ordre des lignes puis
+        des documents ajoutés.
+
+        Yields
+        ------
+        tuple[int,int,dict[tuple[str*],int]]
+            Pour chaque document : son id, son nombre de mots et la fréquence
+            de chacun de ses termes
+        """
+        for ligne,iddoc in enumerate(self.idsDoc):
+            if(ligne not in self.lignesRetirees):
+                yield iddoc,self.nbMotDoc[ligne],self.getTermesFreqLigne(ligne)
+        for iddoc,(nbMot,dictTermeFreq) in self.docsAjoutes.items():
+            yield iddoc,nbMot,dict(dictTermeFreq)
+
+    def compacte(self):
+        """Renvoie un nouvel Indexeur en mémoire, sur le même corpus, dont les
+        tableaux contiennent les documents ajoutés et plus ceux retirés.
+
+        Returns
+        -------
+        Indexeur
+            L'index compacté
+        """
+        indexeur = Indexeur.__new__(Indexeur)
+        indexeur.corpus = self.corpus
+        indexeur.construire(self.documents())
+        return indexeur
+
+    def filtrerLongueur(self,longueurMin,longueurMax):
+        """Renvoie un nouvel Indexeur en mémoire, sur le même corpus, qui ne
+        garde que les termes dont le nombre de mots est compris entre
+        longueurMin et longueurMax. Les documents sans terme de cette longueur
+        restent dans l'index.
+
+        Parameters
+        ----------
+        longueurMin : int
+            Nombre de mots minimal des termes gardés
+
+        longueurMax : int
+            Nombre de mots maximal des termes gardés
+
+        Returns
+        -------
+        Indexeur
+            L'index des termes de la bonne longueur
+        """
+        indexeur = Indexeur.__new__(Indexeur)
+        indexeur.corpus = self.corpus
+        indexeur.construire((iddoc,nbMot,{terme : freq for terme,freq in dictTermeFreq.items() \
+                                          if longueurMin <= len(terme) <= longueurMax}) \
+                            for iddoc,nbMot,dictTermeFreq in self.documents())
+        return indexeur
+
+    def compacter(self):
+        """Intègre aux tableaux de l'index les documents ajoutés et retirés.
+        Les id des termes peuvent changer.
+        """
+        if(self.aDelta()):
+            self.__dict__.update(self.compacte().__dict__)
+
+    def __getstate__(self):
+        """L'index des termes imbriqués n'est pas sauvegardé, il est recalculé
+        au premier besoin.
+
+        Returns
+        -------
+        dict
+            Les attributs de l'objet à sauvegarder
+        """
+        etat = self.__dict__.copy()
+        etat['indexImbrication'] = None
+        return etat
+
+    def __setstate__(self,etat):
+        """Permet de charger un Indexeur sauvegardé avant le passage à l'index
+        compact, en reconstruisant les tableaux depuis l'ancien dictionnaire index,
+        ou avant l'ajout et le retrait de documents.
+
+        Parameters
+        ----------
+        etat : dict
+            Les attributs de l'objet sauvegardé
+        """
+        if('index' in etat and 'termes' not in etat):
+            index = etat.pop('index')
+            etat.pop('indexInv',None)
+            self.__dict__.update(etat)
+            corpus = self.corpus
+            self.construire((iddoc,corpus.getDocumentById(iddoc).getNbMot(),dictTermeFreq) \
+                            for iddoc,dictTermeFreq in index.items())
+        else:
+            self.__dict__.update(etat)
+            if('lignesRetirees' not in etat):
+                self.initialiserDelta()
+            self.indexImbrication = None
 
     def sauvegarder(self,path):
         """Sauvegarde l'objet dans un fichier pickle à l'emplacement path.
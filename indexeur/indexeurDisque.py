@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import mmap
+import pickle
+import struct
+from array import array
+from indexeur.indexeur import Indexeur
+
+#Signature et version du format binaire de l'index
+SIGNATURE_INDEX = b'PLDACIDX'
+VERSION_INDEX = 1
+#Entête : signature, version, ordre des octets (0 petit-boutiste, 1 gros-boutiste),
+#nombre de documents, de termes et de positions puis début de chaque section
+SECTIONS_INDEX = ['idsDoc','nbMotDoc','debutsDoc','termesDoc','freqsDoc',
+                  'debutsTerme','docsTerme','freqsTerme','debutsChaine','chaines','ordreTermes']
+FORMAT_ENTETE_INDEX = '<8sII3q'+str(len(SECTIONS_INDEX))+'q'
+#Type des tableaux de chaque section, les chaînes sont des octets bruts
+TYPES_SECTIONS = {'idsDoc':'q','nbMotDoc':'q','debutsDoc':'q','termesDoc':'i','freqsDoc':'i',
+                  'debutsTerme':'q','docsTerme':'i','freqsTerme':'i','debutsChaine':'q',
+                  'chaines':'B','ordreTermes':'i'}
+#Séparateur des mots d'un terme dans la table des termes
+SEPARATEUR_MOTS = '\x00'
+#Extension du fichier, à côté de l'index, des documents ajoutés et retirés depuis son écriture
+EXTENSION_DELTA = '.delta'
+
+def encoderTerme(terme):
+    """Encode un terme en octets pour la table des termes
+
+    Parameters
+    ----------
+    terme : tuple[str*]
+        Un terme
+
+    Returns
+    -------
+    bytes
+        Les mots du terme séparés par SEPARATEUR_MOTS, en utf-8
+    """
+    return SEPARATEUR_MOTS.join(terme).encode('utf-8')
+
+class IndexeurDisque(Indexeur):
+    """
+    Indexeur ouvert depuis un fichier binaire projeté en mémoire (mmap).
+    L'ouverture ne lit que l'entête, les tableaux de l'index sont lus
+    directement dans le fichier au moment où on les consulte.
+
+    Le fichier contient l'entête, la table des termes (triée pour la recherche
+    par dichotomie), l'index, l'index inverse et le nombre de mots de chaque
+    document. Il ne contient pas le corpus, getCorpus renvoie donc None.
+
+    Le fichier n'est jamais modifié en place. Les documents ajoutés ou retirés
+    sont gardés en mémoire comme pour l'Indexeur et sauvegardés à part avec
+    sauvegarderDelta, dans un fichier relu à l'ouverture. La méthode compacter
+    réécrit l'index avec ces documents.
+
+    Attributes
+    ----------
+    path : str
+        Chemin du fichier de l'index
+
+    mm : mmap
+        Le fichier projeté en mémoire
+
+    nbTermes : int
+        Nombre de termes distincts de l'index
+    """
+    def __init__(self,path):
+        """Constructeur de la classe IndexeurDisque, ouvre l'index enregistré
+        par la méthode ecrire.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier de l'index
+
+        Raises
+        ------
+        ValueError
+            Si le fichier n'est pas un index valide pour cette machine
+        """
+        self.path = path
+        self.corpus = None
+        self.lignesDoc = None #calculé au premier besoin
+        with open(path,'rb') as f:
+            self.mm = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        try:
+            taille = struct.calcsize(FORMAT_ENTETE_INDEX)
+            entete = struct.unpack(FORMAT_ENTETE_INDEX,self.mm[:taille])
+            signature,version,grosBoutiste,nbDoc,self.nbTermes,nbPositions = entete[:6]
+            if(signature != SIGNATURE_INDEX or version != VERSION_INDEX):
+                raise ValueError(path+" n'est pas un index dans un format connu")
+            if(grosBoutiste != (sys.byteorder == 'big')):
+                raise ValueError(path+" a été écrit avec un autre ordre des octets")
+
+            debuts = list(entete[6:])+[len(self.mm)]
+            vue = memoryview(self.mm)
+            for i,section in enumerate(SECTIONS_INDEX):
+                setattr(self,section,vue[debuts[i]:debuts[i+1]].cast(TYPES_SECTIONS[section]))
+            #les sections sont alignées sur 8 octets, on retire le remplissage
+            #de fin des sections d'entiers sur 4 octets
+            self.termesDoc,self.freqsDoc = self.termesDoc[:nbPositions],self.freqsDoc[:nbPositions]
+            self.docsTerme,self.freqsTerme = self.docsTerme[:nbPositions],self.freqsTerme[:nbPositions]
+            self.ordreTermes = self.ordreTermes[:self.nbTermes]
+            if(len(self.idsDoc) != nbDoc or len(self.debutsTerme) != self.nbTermes+1):
+                raise ValueError(path+" est incomplet")
+        except Exception:
+            self.fermer()
+            raise
+
+        self.initialiserDelta()
+        if(os.path.exists(path+EXTENSION_DELTA)):
+            self.chargerDelta(path+EXTENSION_DELTA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,typeErreur,erreur,trace):
+        self.fermer()
+
+    def fermer(self):
+        """Libère les vues sur le fichier puis le ferme"""
+        for section in SECTIONS_INDEX:
+            vue = self.__dict__.pop(section,None)
+            if(vue is not None):
+                vue.release()
+        if(self.mm is not None):
+            self.mm.close()
+            self.mm = None
+
+    def getNbIdsTerme(self):
+        """Renvoie le nombre d'id de termes de l'index enregistré
+
+        Returns
+        -------
+        int
+            Nombre d'id de termes
+        """
+        return self.nbTermes
+
+    def getLigneDoc(self,iddoc):
+        """Renvoie la ligne de l'index du document
+
+        Parameters
+        ----------
+        iddoc : int
+            L'id du document
+
+        Returns
+        -------
+        int
+            La ligne du document, None si le document n'est pas dans l'index
+        """
+        if(self.lignesDoc is None):
+            self.lignesDoc = {iddoc : ligne for ligne,iddoc in enumerate(self.idsDoc)}
+        return self.lignesDoc.get(iddoc)
+
+    def getTermeParId(self,idTerme):
+        """Renvoie le terme qui a l'id passé en paramètre, lu dans la table des termes
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme
+
+        Returns
+        -------
+        tuple[str*]
+            Le terme
+        """
+        return tuple(self.chaineTerme(idTerme).decode('utf-8').split(SEPARATEUR_MOTS))
+
+    def chaineTerme(self,idTerme):
+        """Renvoie le terme encodé tel qu'il est dans la table des termes
+
+        Parameters
+        ----------
+        idTerme : int
+            L'id du terme
+
+        Returns
+        -------
+        bytes
+            Le terme encodé par encoderTerme
+        """
+        return self.chaines[self.debutsChaine[idTerme]:self.debutsChaine[idTerme+1]].tobytes()
+
+    def getIdTerme(self,terme):
+        """Renvoie l'id du terme, recherché par dichotomie dans la table triée
+        des termes
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Un terme
+
+        Returns
+        -------
+        int
+            L'id du terme, None si le terme n'est pas dans l'index
+        """
+        cle = encoderTerme(terme)
+        bas,haut = 0,self.nbTermes
+        while(bas < haut):
+            milieu = (bas+haut)//2
+            if(self.chaineTerme(self.ordreTermes[milieu]) < cle):
+                bas = milieu+1
+            else:
+                haut = milieu
+        if(bas < self.nbTermes and self.chaineTerme(self.ordreTermes[bas]) == cle):
+            return self.ordreTermes[bas]
+        return None
+
+    def getTermesFreqLigne(self,ligne):
+        """Renvoie les termes d'un document et leur fréquence
+
+        Parameters
+        ----------
+        ligne : int
+            La ligne du document dans l'index
+
+        Returns
+        -------
+        dict[tuple[str*],int]
+            Les termes du document en clé et leur fréquence en valeur
+        """
+        return {self.getTermeParId(self.termesDoc[p]) : self.freqsDoc[p] \
+                for p in range(self.debutsDoc[ligne],self.debutsDoc[ligne+1])}
+
+    def calculIndex(self):
+        """Un IndexeurDisque ne peut pas être recalculé depuis un corpus
+
+        Raises
+        ------
+        RuntimeError
+            Toujours, l'index ne peut pas être recalculé
+        """
+        raise RuntimeError("Un IndexeurDisque ne peut pas être recalculé")
+
+    def sauvegarderDelta(self):
+        """Sauvegarde les documents ajoutés et retirés depuis l'écriture de
+        l'index dans le fichier path+EXTENSION_DELTA, relu à la prochaine
+        ouverture. Le fichier est supprimé s'il n'y a aucun changement.
+        """
+        pathDelta = self.path+EXTENSION_DELTA
+        if(not self.aDelta()):
+            if(os.path.exists(pathDelta)):
+                os.remove(pathDelta)
+            return
+
+        delta = {'retires':[self.idsDoc[ligne] for ligne in sorted(self.lignesRetirees)],
+                 'ajoutes':self.docsAjoutes}
+        #écrit à côté puis renommé pour ne jamais laisser un fichier à moitié écrit
+        pathTemporaire = pathDelta+'.'+str(os.getpid())+'.tmp'
+        with open(pathTemporaire,'wb') as f:
+            pickle.Pickler(f).dump(delta)
+        os.replace(pathTemporaire,pathDelta)
+
+    def chargerDelta(self,pathDelta):
+        """Rejoue les documents retirés puis ajoutés sauvegardés par sauvegarderDelta
+
+        Parameters
+        ----------
+        pathDelta : str
+            Emplacement de la sauvegarde
+        """
+        with open(pathDelta,'rb') as f:
+            delta = pickle.Unpickler(f).load()
+        for iddoc in delta['retires']:
+            self.retirerDocument(iddoc)
+        for iddoc,(nbMot,dictTermeFreq) in delta['ajoutes'].items():
+            self.ajouterTermesDocument(iddoc,nbMot,dictTermeFreq)
+
+    def compacter(self):
+        """Réécrit l'index avec les documents ajoutés et sans ceux retirés,
+        puis le rouvre. Le fichier des changements est supprimé.
+        """
+        if(not self.aDelta()):
+            return
+        path = self.path
+        pathTemporaire = path+'.'+str(os.getpid())+'.tmp'
+        IndexeurDisque.ecrire(self.compacte(),pathTemporaire)
+        self.fermer()
+        os.replace(pathTemporaire,path)
+        if(os.path.exists(path+EXTENSION_DELTA)):
+            os.remove(path+EXTENSION_DELTA)
+        self.__init__(path)
+
+    def sauvegarder(self,path):
+        """Enregistre l'index au format binaire à l'emplacement path
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de sauvegarde
+        """
+        if(os.path.abspath(path) == os.path.abspath(self.path)):
+            #on ne peut pas réécrire le fichier projeté en mémoire
+            self.compacter()
+        else:
+            IndexeurDisque.ecrire(self,path)
+
+    @classmethod
+    def ecrire(cls,indexeur,path):
+        """Enregistre un Indexeur au format binaire à l'emplacement path pour
+        pouvoir l'ouvrir ensuite avec IndexeurDisque.
+
+        Les documents ajoutés ou retirés de l'indexeur sont intégrés à l'index
+        enregistré.
+
+        Parameters
+        ----------
+        indexeur : Indexeur
+            L'indexeur à enregistrer
+        path : str
+            Emplacement de sauvegarde
+        """
+        if(indexeur.aDelta()):
+            indexeur = indexeur.compacte()
+        nbTermes = indexeur.getNbIdsTerme()
+        chaines = [encoderTerme(indexeur.getTermeParId(idTerme)) for idTerme in range(nbTermes)]
+        debutsChaine = array('q',[0])
+        for chaine in chaines:
+            debutsChaine.append(debutsChaine[-1]+len(chaine))
+        sections = {'idsDoc':indexeur.idsDoc,'nbMotDoc':indexeur.nbMotDoc,
+                    'debutsDoc':indexeur.debutsDoc,'termesDoc':indexeur.termesDoc,
+                    'freqsDoc':indexeur.freqsDoc,'debutsTerme':indexeur.debutsTerme,
+                    'docsTerme':indexeur.docsTerme,'freqsTerme':indexeur.freqsTerme,
+                    'debutsChaine':debutsChaine,'chaines':b''.join(chaines),
+                    'ordreTermes':array('i',sorted(range(nbTermes),key=chaines.__getitem__))}
+        del chaines
+
+        #chaque section commence sur un multiple de 8 octets
+        debuts = []
+        position = struct.calcsize(FORMAT_ENTETE_INDEX)
+        for section in SECTIONS_INDEX:
+            position += -position % 8
+            debuts.append(position)
+            position += memoryview(sections[section]).nbytes
+
+        with open(path,'wb') as f:
+            f.write(struct.pack(FORMAT_ENTETE_INDEX,SIGNATURE_INDEX,VERSION_INDEX,
+                                int(sys.byteorder == 'big'),indexeur.getNbDoc(),nbTermes,
+                                len(indexeur.termesDoc),*debuts))
+            for section,debut in zip(SECTIONS_INDEX,debuts):
+                f.write(bytes(debut-f.tell()))
+                f.write(memoryview(sections[section]).cast('B'))
+            #la dernière section est complétée pour que sa vue se termine sur un multiple de 8
+            f.write(bytes(-f.tell() % 8))
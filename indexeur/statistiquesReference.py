@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+import math
+import pickle
+from array import array
+
+class StatistiquesReference:
+    """
+    Statistiques du corpus de référence utilisées par les classeurs tfidf et
+    okapi : le nombre de documents, le nombre moyen de mots par document et,
+    pour chaque terme, son nombre de documents et ses idf déjà calculés.
+
+    Contrairement à l'Indexeur, l'objet ne garde ni le corpus ni les fréquences
+    des termes dans chaque document, il est donc bien plus petit à charger.
+
+    Attributes
+    ----------
+    nbDoc : int
+        Nombre de documents du corpus de référence
+
+    nbMoyenMot : float
+        Nombre moyen de mots par document du corpus de référence
+
+    idTermes : dict[tuple[str*],int]
+        La position de chaque terme dans les tableaux
+
+    nbDocTermes : array[int]
+        Nombre de documents contenant chaque terme
+
+    idfs : array[float]
+        L'idf de chaque terme
+
+    idfsOkapi : array[float]
+        L'idf pour okapi de chaque terme
+
+    idfInconnu : float
+        L'idf d'un terme absent du corpus de référence
+
+    idfOkapiInconnu : float
+        L'idf pour okapi d'un terme absent du corpus de référence
+    """
+    def __init__(self,nbDoc,nbMoyenMot,nbDocTermes):
+        """Constructeur de la classe StatistiquesReference, calcule les idf de
+        chaque terme.
+
+        Parameters
+        ----------
+        nbDoc : int
+            Nombre de documents du corpus de référence
+
+        nbMoyenMot : float
+            Nombre moyen de mots par document du corpus de référence
+
+        nbDocTermes : dict[tuple[str*],int]
+            Nombre de documents contenant chaque terme
+        """
+        self.nbDoc = nbDoc
+        self.nbMoyenMot = nbMoyenMot
+        self.idTermes = dict()
+        self.nbDocTermes = array('i')
+        for terme,n in nbDocTermes.items():
+            self.idTermes[terme] = len(self.nbDocTermes)
+            self.nbDocTermes.append(n)
+
+        #mêmes formules que dans l'Indexeur pour obtenir exactement les mêmes valeurs
+        N = nbDoc
+        self.idfs = array('d',[math.log((1+N)/(1+n)) for n in self.nbDocTermes])
+        self.idfsOkapi = array('d',[math.log((N-n+0.5)/(0.5+n)) for n in self.nbDocTermes])
+        self.idfInconnu = math.log((1+N)/1)
+        self.idfOkapiInconnu = math.log((N+0.5)/0.5)
+
+    @classmethod
+    def depuisIndexeur(cls,indexeur):
+        """Construit les statistiques depuis l'index du corpus de référence
+
+        Parameters
+        ----------
+        indexeur : Indexeur
+            L'index du corpus de référence
+
+        Returns
+        -------
+        StatistiquesReference
+            Les statistiques du corpus de référence
+        """
+        return cls(indexeur.getNbDoc(),indexeur.getNbMoyenMot(),dict(indexeur.getNbDocTermes()))
+
+    def getNbDoc(self):
+        """Getter de nbDoc
+
+        Returns
+        -------
+        int
+            Nombre de documents du corpus de référence
+        """
+        return self.nbDoc
+
+    def getNbMoyenMot(self):
+        """Getter de nbMoyenMot
+
+        Returns
+        -------
+        float
+            Le nombre de mots moyen par document du corpus de référence
+        """
+        return self.nbMoyenMot
+
+    def getNbTermes(self):
+        """Renvoie le nombre de termes distincts du corpus de référence
+
+        Returns
+        -------
+        int
+            Nombre de termes
+        """
+        return len(self.nbDocTermes)
+
+    def getNbDocTerme(self,terme):
+        """Renvoie le nombre de documents contenants le terme passé en paramètre.
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Un terme
+
+        Returns
+        -------
+        int
+            Nombre de documents contenants le terme
+        """
+        idTerme = self.idTermes.get(terme)
+        if(idTerme is None):
+            return 0
+        return self.nbDocTermes[idTerme]
+
+    def getIDFTerme(self,terme):
+        """Renvoie l'idf du terme, log((1+N)/(1+n)) déjà calculé.
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Le terme dont on veut l'idf.
+
+        Returns
+        -------
+        float
+            L'idf du terme
+        """
+        idTerme = self.idTermes.get(terme)
+        if(idTerme is None):
+            return self.idfInconnu
+        return self.idfs[idTerme]
+
+    def getIDFOkapiTerme(self,terme):
+        """Renvoie l'idf pour okapi du terme, log((0.5+N-n)/(0.5+n)) déjà calculé.
+
+        Parameters
+        ----------
+        terme : tuple[str*]
+            Le terme dont on veut l'idf.
+
+        Returns
+        -------
+        float
+            L'idf du terme pour okapi
+        """
+        idTerme = self.idTermes.get(terme)
+        if(idTerme is None):
+            return self.idfOkapiInconnu
+        return self.idfsOkapi[idTerme]
+
+    def sauvegarder(self,path):
+        """Sauvegarde l'objet dans un fichier pickle à l'emplacement path.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de sauvegarde
+        """
+        with open(path,'wb') as f:
+            pickle.Pickler(f).dump(self)
+
+    @classmethod
+    def charger(self,path):
+        """Charge un objet StatistiquesReference depuis un fichier pickle à
+        l'emplacement path.
+
+        Parameters
+        ----------
+        path : str
+            Emplacement de la sauvegarde
+
+        Returns
+        -------
+        StatistiquesReference
+            L'objet chargé depuis le fichier à l'emplacement path.
+        """
+        with open(path,'rb') as f:
+            return pickle.Unpickler(f).load()
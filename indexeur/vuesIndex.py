@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Dans ce module on trouve les vues qui présentent l'index compact d'un Indexeur
+sous la forme des dictionnaires index et indexInv.
+"""
+from collections.abc import ItemsView, Mapping
+
+class VueIndex(Mapping):
+    """
+    Vue en lecture seule de l'index d'un Indexeur : la clé est l'id du document,
+    la valeur est un dictionnaire des termes du document et de leur fréquence.
+    Le dictionnaire d'un document est construit seulement quand on y accède.
+
+    Attributes
+    ----------
+    indexeur : Indexeur
+        L'indexeur dont on présente l'index
+    """
+    def __init__(self,indexeur):
+        """Constructeur de la classe VueIndex
+
+        Parameters
+        ----------
+        indexeur : Indexeur
+            L'indexeur dont on présente l'index
+        """
+        self.indexeur = indexeur
+
+    def __getitem__(self,iddoc):
+        if(iddoc in self.indexeur.docsAjoutes):
+            return dict(self.indexeur.docsAjoutes[iddoc][1])
+        ligne = self.indexeur.getLigneDoc(iddoc)
+        if(ligne is None):
+            raise KeyError(iddoc)
+        return self.indexeur.getTermesFreqLigne(ligne)
+
+    def __contains__(self,iddoc):
+        return iddoc in self.indexeur.docsAjoutes or self.indexeur.getLigneDoc(iddoc) is not None
+
+    def __iter__(self):
+        return iter(self.indexeur.getIdsDoc())
+
+    def __len__(self):
+        return self.indexeur.getNbDoc()
+
+    def items(self):
+        """Renvoie la vue des couples id du document, dictionnaire des termes.
+        Elle se parcourt dans l'ordre des documents, sans recherche de la ligne
+        de chaque document, et peut être parcourue plusieurs fois.
+        """
+        return ItemsVueIndex(self)
+
+class ItemsVueIndex(ItemsView):
+    """
+    Vue des couples id du document, dictionnaire des termes d'une VueIndex.
+    len et in sont ceux de ItemsView, le parcours lit les documents dans
+    l'ordre de l'index.
+    """
+    def __iter__(self):
+        return ((iddoc,dictTermeFreq) for iddoc,_,dictTermeFreq in self._mapping.indexeur.documents())
+
+class VueIndexInv(Mapping):
+    """
+    Vue en lecture seule de l'index inverse d'un Indexeur : la clé est un terme,
+    la valeur est un dictionnaire de l'id des documents qui contiennent le terme
+    et de la fréquence du terme dans le document. Le dictionnaire d'un terme
+    est construit seulement quand on y accède.
+
+    Attributes
+    ----------
+    indexeur : Indexeur
+        L'indexeur dont on présente l'index inverse
+    """
+    def __init__(self,indexeur):
+        """Constructeur de la classe VueIndexInv
+
+        Parameters
+        ----------
+        indexeur : Indexeur
+            L'indexeur dont on présente l'index inverse
+        """
+        self.indexeur = indexeur
+
+    def __getitem__(self,terme):
+        dictDocFreq = self.indexeur.getDocsFreq(terme)
+        if(dictDocFreq is None):
+            raise KeyError(terme)
+        return dictDocFreq
+
+    def __contains__(self,terme):
+        return self.indexeur.getNbDocTerme(terme) > 0
+
+    def __iter__(self):
+        indexeur = self.indexeur
+        if(not indexeur.aDelta()):
+            return (indexeur.getTermeParId(idTerme) for idTerme in range(indexeur.getNbIdsTerme()))
+        return (terme for terme,_ in indexeur.getNbDocTermes())
+
+    def __len__(self):
+        return self.indexeur.getNbTermes()
+
+    def items(self):
+        """Renvoie la vue des couples terme, dictionnaire des documents. Elle
+        se parcourt dans l'ordre des id des termes, sans recherche de l'id de
+        chaque terme, et peut être parcourue plusieurs fois.
+        """
+        return ItemsVueIndexInv(self)
+
+class ItemsVueIndexInv(ItemsView):
+    """
+    Vue des couples terme, dictionnaire des documents d'une VueIndexInv.
+    len et in sont ceux de ItemsView, le parcours lit les termes dans
+    l'ordre de leur id.
+    """
+    def __iter__(self):
+        indexeur = self._mapping.indexeur
+        if(not indexeur.aDelta()):
+            return ((indexeur.getTermeParId(idTerme),indexeur.getDocsFreqTerme(idTerme)) \
+                    for idTerme in range(indexeur.getNbIdsTerme()))
+        return ((terme,indexeur.getDocsFreq(terme)) for terme,_ in indexeur.getNbDocTermes())
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 import re
-from document.corpus import Corpus
+from document.corpus import Corpus, CorpusParesseux
 from document.document import Document
 from parserCorpus.parserCorpus import ParserCorpus
 
+#Balise ouvrante d'un article, elle doit être suivie d'un saut de ligne
+REGEX_DEBUT_ARTICLE = re.compile(r'<article title=\".*?\">\n')
+#Balise fermante d'un article
+FIN_ARTICLE = '</article>'
+#Taille du tampon de lecture du fichier (en octets)
+TAILLE_TAMPON = 1 << 20
+
 class ParserArticle(ParserCorpus):
     """
     Objet principalement fait pour pouvoir analyser le corpus de réference
@@ -25,13 +32,74 @@ class ParserArticle(ParserCorpus):
             Si les permissions du fichier ne permettent pas l'ouverture
         """
         corpusRes = Corpus()
-        with open(path, "r", encoding="utf-8") as file :
-            txt = file.read()
-
-        regex=r'<article title=\".*?\">\n(.*?)</article>'
-        contenus = re.findall(regex, txt, re.DOTALL)
 
-        for content in contenus:
+        for content in self.iterer(path):
             corpusRes.addDocument(Document(content))
 
         return corpusRes
+
+    def parseParesseux(self,path,garderContenu=True):
+        """Méthode qui renvoie un corpus rempli au fur et à mesure de la lecture
+        du fichier. Les articles ne sont lus que lorsque le corpus est parcouru.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier à analyser
+
+        garderContenu : bool
+            Si False, le contenu des documents est libéré après leur extraction.
+
+        Returns
+        -------
+        CorpusParesseux
+            Le corpus qui sera rempli depuis le fichier passé en argument
+        """
+        generateur = (Document(content) for content in self.iterer(path))
+        return CorpusParesseux(generateur,garderContenu)
+
+    def iterer(self,path):
+        """Générateur qui renvoie un à un le contenu des articles du fichier.
+
+        Le fichier est lu ligne par ligne, on ne garde en mémoire que l'article
+        en cours de lecture. Le contenu renvoyé est le même que celui capturé
+        par l'expression <article title=".*?">\\n(.*?)</article>.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier à analyser
+
+        Yields
+        ------
+        str
+            Le contenu d'un article
+
+        Raises
+        ------
+        FileNotFoundError
+            Si le chemin vers le fichier n'existe pas
+        PermissionError
+            Si les permissions du fichier ne permettent pas l'ouverture
+        """
+        with open(path, "r", encoding="utf-8", buffering=TAILLE_TAMPON) as file :
+            #None si on est en dehors d'un article, sinon les morceaux de l'article
+            morceaux = None
+            for ligne in file:
+                #une même ligne peut fermer un article et en ouvrir un autre
+                while(ligne):
+                    if(morceaux is None):
+                        debut = REGEX_DEBUT_ARTICLE.search(ligne)
+                        if(debut is None):
+                            break
+                        morceaux = []
+                        ligne = ligne[debut.end():]
+                    else:
+                        fin = ligne.find(FIN_ARTICLE)
+                        if(fin < 0):
+                            morceaux.append(ligne)
+                            break
+                        morceaux.append(ligne[:fin])
+                        yield ''.join(morceaux)
+                        morceaux = None
+                        ligne = ligne[fin+len(FIN_ARTICLE):]
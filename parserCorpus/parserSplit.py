@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
 import re
-from document.corpus import Corpus
+import os
+import mmap
+import struct
+from array import array
+from document.corpus import Corpus, CorpusParesseux
 from document.document import Document
+from indexeur.cacheReference import CacheReference
 from parserCorpus.parserCorpus import ParserCorpus
 
+#Séparateur des documents recherché directement sur les octets du fichier
+REGEX_FIN_OCTETS = re.compile(rb'^##END##\r?$',flags=re.MULTILINE)
+#Entête du fichier d'offsets : signature, taille et date de modification du corpus
+#puis nombre de limites enregistrées
+SIGNATURE_OFFSETS = b'PLDACOF2'
+FORMAT_ENTETE_OFFSETS = '<8sqqq'
+
 class ParserSplit(ParserCorpus):
     """
     Objet qui permet de construire un corpus, les documents dans le fichier .txt
@@ -32,14 +44,182 @@ class ParserSplit(ParserCorpus):
         Corpus
             Le corpus extrait du fichier passé en argument
         """
-        corpusRes = Corpus()
-
         with open(path,'r',encoding='utf-8') as f :
             txt = f.read()
 
+        return self.parseTexte(txt)
+
+    def parseTexte(self,txt):
+        """Methode qui construit un corpus à partir d'un texte où les documents
+        sont séparés par des lignes "##END##", comme dans un fichier pour parse.
+
+        Parameters
+        ----------
+        txt : str
+            Le texte du corpus
+
+        Returns
+        -------
+        Corpus
+            Le corpus des documents du texte
+        """
+        corpusRes = Corpus()
+
         listedoc = re.split('^##END##$',txt,flags=re.MULTILINE)
 
         for contenu in listedoc:
             corpusRes.addDocument(Document(contenu))
 
         return corpusRes
+
+    def parseParesseux(self,path,garderContenu=True,pathOffsets=None):
+        """Methode qui construit un corpus rempli au fur et à mesure à partir
+        d'un .txt projeté en mémoire (mmap). Les documents sont les mêmes qu'avec
+        la méthode parse mais un document n'est décodé que lorsqu'il est lu.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier à analyser
+
+        garderContenu : bool
+            Si False, le contenu des documents est libéré après leur extraction.
+
+        pathOffsets : str
+            Si renseigné, chemin du fichier qui garde les limites des documents.
+            S'il est à jour il est relu, sinon les limites sont calculées puis
+            enregistrées à cet emplacement.
+
+        Returns
+        -------
+        CorpusParesseux
+            Le corpus qui sera rempli depuis le fichier passé en argument
+        """
+        if(pathOffsets is None):
+            offsets = self.calculerOffsets(path)
+        else:
+            offsets = self.chargerOffsets(path,pathOffsets)
+            if(offsets is None):
+                offsets = self.calculerOffsets(path)
+                self.sauvegarderOffsets(path,pathOffsets,offsets)
+
+        generateur = (Document(contenu) for contenu in self.iterer(path,offsets))
+        return CorpusParesseux(generateur,garderContenu)
+
+    def iterer(self,path,offsets=None):
+        """Générateur qui renvoie un à un le contenu des documents du fichier.
+        Chaque document est décodé seulement au moment où il est renvoyé.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier à analyser
+
+        offsets : array[int]
+            Limites des documents, calculées si elles ne sont pas données.
+
+        Yields
+        ------
+        str
+            Le contenu d'un document
+        """
+        if(offsets is None):
+            offsets = self.calculerOffsets(path)
+
+        with open(path,'rb') as f:
+            if(os.fstat(f.fileno()).st_size == 0):
+                #on ne peut pas projeter un fichier vide, il donne un document vide
+                yield ''
+                return
+            with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+                for i in range(0,len(offsets),2):
+                    contenu = mm[offsets[i]:offsets[i+1]].decode('utf-8')
+                    #comme à la lecture en mode texte, les fins de ligne deviennent \n
+                    if('\r' in contenu):
+                        contenu = contenu.replace('\r\n','\n').replace('\r','\n')
+                    yield contenu
+
+    def calculerOffsets(self,path):
+        """Recherche les lignes "##END##" sur les octets du fichier projeté en
+        mémoire et renvoie les limites des documents.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier à analyser
+
+        Returns
+        -------
+        array[int]
+            Suite de couples début, fin (en octets) de chaque document
+        """
+        offsets = array('q')
+        with open(path,'rb') as f:
+            taille = os.fstat(f.fileno()).st_size
+            if(taille == 0):
+                offsets.extend((0,0))
+                return offsets
+            with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+                debut = 0
+                for fin in REGEX_FIN_OCTETS.finditer(mm):
+                    offsets.extend((debut,fin.start()))
+                    debut = fin.end()
+                offsets.extend((debut,taille))
+        return offsets
+
+    def sauvegarderOffsets(self,path,pathOffsets,offsets):
+        """Enregistre les limites des documents du fichier path dans pathOffsets,
+        avec la taille et la date de modification du fichier pour vérifier
+        qu'elles sont toujours valides lors du chargement, et le nombre de
+        limites pour détecter un fichier tronqué. Le fichier est écrit à côté
+        puis renommé, il n'est jamais lu à moitié écrit.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier corpus
+        pathOffsets : str
+            Emplacement de sauvegarde des limites
+        offsets : array[int]
+            Limites des documents renvoyées par calculerOffsets
+        """
+        stat = os.stat(path)
+        def ecrire(pathTemporaire):
+            with open(pathTemporaire,'wb') as f:
+                f.write(struct.pack(FORMAT_ENTETE_OFFSETS,SIGNATURE_OFFSETS,stat.st_size,
+                                    stat.st_mtime_ns,len(offsets)))
+                offsets.tofile(f)
+        CacheReference.ecrireAtomique(pathOffsets,ecrire)
+
+    def chargerOffsets(self,path,pathOffsets):
+        """Charge les limites des documents enregistrées par sauvegarderOffsets.
+
+        Parameters
+        ----------
+        path : str
+            Chemin du fichier corpus
+        pathOffsets : str
+            Emplacement de sauvegarde des limites
+
+        Returns
+        -------
+        array[int]
+            Les limites des documents, ou None si le fichier n'existe pas,
+            s'il ne correspond plus au fichier corpus ou s'il est tronqué.
+        """
+        if(not os.path.exists(pathOffsets)):
+            return None
+        stat = os.stat(path)
+        with open(pathOffsets,'rb') as f:
+            entete = f.read(struct.calcsize(FORMAT_ENTETE_OFFSETS))
+            if(len(entete) != struct.calcsize(FORMAT_ENTETE_OFFSETS)):
+                return None
+            signature,taille,mtime,nbOffsets = struct.unpack(FORMAT_ENTETE_OFFSETS,entete)
+            if(signature != SIGNATURE_OFFSETS or taille != stat.st_size or mtime != stat.st_mtime_ns):
+                return None
+            offsets = array('q')
+            donnees = f.read()
+        if(len(donnees) != nbOffsets*offsets.itemsize):
+            return None
+        offsets.frombytes(donnees)
+        return offsets
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Serveur d'extraction de terme. Il garde chargés les modèles spacy, les mots
+vides, le cache des stems et les statistiques du corpus de référence, et
+répond en HTTP aux demandes d'extraction.
+
+A appeler avec un fichier de config de base en argument, les demandes peuvent
+remplacer certains de ses paramètres. Requêtes acceptées, en JSON :
+    - POST /extraire {"texte": str} ou {"chemin": str} (relatif au répertoire
+      d'appel du serveur), avec en option
+      "parametres" (dict des paramètres de config à remplacer) et "topk".
+      Renvoie {"termes": [[terme, score], ...]} dans l'ordre du classement.
+    - POST /recharger : recharge les statistiques du corpus de référence,
+      par exemple après une modification du corpus de référence.
+    - GET /etat : nombre de travailleurs et statistiques chargées.
+
+Chaque travailleur a ses extracteurs, mais les extracteurs POSTAG d'un même
+modèle spacy partagent ce modèle : ses analyses sont faites l'une après l'autre
+(voir VERROUS_MODELES dans extracteurSpacy), le reste du travail se fait en
+parallèle.
+
+Attention : "chemin" permet à tout client qui peut joindre le serveur de lui
+faire lire n'importe quel fichier que le processus du serveur peut ouvrir. Le
+serveur écoute par défaut sur 127.0.0.1 (--hote), il ne doit pas être
+exposé à des clients qui ne sont pas de confiance.
+"""
+import argparse
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer,BaseHTTPRequestHandler
+from config.config import Config,METHODES_EXTRACTION
+from indexeur.indexeur import Indexeur
+from parserCorpus.parserSplit import ParserSplit
+from extractionTerme import recupererStatistiquesReference,recupererExtracteur,recupererClasseur,\
+                            utiliseReference
+
+def cleRessources(config):
+    """Renvoie la clé des paramètres dont dépendent les statistiques du
+    corpus de référence.
+
+    Parameters
+    ----------
+    config : Config
+        objet de configuration
+
+    Returns
+    -------
+    tuple
+        La clé des statistiques de la configuration
+    """
+    cle = (config.getMethodeExtraction(),config.getStem(),config.getSeuilNbOccMin())
+    if(config.getMethodeExtraction() == METHODES_EXTRACTION.POSTAG):
+        cle += (config.getModeleSpacy(),tuple(config.getComposantsSpacy()),config.getTailleBloc())
+    return cle
+
+class ServiceExtraction:
+    """
+    Service qui extrait et classe les termes de textes en gardant les
+    ressources chargées d'une demande à l'autre.
+
+    Les extractions sont faites par un groupe de threads travailleurs. Chaque
+    travailleur garde ses extracteurs, un par configuration d'extraction, car
+    un extracteur n'est pas partagé entre threads. Les statistiques du corpus
+    de référence sont partagées et peuvent être rechargées pendant que des
+    extractions sont en cours : celles-ci finissent avec les anciennes.
+
+    Attributes
+    ----------
+    config : Config
+        Configuration de base, les demandes peuvent en remplacer des paramètres
+
+    travailleurs : ThreadPoolExecutor
+        Les threads qui font les extractions
+
+    nbTravailleurs : int
+        Nombre de threads travailleurs
+
+    statsRef : dict[tuple,StatistiquesReference]
+        Statistiques du corpus de référence chargées, par clé de ressources
+
+    configsStats : dict[tuple,Config]
+        Une configuration pour chaque clé de statsRef, utilisée pour recharger
+
+    verrou : threading.Lock
+        Protège statsRef et configsStats
+
+    local : threading.local
+        Les extracteurs de chaque travailleur
+    """
+    def __init__(self,config,nbTravailleurs):
+        """Constructeur de la classe ServiceExtraction, charge les ressources
+        de la configuration de base.
+
+        Parameters
+        ----------
+        config : Config
+            Configuration de base
+
+        nbTravailleurs : int
+            Nombre de threads travailleurs
+        """
+        self.config = config
+        self.nbTravailleurs = nbTravailleurs
+        self.statsRef = dict()
+        self.configsStats = dict()
+        self.verrou = threading.Lock()
+        self.local = threading.local()
+        self.travailleurs = ThreadPoolExecutor(nbTravailleurs,thread_name_prefix='travailleur')
+
+        #les statistiques, le modèle spacy et le tokenizer de nltk sont chargés dès le départ,
+        #les extracteurs de chaque travailleur réutilisent le modèle déjà chargé
+        self.getStatistiquesReference(config)
+        recupererExtracteur(config).analyser('Préchargement des ressources.')
+
+    def getStatistiquesReference(self,config):
+        """Renvoie les statistiques du corpus de référence de la configuration,
+        chargées une seule fois.
+
+        Parameters
+        ----------
+        config : Config
+            objet de configuration
+
+        Returns
+        -------
+        StatistiquesReference
+            Les statistiques du corpus de référence, None si le classeur de la
+            configuration n'en a pas besoin
+        """
+        if(not utiliseReference(config)):
+            return None
+        cle = cleRessources(config)
+        with self.verrou:
+            if(cle not in self.statsRef):
+                self.statsRef[cle] = recupererStatistiquesReference(config)
+                self.configsStats[cle] = config
+            return self.statsRef[cle]
+
+    def recharger(self):
+        """Recharge les statistiques du corpus de référence déjà chargées. Si le
+        corpus de référence a changé elles sont recalculées. Les extractions en
+        cours gardent les anciennes statistiques.
+
+        Returns
+        -------
+        int
+            Nombre de statistiques rechargées
+        """
+        with self.verrou:
+            configsStats = dict(self.configsStats)
+        #le calcul peut être long, les extractions continuent pendant ce temps
+        statsRef = {cle : recupererStatistiquesReference(config) for cle,config in configsStats.items()}
+        with self.verrou:
+            self.statsRef.update(statsRef)
+        return len(statsRef)
+
+    def getExtracteur(self,config):
+        """Renvoie l'extracteur du thread courant pour la configuration, créé
+        à la première demande. Le dictionnaire stem/terme est vidé pour que le
+        retour aux termes ne dépende que de la demande en cours.
+
+        Parameters
+        ----------
+        config : Config
+            objet de configuration
+
+        Returns
+        -------
+        Extracteur
+            L'extracteur de la configuration
+        """
+        if(not hasattr(self.local,'extracteurs')):
+            self.local.extracteurs = dict()
+        cle = cleRessources(config)+(config.getLongueurMin(),config.getLongueurMax())
+        if(cle not in self.local.extracteurs):
+            self.local.extracteurs[cle] = recupererExtracteur(config)
+        extracteur = self.local.extracteurs[cle]
+        if(config.getStem()):
+            extracteur.dictStemTerme = dict()
+        return extracteur
+
+    def extraire(self,texte=None,chemin=None,parametres=None,topK=None):
+        """Extrait et classe les termes d'un texte ou d'un fichier, dans le
+        thread courant.
+
+        Parameters
+        ----------
+        texte : str
+            Le texte du corpus, les documents sont séparés par des lignes "##END##"
+
+        chemin : str
+            Chemin du fichier du corpus si texte n'est pas donné
+
+        parametres : dict[str,str]
+            Paramètres de la configuration de base à remplacer
+
+        topK : int
+            Nombre de termes renvoyés, si None on prend TOPK de la configuration
+
+        Returns
+        -------
+        list[tuple[str,float]]
+            Les termes classés avec leur score
+
+        Raises
+        ------
+        ValueError
+            Si ni le texte ni le chemin ne sont donnés, ou si un paramètre
+            n'est pas valide
+        """
+        config = self.config.modifier(parametres or dict())
+        if(topK is None):
+            topK = config.getTopK()
+        elif(topK < 0):
+            raise ValueError('topk doit être positif')
+
+        if(texte is not None):
+            corpus = ParserSplit().parseTexte(texte)
+        elif(chemin is not None):
+            corpus = ParserSplit().parse(chemin)
+        else:
+            raise ValueError('Il faut donner un texte ou un chemin')
+
+        extracteur = self.getExtracteur(config)
+        corpus.extraction(extracteur)
+        indexCorpus = Indexeur(corpus)
+
+        classeur = recupererClasseur(config,self.getStatistiquesReference(config))
+        listeTermesTrie = classeur.classer(indexCorpus,topK)
+
+        listeTermes = [terme for terme,score in listeTermesTrie]
+        if(config.getStem()):
+            listeTermes = extracteur.stemToTerme(listeTermes)
+        return [(' '.join(terme),score) for terme,(_,score) in zip(listeTermes,listeTermesTrie)]
+
+    def soumettre(self,**demande):
+        """Confie une extraction aux travailleurs
+
+        Parameters
+        ----------
+        **demande
+            Les arguments de la méthode extraire
+
+        Returns
+        -------
+        Future
+            Le résultat à venir de l'extraction
+        """
+        return self.travailleurs.submit(self.extraire,**demande)
+
+    def getEtat(self):
+        """Renvoie l'état du service
+
+        Returns
+        -------
+        dict
+            Nombre de travailleurs et nombre de statistiques chargées
+        """
+        with self.verrou:
+            return {'travailleurs':self.nbTravailleurs,'statistiques':len(self.statsRef)}
+
+    def arreter(self):
+        """Attend la fin des extractions en cours puis arrête les travailleurs"""
+        self.travailleurs.shutdown(wait=True)
+
+class GestionnaireRequetes(BaseHTTPRequestHandler):
+    """Répond aux requêtes HTTP du serveur avec le ServiceExtraction du serveur"""
+
+    def envoyerJSON(self,code,contenu):
+        """Envoie une réponse JSON
+
+        Parameters
+        ----------
+        code : int
+            Code HTTP de la réponse
+
+        contenu : object
+            Contenu de la réponse, converti en JSON
+        """
+        corps = json.dumps(contenu,ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type','application/json; charset=utf-8')
+        self.send_header('Content-Length',str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def lireJSON(self):
+        """Lit le corps JSON de la requête
+
+        Returns
+        -------
+        dict
+            Le corps de la requête, vide s'il n'y en a pas
+
+        Raises
+        ------
+        ValueError
+            Si le corps n'est pas un objet JSON
+        """
+        taille = int(self.headers.get('Content-Length',0))
+        if(taille == 0):
+            return dict()
+        corps = json.loads(self.rfile.read(taille).decode('utf-8'))
+        if(not isinstance(corps,dict)):
+            raise ValueError('Le corps de la requête doit être un objet JSON')
+        return corps
+
+    def do_GET(self):
+        """Répond à GET /etat"""
+        if(self.path == '/etat'):
+            self.envoyerJSON(200,self.server.service.getEtat())
+        else:
+            self.envoyerJSON(404,{'erreur':'chemin inconnu : '+self.path})
+
+    def do_POST(self):
+        """Répond à POST /extraire et POST /recharger"""
+        try:
+            if(self.path == '/extraire'):
+                demande = self.lireJSON()
+                chemin = demande.get('chemin')
+                if(chemin is not None):
+                    chemin = os.path.join(self.server.cheminAppel,chemin)
+                resultat = self.server.service.soumettre(texte=demande.get('texte'),
+                                                         chemin=chemin,
+                                                         parametres=demande.get('parametres'),
+                                                         topK=demande.get('topk')).result()
+                self.envoyerJSON(200,{'termes':resultat})
+            elif(self.path == '/recharger'):
+                self.envoyerJSON(200,{'recharges':self.server.service.recharger()})
+            else:
+                self.envoyerJSON(404,{'erreur':'chemin inconnu : '+self.path})
+        except (ValueError,KeyError,TypeError,OSError) as e:
+            #demande invalide : JSON, paramètre de config ou fichier
+            self.envoyerJSON(400,{'erreur':type(e).__name__+' : '+str(e)})
+        except Exception as e:
+            self.envoyerJSON(500,{'erreur':type(e).__name__+' : '+str(e)})
+
+def creerServeur(service,hote,port,cheminAppel):
+    """Crée le serveur HTTP, chaque connexion est lue dans son propre thread
+    et les extractions sont faites par les travailleurs du service.
+
+    Parameters
+    ----------
+    service : ServiceExtraction
+        Le service qui fait les extractions
+
+    hote : str
+        Adresse d'écoute
+
+    port : int
+        Port d'écoute, 0 pour un port libre
+
+    cheminAppel : str
+        Répertoire depuis lequel les chemins relatifs des demandes sont lus
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Le serveur, à lancer avec serve_forever
+    """
+    serveur = ThreadingHTTPServer((hote,port),GestionnaireRequetes)
+    serveur.daemon_threads = True
+    serveur.service = service
+    serveur.cheminAppel = cheminAppel
+    return serveur
+
+if __name__=='__main__':
+    #on récupère le chemin d'où on appelle le script
+    cheminAppel = os.getcwd()
+    #Pour la suite on se place dans le repértoire qui contient le script
+    os.chdir(os.path.abspath(os.path.dirname( __file__)))
+
+    #récupération des arguments de la ligne de commande
+    parser = argparse.ArgumentParser(description="Serveur d'extraction des termes")
+    parser.add_argument('config',help='chemin du fichier de config de base')
+    parser.add_argument('--hote',default='127.0.0.1',help="adresse d'écoute (127.0.0.1 par défaut)")
+    parser.add_argument('--port',type=int,default=8765,help="port d'écoute (8765 par défaut)")
+    parser.add_argument('--travailleurs',type=int,default=4,
+                        help="nombre d'extractions faites en même temps (4 par défaut)")
+    arguments = parser.parse_args()
+    if(arguments.travailleurs < 1):
+        parser.error('--travailleurs doit être supérieur ou égal à 1')
+
+    config = Config(os.path.join(cheminAppel,arguments.config))
+    service = ServiceExtraction(config,arguments.travailleurs)
+    serveur = creerServeur(service,arguments.hote,arguments.port,cheminAppel)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        service.arreter()
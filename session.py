@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Session d'extraction de terme utilisable depuis un programme python, sans
+fichier de config ni fichier csv et sans changer de répertoire courant.
+
+ex:
+    session = Session(stem=True,methodeExtraction='NGRAMMES',longueurMin=1,
+                      longueurMax=4,seuilNbOccMin=0,methodeScoring='TFIDF_LOG',
+                      formuleAgregation='SUM',cValue=True)
+    listesTermes = session.extraireLot(textes,topK=20)
+"""
+import threading
+from config.config import Config
+from document.corpus import Corpus
+from document.document import Document
+from indexeur.indexeur import Indexeur
+from parserCorpus.parserSplit import ParserSplit
+from extractionTerme import recupererStatistiquesReference,recupererExtracteur,recupererClasseur,\
+                            utiliseReference
+
+class Session:
+    """
+    Garde chargés l'extracteur, les statistiques du corpus de référence et le
+    classeur d'une configuration pour extraire les termes de nombreux textes.
+
+    Une session peut être réutilisée autant de fois que voulu : le résultat
+    d'un appel ne dépend pas des appels précédents. Les appels depuis
+    plusieurs threads sont faits l'un après l'autre.
+
+    Attributes
+    ----------
+    config : Config
+        La configuration de la session
+
+    extracteur : Extracteur
+        L'extracteur de la configuration
+
+    statsRef : StatistiquesReference
+        Les statistiques du corpus de référence de la configuration, None si
+        le classeur n'en a pas besoin
+
+    classeur : Classeur
+        Le classeur de la configuration
+
+    verrou : threading.Lock
+        Empêche deux appels en même temps, l'extracteur n'est pas partagé
+        entre threads
+    """
+    def __init__(self,config=None,**parametres):
+        """Constructeur de la classe Session
+
+        Parameters
+        ----------
+        config : Config
+            La configuration, si None elle est construite avec les paramètres
+
+        **parametres
+            Paramètres de la configuration (voir Config.depuisParametres), ils
+            remplacent ceux de config si elle est donnée
+        """
+        if(config is None):
+            config = Config.depuisParametres(**parametres)
+        elif(parametres):
+            config = config.modifier(parametres)
+        self.config = config
+        self.extracteur = recupererExtracteur(config)
+        self.statsRef = None
+        if(utiliseReference(config)):
+            self.statsRef = recupererStatistiquesReference(config)
+        self.classeur = recupererClasseur(config,self.statsRef)
+        self.verrou = threading.Lock()
+
+    def getConfig(self):
+        """Getter config
+
+        Returns
+        -------
+        Config
+            La configuration de la session
+        """
+        return self.config
+
+    def extraire(self,texte,topK=None):
+        """Extrait et classe les termes d'un corpus donné sous forme de texte,
+        les documents sont séparés par des lignes "##END##" comme dans un
+        fichier corpus.
+
+        Parameters
+        ----------
+        texte : str
+            Le texte du corpus
+
+        topK : int
+            Nombre de termes gardés, si None on prend TOPK de la configuration
+
+        Returns
+        -------
+        list[tuple[str,float]]
+            Les termes classés avec leur score
+        """
+        return self.classerCorpus(ParserSplit().parseTexte(texte),topK)
+
+    def classerCorpus(self,corpus,topK=None):
+        """Extrait et classe les termes d'un corpus
+
+        Parameters
+        ----------
+        corpus : Corpus
+            Le corpus dont les termes n'ont pas encore été extraits
+
+        topK : int
+            Nombre de termes gardés, si None on prend TOPK de la configuration
+
+        Returns
+        -------
+        list[tuple[str,float]]
+            Les termes classés avec leur score
+        """
+        with self.verrou:
+            self.viderStems()
+            corpus.extraction(self.extracteur)
+            return self.classer(corpus,topK)
+
+    def extraireLot(self,textes,topK=None):
+        """Extrait et classe les termes de chaque texte. Chaque texte est un
+        corpus d'un seul document et a son propre classement. Les textes sont
+        analysés ensemble par l'extracteur, par lots.
+
+        Avec le stemming, la forme de surface d'un stem est la plus fréquente
+        dans tout le lot de textes.
+
+        Parameters
+        ----------
+        textes : iterable[str]
+            Les textes
+
+        topK : int
+            Nombre de termes gardés pour chaque texte, si None on prend TOPK
+            de la configuration
+
+        Returns
+        -------
+        list[list[tuple[str,float]]]
+            Pour chaque texte, dans le même ordre, ses termes classés avec
+            leur score
+        """
+        with self.verrou:
+            self.viderStems()
+            corpus = Corpus()
+            for texte in textes:
+                corpus.addDocument(Document(texte))
+            #un seul passage de l'extracteur pour tous les textes
+            corpus.extraction(self.extracteur)
+
+            resultats = []
+            for doc in corpus:
+                corpusDoc = Corpus()
+                corpusDoc.addDocument(doc)
+                resultats.append(self.classer(corpusDoc,topK))
+            return resultats
+
+    def classer(self,corpus,topK):
+        """Indexe un corpus dont les termes sont extraits puis classe ses termes
+
+        Parameters
+        ----------
+        corpus : Corpus
+            Le corpus dont les termes ont été extraits
+
+        topK : int
+            Nombre de termes gardés, si None on prend TOPK de la configuration
+
+        Returns
+        -------
+        list[tuple[str,float]]
+            Les termes classés avec leur score
+        """
+        listeTermesTrie = self.classeur.classer(Indexeur(corpus),topK)
+        listeTermes = [terme for terme,score in listeTermesTrie]
+        if(self.config.getStem()):
+            listeTermes = self.extracteur.stemToTerme(listeTermes)
+        return [(' '.join(terme),score) for terme,(_,score) in zip(listeTermes,listeTermesTrie)]
+
+    def viderStems(self):
+        """Vide le dictionnaire stem/terme de l'extracteur pour que le retour
+        aux termes ne dépende que de l'appel en cours
+        """
+        if(self.config.getStem()):
+            self.extracteur.dictStemTerme = dict()
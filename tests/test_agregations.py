@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du percentile approché de classeur.agregations, comparé à
+numpy.percentile sur les scores complétés explicitement par des zéros.
+
+ex: python -m pytest tests
+"""
+import os
+import random
+import sys
+import unittest
+import numpy as np
+
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(DOSSIER_PROJET not in sys.path):
+    sys.path.insert(0,DOSSIER_PROJET)
+
+from classeur.agregations import percentile
+
+PERCENTILES = [0,1,10,25,50,75,90,95,99,100]
+
+def percentileExact(valeurs,nbdoc,p):
+    """Percentile des scores avec un zéro pour chaque document sans le terme"""
+    return float(np.percentile(list(valeurs)+[0.0]*(nbdoc-len(valeurs)),p))
+
+class TestPercentile(unittest.TestCase):
+
+    def test_peu_de_scores_exact(self):
+        #sans fusion de centroïdes le résultat est celui de numpy
+        aleatoire = random.Random(0)
+        valeurs = [0.6+0.4*aleatoire.random() for _ in range(10)]
+        for nbdoc in [10,11,20,500,50000]:
+            for p in PERCENTILES:
+                with self.subTest(nbdoc=nbdoc,p=p):
+                    self.assertAlmostEqual(percentile(valeurs,nbdoc,p,100),
+                                           percentileExact(valeurs,nbdoc,p),places=12)
+
+    def test_documents_absents(self):
+        #cas signalés : les zéros des documents absents ne sont pas interpolés
+        aleatoire = random.Random(0)
+        valeurs = [0.6+0.4*aleatoire.random() for _ in range(10)]
+        self.assertEqual(percentile(valeurs,50000,90,100),0.0)
+        self.assertAlmostEqual(percentile(valeurs,20,50,100),percentileExact(valeurs,20,50),places=12)
+
+    def test_beaucoup_de_scores_approche(self):
+        #avec fusion des centroïdes l'erreur reste faible devant l'étendue des scores
+        aleatoire = random.Random(1)
+        valeurs = [aleatoire.betavariate(2,5) for _ in range(5000)]
+        for nbdoc in [5000,6000,20000,50000]:
+            for p in PERCENTILES:
+                with self.subTest(nbdoc=nbdoc,p=p):
+                    self.assertAlmostEqual(percentile(valeurs,nbdoc,p,100),
+                                           percentileExact(valeurs,nbdoc,p),delta=0.005)
+
+    def test_sans_document(self):
+        self.assertEqual(percentile([],0,90,100),0.0)
+        self.assertEqual(percentile([],10,90,100),0.0)
+
+if __name__=='__main__':
+    unittest.main()